@@ -0,0 +1,137 @@
+import { randomUUID } from 'crypto';
+import { PrismaClient, PrioriteLead, StatusConversation } from '@prisma/client';
+
+// Données de volume pour le benchmark des routes de lecture (tests/readbench.py).
+// Complète l'entreprise « bench » jusqu'à N conversations (idempotent : les
+// paliers 1k → 10k → 100k réutilisent les données déjà créées).
+//
+//   npx tsx prisma/seed-bench.ts --conversations 10000 --messages 12
+
+const prisma = new PrismaClient();
+
+const BENCH_EMAIL = 'bench@chat4lead.local';
+const BATCH = 500;
+
+const PRENOMS = ['Sophie', 'Thomas', 'Camille', 'Nicolas', 'Julie', 'Antoine', 'Léa', 'Hugo', 'Chloé', 'Lucas'];
+const NOMS = ['Martin', 'Bernard', 'Dubois', 'Durand', 'Leroy', 'Moreau', 'Simon', 'Laurent', 'Michel', 'Garcia'];
+const VILLES = ['Paris', 'Lyon', 'Marseille', 'Toulouse', 'Nantes', 'Lille', 'Bordeaux', 'Rennes', 'Nice', 'Strasbourg'];
+const PRIORITES: PrioriteLead[] = ['CHAUD', 'TIEDE', 'MOYEN', 'FROID'];
+const STATUTS: StatusConversation[] = ['ACTIVE', 'QUALIFIED', 'ABANDONED', 'CLOSED'];
+// Réponses au questionnaire de fin : alimentent /analytics/satisfaction et /negative-comments
+const SATISFACTION: [string, number][] = [
+    ['Très utile et fluide', 1],
+    ['Correct', 2],
+    ['Pas clair, trop de questions', 3],
+];
+
+function arg(name: string, fallback: number): number {
+    const index = process.argv.indexOf(`--${name}`);
+    return index >= 0 ? parseInt(process.argv[index + 1], 10) : fallback;
+}
+
+async function benchEntreprise() {
+    const existing = await prisma.entreprise.findUnique({ where: { email: BENCH_EMAIL } });
+    if (existing) return existing;
+    const entreprise = await prisma.entreprise.create({
+        data: { nom: 'Chat4Lead Bench', email: BENCH_EMAIL, nomBot: 'Tom', plan: 'STARTER', status: 'ACTIVE' },
+    });
+    await prisma.configMetier.create({
+        data: {
+            entrepriseId: entreprise.id,
+            metier: 'DEMENAGEMENT',
+            zonesIntervention: ['75', '92', '93', '94'],
+            tarifsCustom: { base_m3: 35, base_km: 2.5, formules: { eco: 0.8, standard: 1.0, luxe: 1.4 } },
+            specificites: {},
+        },
+    });
+    return entreprise;
+}
+
+async function main() {
+    const target = arg('conversations', 1000);
+    const messagesPerConversation = arg('messages', 12);
+    const entreprise = await benchEntreprise();
+    const existing = await prisma.conversation.count({ where: { entrepriseId: entreprise.id } });
+    const start = Date.now();
+
+    for (let done = existing; done < target; done += BATCH) {
+        const size = Math.min(BATCH, target - done);
+        const leads = [];
+        const conversations = [];
+        const messages = [];
+        for (let k = 0; k < size; k++) {
+            const i = done + k;
+            const leadId = randomUUID();
+            const conversationId = randomUUID();
+            // Une minute d'écart : l'ordre updatedAt desc de la liste a du sens
+            const createdAt = new Date(Date.now() - (target - i) * 60_000);
+            // Un lead sur trois a répondu au questionnaire
+            const answer = i % 3 === 0 ? SATISFACTION[Math.floor(i / 3) % SATISFACTION.length] : null;
+            const prenom = PRENOMS[i % PRENOMS.length];
+            const nom = NOMS[(i * 7) % NOMS.length];
+            leads.push({
+                id: leadId,
+                entrepriseId: entreprise.id,
+                prenom,
+                nom,
+                email: `${prenom}.${nom}.${i}@bench.local`.toLowerCase(),
+                telephone: `06${String(10000000 + i).slice(-8)}`,
+                projetData: {
+                    villeDepart: VILLES[i % VILLES.length],
+                    villeArrivee: VILLES[(i + 3) % VILLES.length],
+                    surface: 20 + (i % 120),
+                    formule: ['eco', 'standard', 'luxe'][i % 3],
+                },
+                score: (i * 13) % 100,
+                priorite: PRIORITES[i % PRIORITES.length],
+                satisfaction: answer ? answer[0] : null,
+                satisfactionScore: answer ? answer[1] : null,
+                createdAt,
+            });
+            conversations.push({
+                id: conversationId,
+                leadId,
+                entrepriseId: entreprise.id,
+                metier: 'DEMENAGEMENT' as const,
+                status: STATUTS[i % STATUTS.length],
+                createdAt,
+                updatedAt: createdAt,
+            });
+            for (let m = 0; m < messagesPerConversation; m++) {
+                const assistant = m % 2 === 1;
+                messages.push({
+                    conversationId,
+                    role: assistant ? ('assistant' as const) : ('user' as const),
+                    content: assistant
+                        ? `Très bien, je note. Pouvez-vous me préciser la surface de votre logement à ${VILLES[i % VILLES.length]} ? (${m})`
+                        : `Je déménage de ${VILLES[i % VILLES.length]} vers ${VILLES[(i + 3) % VILLES.length]}, environ ${20 + (i % 120)} m² (${m})`,
+                    tokensUsed: assistant ? 900 + (m * 37) % 400 : null,
+                    latencyMs: assistant ? 800 + (i * m) % 2500 : null,
+                    createdAt: new Date(createdAt.getTime() + m * 15_000),
+                });
+            }
+        }
+        await prisma.$transaction([
+            prisma.lead.createMany({ data: leads }),
+            prisma.conversation.createMany({ data: conversations }),
+            prisma.message.createMany({ data: messages }),
+        ]);
+        process.stderr.write(`\r  ${done + size}/${target} conversations`);
+    }
+    if (target > existing) process.stderr.write('\n');
+
+    const conversations = await prisma.conversation.count({ where: { entrepriseId: entreprise.id } });
+    const messages = await prisma.message.count({ where: { conversation: { entrepriseId: entreprise.id } } });
+    console.error(`✅ Bench : ${conversations} conversations, ${messages} messages (+${Math.max(0, target - existing)} en ${((Date.now() - start) / 1000).toFixed(1)}s)`);
+    // Dernière ligne de stdout : lue par readbench.py
+    console.log(JSON.stringify({ apiKey: entreprise.apiKey, entrepriseId: entreprise.id, conversations, messages }));
+}
+
+main()
+    .catch((e) => {
+        console.error(e);
+        process.exit(1);
+    })
+    .finally(async () => {
+        await prisma.$disconnect();
+    });
@@ -5,6 +5,7 @@ import { logger } from './utils/logger';
 import { prisma } from './config/database';
 import { redis } from './config/redis';
 import { config } from './config/env';
+import { buildInfo } from './utils/build-info';
 
 import conversationRoutes from './modules/conversation/conversation.routes';
 import analyticsRoutes from './modules/analytics/analytics.routes';
@@ -65,7 +66,8 @@ app.get('/health', async (req: Request, res: Response) => {
         database: databaseStatus,
         redis: redisStatus,
         timestamp: new Date().toISOString(),
-        env: config.NODE_ENV
+        env: config.NODE_ENV,
+        ...buildInfo
     });
 });
 
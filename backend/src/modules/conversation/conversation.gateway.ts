@@ -33,9 +33,12 @@ export interface ServerToClientEvents {
     'bot-error': (data: { error: string }) => void;
 }
 
+/** Accusé de réception optionnel de join-conversation */
+export type JoinAck = (res: { ok: boolean; error?: string }) => void;
+
 /** Events envoyés par le client vers le serveur */
 export interface ClientToServerEvents {
-    'join-conversation': (data: { conversationId: string }) => void;
+    'join-conversation': (data: { conversationId: string }, ack?: JoinAck) => void;
     'send-message': (data: { conversationId: string; message: string }) => void;
 }
 
@@ -140,8 +143,10 @@ export function setupWebSocket(server: HttpServer) {
         // ────────────────────────────────────
         //  EVENT: join-conversation
         //  Le client rejoint une room pour recevoir les messages
+        //  (ack optionnel : permet au client de mesurer le coût du join)
         // ────────────────────────────────────
-        socket.on('join-conversation', async ({ conversationId }) => {
+        socket.on('join-conversation', async ({ conversationId }, ack?: JoinAck) => {
+            const reply = typeof ack === 'function' ? ack : () => undefined;
             try {
                 logger.info('Client joining conversation', {
                     socketId: socket.id,
@@ -151,6 +156,7 @@ export function setupWebSocket(server: HttpServer) {
                 // Validation de l'input
                 if (!conversationId || typeof conversationId !== 'string') {
                     socket.emit('bot-error', { error: 'Invalid conversation ID' });
+                    reply({ ok: false, error: 'Invalid conversation ID' });
                     return;
                 }
 
@@ -161,6 +167,7 @@ export function setupWebSocket(server: HttpServer) {
 
                 if (!conversation) {
                     socket.emit('bot-error', { error: 'Conversation not found' });
+                    reply({ ok: false, error: 'Conversation not found' });
                     return;
                 }
 
@@ -173,11 +180,13 @@ export function setupWebSocket(server: HttpServer) {
                         ownedBy: conversation.entrepriseId,
                     });
                     socket.emit('bot-error', { error: 'Access denied' });
+                    reply({ ok: false, error: 'Access denied' });
                     return;
                 }
 
                 // Rejoindre la room Socket.io
                 socket.join(conversationId);
+                reply({ ok: true });
 
                 logger.info('Client joined conversation room', {
                     socketId: socket.id,
@@ -190,6 +199,7 @@ export function setupWebSocket(server: HttpServer) {
                     conversationId,
                 });
                 socket.emit('bot-error', { error: 'Failed to join conversation' });
+                reply({ ok: false, error: 'Failed to join conversation' });
             }
         });
 
@@ -24,11 +24,20 @@ interface MessageHandlerOutput {
     metadata?: {
         tokensUsed?: number;
         latencyMs?: number;
+        cacheReadTokens?: number;
+        cacheCreationTokens?: number;
         entitiesExtracted?: any;
         error?: boolean;
     };
 }
 
+type LLMMetadata = {
+    tokensUsed: number;
+    latencyMs: number;
+    cacheReadTokens?: number;
+    cacheCreationTokens?: number;
+};
+
 // ──────────────────────────────────────────────
 //  MESSAGE HANDLER — Le cerveau de Chat4Lead
 // ──────────────────────────────────────────────
@@ -91,7 +100,7 @@ export class MessageHandler {
 
             // ── 5. Appeler le LLM ──
             let llmContent = '';
-            let llmMetadata = { tokensUsed: 0, latencyMs: 0 };
+            let llmMetadata: LLMMetadata = { tokensUsed: 0, latencyMs: 0 };
 
             try {
                 const llmResponse = await llmService.generateResponse(systemPrompt, llmMessages);
@@ -99,6 +108,8 @@ export class MessageHandler {
                 llmMetadata = {
                     tokensUsed: llmResponse.tokensUsed || 0,
                     latencyMs: llmResponse.latencyMs || 0,
+                    cacheReadTokens: llmResponse.cacheReadTokens,
+                    cacheCreationTokens: llmResponse.cacheCreationTokens,
                 };
             } catch (llmError) {
                 logger.error('⚠️ [LLM] Failure, using fallback message', {
@@ -278,12 +289,17 @@ export class MessageHandler {
             const llmMessages = [...recentMessages];
 
             let llmContent = '';
-            let llmMetadata = { tokensUsed: 0, latencyMs: 0 };
+            let llmMetadata: LLMMetadata = { tokensUsed: 0, latencyMs: 0 };
 
             try {
                 const llmResponse = await llmService.streamResponse!(systemPrompt, llmMessages, onChunk);
                 llmContent = llmResponse.content;
-                llmMetadata = { tokensUsed: llmResponse.tokensUsed || 0, latencyMs: llmResponse.latencyMs || 0 };
+                llmMetadata = {
+                    tokensUsed: llmResponse.tokensUsed || 0,
+                    latencyMs: llmResponse.latencyMs || 0,
+                    cacheReadTokens: llmResponse.cacheReadTokens,
+                    cacheCreationTokens: llmResponse.cacheCreationTokens,
+                };
             } catch (llmError) {
                 logger.error('⚠️ [LLM-Stream] Failure', { error: String(llmError), conversationId });
                 onChunk("Désolé, j'ai rencontré un petit problème technique.");
@@ -8,6 +8,18 @@ const MAX_TOKENS = 1800;
 
 type SystemBlock = { type: 'text'; text: string; cache_control?: { type: 'ephemeral' } };
 
+// Compteurs du prompt caching : renvoyés par l'API mais absents du type `Usage`
+// de @anthropic-ai/sdk 0.17, d'où ce type étroit (comme SystemBlock ci-dessus).
+type CacheUsage = { cache_read_input_tokens?: number | null; cache_creation_input_tokens?: number | null };
+
+function cacheTokens(usage: object): { cacheReadTokens: number; cacheCreationTokens: number } {
+    const { cache_read_input_tokens, cache_creation_input_tokens } = usage as CacheUsage;
+    return {
+        cacheReadTokens: cache_read_input_tokens ?? 0,
+        cacheCreationTokens: cache_creation_input_tokens ?? 0,
+    };
+}
+
 /**
  * Construit le tableau de blocs système pour Anthropic.
  * Si le prompt contient le séparateur static/dynamic, le bloc statique est marqué
@@ -97,9 +109,10 @@ export class ClaudeProvider implements LLMProvider {
 
             const latencyMs = Date.now() - startTime;
             const tokensUsed = response.usage.input_tokens + response.usage.output_tokens;
-            logger.info(`[Claude] Non-streaming. Latency: ${latencyMs}ms. Tokens: ${tokensUsed}`);
+            const { cacheReadTokens, cacheCreationTokens } = cacheTokens(response.usage);
+            logger.info(`[Claude] Non-streaming. Latency: ${latencyMs}ms. Tokens: ${tokensUsed} (cache: ${cacheReadTokens} lus, ${cacheCreationTokens} écrits)`);
 
-            return { content: content.text, tokensUsed, latencyMs };
+            return { content: content.text, tokensUsed, latencyMs, cacheReadTokens, cacheCreationTokens };
         } catch (error) {
             logger.error('Claude API error', { error });
             throw error;
@@ -147,9 +160,10 @@ export class ClaudeProvider implements LLMProvider {
             const finalMsg = await stream.finalMessage();
             const latencyMs = Date.now() - startTime;
             const tokensUsed = finalMsg.usage.input_tokens + finalMsg.usage.output_tokens;
-            logger.info(`[Claude] Streaming done. Latency: ${latencyMs}ms. Tokens: ${tokensUsed}`);
+            const { cacheReadTokens, cacheCreationTokens } = cacheTokens(finalMsg.usage);
+            logger.info(`[Claude] Streaming done. Latency: ${latencyMs}ms. Tokens: ${tokensUsed} (cache: ${cacheReadTokens} lus, ${cacheCreationTokens} écrits)`);
 
-            return { content: fullContent, tokensUsed, latencyMs };
+            return { content: fullContent, tokensUsed, latencyMs, cacheReadTokens, cacheCreationTokens };
         } catch (error) {
             logger.error('Claude streaming error', { error });
             throw error;
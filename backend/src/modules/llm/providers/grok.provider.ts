@@ -3,6 +3,9 @@ import { config } from '../../../config/env';
 import { logger } from '../../../utils/logger';
 import { LLMMessage, LLMProvider, LLMResponse } from '../types';
 
+// Exporté pour l'empreinte /health (utils/build-info.ts)
+export const GROK_MODEL = 'llama-3.1-8b-instant';
+
 export class GrokProvider implements LLMProvider {
     private client: OpenAI;
 
@@ -24,7 +27,7 @@ export class GrokProvider implements LLMProvider {
             const startTime = Date.now();
             try {
                 const response = await this.client.chat.completions.create({
-                    model: 'llama-3.1-8b-instant',
+                    model: GROK_MODEL,
                     messages: [
                         { role: 'system', content: systemPrompt },
                         ...messages.map(m => ({
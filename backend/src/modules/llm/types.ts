@@ -7,6 +7,9 @@ export interface LLMResponse {
     content: string;
     tokensUsed?: number;
     latencyMs: number;
+    /** Prompt caching (Claude) : tokens d'entrée lus depuis le cache / écrits dans le cache */
+    cacheReadTokens?: number;
+    cacheCreationTokens?: number;
 }
 
 export type StreamChunkCallback = (chunk: string) => void;
@@ -0,0 +1,51 @@
+import { createHash } from 'crypto';
+import { existsSync, readdirSync, readFileSync, statSync } from 'fs';
+import path from 'path';
+import { config } from '../config/env';
+import { GROK_MODEL } from '../modules/llm/providers/grok.provider';
+
+// Sources (relatives à src/) qui déterminent les réponses du bot : templates et
+// tarification, handler / context manager, providers LLM, calcul de distance.
+// Mêmes entrées que l'empreinte de repli du runner (tests/result_cache.py).
+const FINGERPRINT_SOURCES = [
+    'modules/prompt',
+    'modules/conversation',
+    'modules/llm',
+    'services/distance.service',
+];
+
+const SRC_ROOT = path.resolve(__dirname, '..');
+
+/** Fichiers .ts (tsx) ou .js (build) d'une entrée, déclarations exclues. */
+function sourceFiles(entry: string): string[] {
+    const target = path.join(SRC_ROOT, entry);
+    if (!existsSync(target)) {
+        return ['.ts', '.js'].map((ext) => target + ext).filter((file) => existsSync(file));
+    }
+    if (!statSync(target).isDirectory()) return [target];
+    return readdirSync(target)
+        .flatMap((name) => sourceFiles(path.join(entry, name)))
+        .filter((file) => /\.(ts|js)$/.test(file) && !file.endsWith('.d.ts'));
+}
+
+/**
+ * Empreinte du comportement conversationnel : contenu de toutes les sources
+ * ci-dessus (constantes de tarification et helpers compris), plus le modèle LLM.
+ * Calculée une fois au démarrage et exposée par /health pour que le runner de
+ * tests puisse réutiliser les résultats des scénarios quand rien n'a changé.
+ */
+function computePromptHash(): string {
+    const digest = createHash('sha256');
+    const files = FINGERPRINT_SOURCES.flatMap(sourceFiles).sort();
+    for (const file of files) {
+        digest.update(path.relative(SRC_ROOT, file));
+        digest.update(readFileSync(file));
+    }
+    return digest.digest('hex').slice(0, 16);
+}
+
+export const buildInfo = {
+    promptHash: computePromptHash(),
+    llmProvider: config.LLM_PROVIDER,
+    llmModel: config.LLM_PROVIDER === 'claude' ? config.CLAUDE_MODEL : GROK_MODEL,
+};
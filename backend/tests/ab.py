@@ -0,0 +1,284 @@
+"""
+Chat4Lead — Comparaison A/B de plusieurs backends
+==================================================
+`--target NOM=URL[,CLÉ]` (au moins deux) exécute chaque scénario sur
+toutes les cibles en même temps : les conversations d'un même scénario
+partent ensemble, sous la même charge, ce qui rend la comparaison
+équitable (deux déploiements, deux providers LLM, deux prompts…).
+
+Le rapport compare chaque cible à la première (référence) :
+  - latence par message : distributions, Mann-Whitney sur l'ensemble des
+    messages et Wilcoxon apparié sur la moyenne par scénario ;
+  - tokens et score final par scénario : Wilcoxon apparié ;
+  - réussite des assertions : McNemar (paires discordantes) ;
+  - accord sur la priorité et sur les champs extraits (REPEAT_FIELDS).
+
+Un écart est signalé significatif sous AB_ALPHA. Les transcripts partent
+dans un flux JSONL par cible ; en mémoire, des `ScenarioRecord`.
+
+    python runner.py --target prod=https://api.example.com/api --target local=http://localhost:3000/api
+    python runner.py --target claude=http://a:3000/api --target openai=http://b:3000/api,<clé> --concurrency 4
+"""
+
+import argparse
+import re
+import threading
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config import AB_ALPHA, API_KEY, REPEAT_FIELDS
+from console import Colors
+from records import ScenarioRecord
+from stats import fmt_ms, latency_summary, mann_whitney_u, mcnemar, percentile, wilcoxon_signed_rank, wilson_interval
+
+Target = Tuple[str, str, str]   # (nom, URL de l'API, clé)
+
+
+def parse_target(value: str) -> Target:
+    """Argument argparse « NOM=URL[,CLÉ] » (clé par défaut : config.API_KEY)."""
+    match = re.fullmatch(r"([\w.-]+)=(https?://[^,\s]+)(?:,(\S+))?", value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError("format attendu : NOM=URL[,CLÉ] (ex: B=http://localhost:3001/api)")
+    name, url, key = match.groups()
+    return name, url.rstrip("/"), key or API_KEY
+
+
+def _normalized(field: str, value) -> Optional[str]:
+    if value in (None, ""):
+        return None
+    value = str(value).strip().lower()
+    if field == "telephone":
+        value = re.sub(r"[\s.-]", "", value)
+    return value
+
+
+class ABCollector:
+    """Record compact + champs extraits (normalisés) de chaque (cible, scénario) ; thread-safe."""
+
+    def __init__(self, names: Sequence[str]):
+        self.names = list(names)
+        self._lock = threading.Lock()
+        self.records: Dict[str, Dict[str, ScenarioRecord]] = {name: {} for name in names}
+        self.values: Dict[str, Dict[str, Tuple[Optional[str], ...]]] = {name: {} for name in names}
+
+    def add(self, name: str, result: Dict) -> ScenarioRecord:
+        record = ScenarioRecord.from_result(result)
+        lead = result.get("final_lead") or {}
+        values = tuple(_normalized(field, lead.get(field)) for field in REPEAT_FIELDS)
+        with self._lock:
+            self.records[name][record.id] = record
+            self.values[name][record.id] = values
+        return record
+
+    def complete(self, sid: str) -> bool:
+        return all(sid in self.records[name] for name in self.names)
+
+
+# ══════════════════════════════════════════════
+#  RAPPORT
+# ══════════════════════════════════════════════
+
+def _mean(values: Sequence[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 1) if values else None
+
+
+def _latency_mean(record: ScenarioRecord) -> Optional[float]:
+    return sum(record.latency_ms) / len(record.latency_ms) if record.latency_ms else None
+
+
+def _paired(ids: List[str], a: Dict[str, ScenarioRecord], b: Dict[str, ScenarioRecord], metric) -> Dict:
+    """Métrique par scénario sur A et B (paires complètes), moyennes et Wilcoxon sur b − a."""
+    pairs = [(metric(a[sid]), metric(b[sid])) for sid in ids]
+    pairs = [(x, y) for x, y in pairs if x is not None and y is not None]
+    return {
+        "pairs": len(pairs),
+        "mean_a": _mean([x for x, _ in pairs]),
+        "mean_b": _mean([y for _, y in pairs]),
+        "wilcoxon": wilcoxon_signed_rank([y - x for x, y in pairs]),
+    }
+
+
+def _compare(ids: List[str], a_name: str, b_name: str, collector: ABCollector) -> Dict:
+    a, b = collector.records[a_name], collector.records[b_name]
+    lat_a, lat_b = array("l"), array("l")
+    for sid in ids:
+        lat_a.extend(a[sid].latency_ms)
+        lat_b.extend(b[sid].latency_ms)
+    p50_a, p50_b = percentile(lat_a, 50), percentile(lat_b, 50)
+    comparison = {
+        "a": a_name,
+        "b": b_name,
+        "latency": {
+            "p50_a": p50_a,
+            "p50_b": p50_b,
+            "delta_pct": round((p50_b - p50_a) / p50_a * 100, 1) if p50_a and p50_b is not None else None,
+            "mann_whitney": mann_whitney_u(lat_a, lat_b),
+            "per_scenario": _paired(ids, a, b, _latency_mean),
+        },
+        "tokens": _paired(ids, a, b, ScenarioRecord.total_tokens),
+        "score": _paired(ids, a, b, lambda r: r.final_score),
+        "passed": mcnemar(
+            sum(1 for sid in ids if a[sid].passed and not b[sid].passed),
+            sum(1 for sid in ids if b[sid].passed and not a[sid].passed),
+        ),
+        "priority_agreement": _agreement(sum(1 for sid in ids if a[sid].priorite == b[sid].priorite), len(ids)),
+        "fields_agreement": {
+            field: _agreement(sum(
+                1 for sid in ids if collector.values[a_name][sid][i] == collector.values[b_name][sid][i]
+            ), len(ids))
+            for i, field in enumerate(REPEAT_FIELDS)
+        },
+    }
+    tests = {
+        "latence (messages)": comparison["latency"]["mann_whitney"],
+        "latence (scénarios)": comparison["latency"]["per_scenario"]["wilcoxon"],
+        "tokens": comparison["tokens"]["wilcoxon"],
+        "score": comparison["score"]["wilcoxon"],
+        "réussite": comparison["passed"],
+    }
+    comparison["significant"] = [name for name, test in tests.items() if test and test["p"] < AB_ALPHA]
+    return comparison
+
+
+def _agreement(same: int, n: int) -> Dict:
+    low, high = wilson_interval(same, n)
+    return {"same": same, "n": n, "rate": round(same / n, 3) if n else None, "ci_low": low, "ci_high": high}
+
+
+def ab_report(scenarios: List[Dict], targets: Sequence[Target], collector: ABCollector,
+              wall_clock: Optional[float] = None) -> Dict:
+    """Comparaison de chaque cible à la première, sur les scénarios terminés partout."""
+    names = [name for name, _, _ in targets]
+    ids = [s["id"] for s in scenarios if collector.complete(s["id"])]
+    done = set(ids)
+
+    per_target = []
+    for name, url, _ in targets:
+        records = [collector.records[name][sid] for sid in ids]
+        latencies = array("l")
+        for r in records:
+            latencies.extend(r.latency_ms)
+        passed = sum(1 for r in records if r.passed)
+        low, high = wilson_interval(passed, len(records))
+        tokens = [t for t in (r.total_tokens() for r in records) if t is not None]
+        per_target.append({
+            "name": name,
+            "url": url,
+            "scenarios": len(records),
+            "passed": passed,
+            "rate": round(passed / len(records), 3) if records else None,
+            "ci_low": low,
+            "ci_high": high,
+            "errors": sum(1 for r in records if r.error_count),
+            "latency_ms": latency_summary(latencies),
+            "tokens_mean": _mean(tokens),
+            "score_mean": _mean([r.final_score for r in records if r.final_score is not None]),
+        })
+
+    rows = []
+    for scenario in scenarios:
+        sid = scenario["id"]
+        if sid not in done:
+            continue
+        records = {name: collector.records[name][sid] for name in names}
+        values = [collector.values[name][sid] for name in names]
+        rows.append({
+            "id": sid,
+            "name": scenario["name"],
+            "targets": {
+                name: {
+                    "passed": r.passed,
+                    "score": r.final_score,
+                    "priorite": r.priorite,
+                    "latency_mean_ms": round(_latency_mean(r)) if r.latency_ms else None,
+                    "tokens": r.total_tokens(),
+                }
+                for name, r in records.items()
+            },
+            "priority_agree": len({r.priorite for r in records.values()}) == 1,
+            "fields_disagree": [
+                field for i, field in enumerate(REPEAT_FIELDS) if len({v[i] for v in values}) > 1
+            ],
+        })
+
+    return {
+        "mode": "ab",
+        "alpha": AB_ALPHA,
+        "wall_clock_seconds": round(wall_clock, 1) if wall_clock is not None else None,
+        "reference": names[0],
+        "targets": per_target,
+        "comparisons": [_compare(ids, names[0], name, collector) for name in names[1:]],
+        "scenarios": rows,
+        "incomplete": [s["id"] for s in scenarios if s["id"] not in done],
+    }
+
+
+# ══════════════════════════════════════════════
+#  AFFICHAGE
+# ══════════════════════════════════════════════
+
+def _pct(value: Optional[float]) -> str:
+    return "—" if value is None else f"{value:.0%}"
+
+
+def _num(value: Optional[float]) -> str:
+    return "—" if value is None else f"{value:.0f}"
+
+
+def _p(test: Optional[Dict]) -> str:
+    if not test:
+        return "—"
+    mark = f" {Colors.BOLD}*{Colors.END}" if test["p"] < AB_ALPHA else ""
+    return f"p={test['p']:.3f}{mark}"
+
+
+def print_ab_report(report: Dict):
+    """Tableau par cible, comparaisons à la référence, scénarios en désaccord."""
+    print(f"\n{'═'*70}")
+    print(f"  {Colors.BOLD}⚖️   A/B — {len(report['targets'])} cibles, référence « {report['reference']} »{Colors.END}")
+    print(f"{'═'*70}")
+    print(f"  {'Cible':<12} {'Réussite':>12}  {'IC 95 %':<11} {'p50':>7} {'p95':>7} {'moy ± σ':>13} {'tokens':>7} {'score':>6}")
+    for t in report["targets"]:
+        lat = t["latency_ms"]
+        spread = f"{fmt_ms(lat['mean'])} ± {lat['stddev']:.0f}" if lat["count"] else "—"
+        ci = f"[{_pct(t['ci_low'])}–{_pct(t['ci_high'])}]"
+        print(f"  {t['name'][:12]:<12} {t['passed']:>3}/{t['scenarios']:<3} {_pct(t['rate']):>4}  {ci:<11} "
+              f"{fmt_ms(lat['p50']):>7} {fmt_ms(lat['p95']):>7} {spread:>13} "
+              f"{_num(t['tokens_mean']):>7} {_num(t['score_mean']):>6}")
+
+    for c in report["comparisons"]:
+        lat = c["latency"]
+        delta = f"{lat['delta_pct']:+.1f} %" if lat["delta_pct"] is not None else "—"
+        print(f"\n  {Colors.BOLD}{c['b']} vs {c['a']}{Colors.END}")
+        print(f"     Latence p50 :    {fmt_ms(lat['p50_a'])} → {fmt_ms(lat['p50_b'])} ({delta})  "
+              f"messages {_p(lat['mann_whitney'])} · scénarios {_p(lat['per_scenario']['wilcoxon'])}")
+        print(f"     Tokens/scénario : {_num(c['tokens']['mean_a'])} → {_num(c['tokens']['mean_b'])}  "
+              f"{_p(c['tokens']['wilcoxon'])}")
+        print(f"     Score final :    {_num(c['score']['mean_a'])} → {_num(c['score']['mean_b'])}  "
+              f"{_p(c['score']['wilcoxon'])}")
+        print(f"     Réussite :       {c['passed']['only_a']} seulement {c['a']}, "
+              f"{c['passed']['only_b']} seulement {c['b']}  {_p(c['passed'])}")
+        print(f"     Accord :         priorité {_pct(c['priority_agreement']['rate'])} · " + " · ".join(
+            f"{field} {_pct(rate['rate'])}" for field, rate in c["fields_agreement"].items()
+        ))
+        if c["significant"]:
+            print(f"     {Colors.YELLOW}Écarts significatifs (α = {report['alpha']}) : "
+                  f"{', '.join(c['significant'])}{Colors.END}")
+        else:
+            print(f"     {Colors.GREEN}Aucun écart significatif (α = {report['alpha']}).{Colors.END}")
+
+    disagreements = [row for row in report["scenarios"] if not row["priority_agree"] or row["fields_disagree"]]
+    if disagreements:
+        print(f"\n  {Colors.YELLOW}≠ Scénarios en désaccord ({len(disagreements)}) :{Colors.END}")
+        for row in disagreements[:15]:
+            priorities = " / ".join(f"{name} {t['priorite'] or '—'}" for name, t in row["targets"].items())
+            fields = f" — champs : {', '.join(row['fields_disagree'])}" if row["fields_disagree"] else ""
+            print(f"     {row['id']:<22} {priorities}{fields}")
+        if len(disagreements) > 15:
+            print(f"     {Colors.DIM}… et {len(disagreements) - 15} autres (voir le rapport JSON){Colors.END}")
+    if report["incomplete"]:
+        print(f"\n  {Colors.DIM}{len(report['incomplete'])} scénario(s) non terminés sur toutes les cibles, "
+              f"exclus de la comparaison.{Colors.END}")
+    if report.get("wall_clock_seconds") is not None:
+        print(f"\n  Durée :       {report['wall_clock_seconds']:.0f}s")
+    print(f"{'═'*70}\n")
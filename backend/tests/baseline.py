@@ -0,0 +1,184 @@
+"""
+Chat4Lead — Garde-fou de performance contre un run de référence
+=================================================================
+Compare le run courant à un run de référence (fichier results_*.json
+ou .jsonl) : percentiles de latence par scénario et par tour, durée,
+et tokens consommés (`metadata.tokensUsed` renvoyé par le backend).
+
+Une métrique régresse quand elle dépasse la référence de plus de la
+tolérance (%) ET d'un écart absolu minimal, pour ignorer le bruit sur
+les petites valeurs. Seuls les scénarios présents et sans erreur dans
+les deux runs sont comparés ; les autres sont listés à part.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config import (
+    BASELINE_TOLERANCE_PCT, BASELINE_TOKENS_TOLERANCE_PCT,
+    BASELINE_MIN_DELTA_MS, BASELINE_MIN_DELTA_TOKENS,
+)
+from console import Colors
+from stats import percentile
+
+
+def _collect(results: Iterable[Dict]) -> Tuple[Dict[str, Dict], Set[str]]:
+    """
+    Mesures brutes par scénario (latences, tokens, durée), relues une
+    fois. Renvoie (scénarios mesurables, IDs en erreur) : un scénario en
+    erreur n'a pas de mesure fiable.
+    """
+    scenarios: Dict[str, Dict] = {}
+    errored: Set[str] = set()
+    for r in results:
+        if r.get("errors"):
+            errored.add(r["id"])
+            continue
+        exchanges = r.get("exchanges") or []
+        tokens = [ex["tokens_used"] for ex in exchanges if ex.get("tokens_used") is not None]
+        scenarios[r["id"]] = {
+            # Latence par tour (None si absente) : indexation des tours conservée
+            "latencies": [ex.get("latency_ms") for ex in exchanges],
+            "tokens": sum(tokens) if tokens else None,
+            "duration": r.get("duration_seconds"),
+        }
+    return scenarios, errored
+
+
+def _metrics(scenarios: Dict[str, Dict], ids: Set[str]) -> Dict[str, Dict]:
+    """Métriques comparables des scénarios `ids`, indexées par (portée, nom)."""
+    metrics: Dict[str, Dict] = {}
+    by_turn: Dict[int, array] = {}
+    run_tokens = 0
+    run_duration = 0.0
+    has_tokens = False
+
+    def add(scope: str, name: str, value, kind: str):
+        if value is not None:
+            metrics[f"{scope}|{name}"] = {"scope": scope, "name": name, "value": value, "kind": kind}
+
+    for sid in ids:
+        scenario = scenarios[sid]
+        latencies = [v for v in scenario["latencies"] if v is not None]
+        add(sid, "latence p50", percentile(latencies, 50), "ms")
+        add(sid, "latence p95", percentile(latencies, 95), "ms")
+        add(sid, "durée", scenario["duration"], "s")
+        if scenario["tokens"] is not None:
+            has_tokens = True
+            add(sid, "tokens", scenario["tokens"], "tokens")
+            run_tokens += scenario["tokens"]
+        run_duration += scenario["duration"] or 0
+
+        for turn, latency in enumerate(scenario["latencies"], 1):
+            if latency is not None:
+                by_turn.setdefault(turn, array("d")).append(latency)
+
+    for turn, values in by_turn.items():
+        add(f"tour {turn}", "latence p50", percentile(values, 50), "ms")
+        add(f"tour {turn}", "latence p95", percentile(values, 95), "ms")
+
+    # Somme des durées de scénario, pas le temps mur du run (concurrence)
+    add("run", "Σ durées scén.", round(run_duration, 1), "s")
+    if has_tokens:
+        add("run", "tokens", run_tokens, "tokens")
+    return metrics
+
+
+def compare(
+    current: Iterable[Dict],
+    baseline: Iterable[Dict],
+    tolerance_pct: float = BASELINE_TOLERANCE_PCT,
+    tokens_tolerance_pct: float = BASELINE_TOKENS_TOLERANCE_PCT,
+) -> Dict:
+    """
+    Comparaison sur les seuls scénarios présents et sans erreur dans les
+    deux runs : totaux et percentiles par tour portent sur le même
+    ensemble, un run partiel (--id, --shard, --changed-only, fail-fast)
+    ne passe pas pour une amélioration. Renvoie les lignes de comparaison
+    et les IDs écartés de chaque côté.
+    """
+    cur, cur_errored = _collect(current)
+    base, base_errored = _collect(baseline)
+    common = cur.keys() & base.keys()
+    cur_metrics = _metrics(cur, common)
+    base_metrics = _metrics(base, common)
+
+    rows = []
+    for key in base_metrics.keys() & cur_metrics.keys():
+        b, c = base_metrics[key], cur_metrics[key]
+        kind = c["kind"]
+        if kind == "tokens":
+            tolerance, min_delta = tokens_tolerance_pct, BASELINE_MIN_DELTA_TOKENS
+        elif kind == "s":
+            tolerance, min_delta = tolerance_pct, BASELINE_MIN_DELTA_MS / 1000
+        else:
+            tolerance, min_delta = tolerance_pct, BASELINE_MIN_DELTA_MS
+
+        delta = c["value"] - b["value"]
+        delta_pct = (delta / b["value"] * 100) if b["value"] else None
+        regressed = (
+            delta > min_delta
+            and (delta_pct is None or delta_pct > tolerance)
+        )
+        rows.append({
+            "scope": c["scope"], "metric": c["name"], "kind": kind,
+            "baseline": b["value"], "current": c["value"],
+            "delta_pct": round(delta_pct, 1) if delta_pct is not None else None,
+            "tolerance_pct": tolerance,
+            "regressed": regressed,
+        })
+
+    rows.sort(key=lambda r: (not r["regressed"], -(r["delta_pct"] or 0)))
+    return {
+        "rows": rows,
+        "scenarios": len(common),
+        "excluded": {
+            "errored": sorted(cur_errored | base_errored),
+            "missing_in_current": sorted(base.keys() - cur.keys() - cur_errored),
+            "missing_in_baseline": sorted(cur.keys() - base.keys() - base_errored),
+        },
+    }
+
+
+def _fmt(value, kind: str) -> str:
+    if kind == "ms":
+        return f"{value:.0f}ms"
+    if kind == "s":
+        return f"{value:.1f}s"
+    return f"{value:.0f}"
+
+
+def _fmt_ids(ids: List[str], limit: int = 8) -> str:
+    return ", ".join(ids[:limit]) + (f" … (+{len(ids) - limit})" if len(ids) > limit else "")
+
+
+def print_comparison(comparison: Dict, baseline_path: str, limit: Optional[int] = 15) -> int:
+    """Affiche le tableau des écarts et renvoie le nombre de régressions."""
+    rows = comparison["rows"]
+    regressions = [r for r in rows if r["regressed"]]
+    print(f"\n{'═'*70}")
+    print(f"  {Colors.BOLD}⏱   PERFORMANCE vs RÉFÉRENCE{Colors.END}  {Colors.DIM}{baseline_path}{Colors.END}")
+    print(f"{'═'*70}")
+    print(f"  {Colors.DIM}{comparison['scenarios']} scénarios communs · Σ durées scén. = somme des durées "
+          f"de scénario (pas le temps mur){Colors.END}")
+    excluded = comparison["excluded"]
+    for key, label in (("errored", "en erreur (un run ou l'autre)"),
+                       ("missing_in_current", "absents du run courant"),
+                       ("missing_in_baseline", "absents de la référence")):
+        if excluded[key]:
+            print(f"  {Colors.YELLOW}Écartés, {label} : {_fmt_ids(excluded[key])}{Colors.END}")
+    print(f"  {'Portée':<16} {'Métrique':<14} {'Réf.':>10} {'Actuel':>10} {'Écart':>9}")
+
+    shown = regressions if regressions else rows[:limit]
+    for r in shown:
+        delta = f"{r['delta_pct']:+.0f}%" if r["delta_pct"] is not None else "—"
+        color = Colors.RED if r["regressed"] else Colors.GREEN if (r["delta_pct"] or 0) < 0 else ""
+        print(f"  {r['scope']:<16} {r['metric']:<14} {_fmt(r['baseline'], r['kind']):>10} "
+              f"{_fmt(r['current'], r['kind']):>10} {color}{delta:>9}{Colors.END if color else ''}")
+
+    if regressions:
+        print(f"\n  {Colors.RED}❌ {len(regressions)} régression(s) sur {len(rows)} métriques{Colors.END}")
+    else:
+        print(f"\n  {Colors.GREEN}✅ Aucune régression ({len(rows)} métriques comparées){Colors.END}")
+    print(f"{'═'*70}\n")
+    return len(regressions)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Chat4Lead — Cassettes : enregistrement / rejeu hors-ligne
+==========================================================
+`CassetteRecorder` enregistre chaque échange HTTP du runner (health, init,
+message, message/stream, get_conversation) dans un fichier JSONL.
+
+`CassetteServer` est un faux backend local qui rejoue ces cassettes, avec
+les latences d'origine ou sans latence : ni base, ni Redis, ni appel LLM.
+Les réponses sont retrouvées par l'historique des messages utilisateur de
+la conversation, donc le rejeu est déterministe même en parallèle.
+
+Usage:
+    python runner.py --record                     # enregistre cassettes/cassette_<ts>.jsonl
+    python runner.py --replay cassettes/x.jsonl   # rejoue (serveur local intégré)
+    python cassette.py cassettes/x.jsonl --port 3100 --latency zero   # serveur seul
+"""
+
+import argparse
+import json
+import re
+import statistics
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+LATENCY_MODES = ("original", "zero")
+
+
+# ══════════════════════════════════════════════
+#  ENREGISTREMENT
+# ══════════════════════════════════════════════
+
+class CassetteRecorder:
+    """Ajoute chaque échange HTTP à une cassette JSONL (thread-safe)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._histories: Dict[str, List[str]] = {}
+
+    def _write(self, entry: Dict):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            self._file.flush()
+
+    def record_health(self, status: int, body, latency_ms: float):
+        self._write({"type": "health", "status": status, "body": body, "latency_ms": latency_ms})
+
+    def record_init(self, conversation_id: Optional[str], status: int, body, latency_ms: float):
+        if conversation_id:
+            with self._lock:
+                self._histories[conversation_id] = []
+        self._write({"type": "init", "status": status, "body": body, "latency_ms": latency_ms})
+
+    def record_message(
+        self,
+        conversation_id: str,
+        message: str,
+        status: int,
+        body,
+        latency_ms: float,
+        events: Optional[List[Dict]] = None,
+    ):
+        """`events` : timeline SSE [{"t_ms", "data"}] quand le message passe par /stream."""
+        with self._lock:
+            history = self._histories.setdefault(conversation_id, [])
+            history.append(message)
+            history = list(history)
+        entry = {
+            "type": "message", "history": history,
+            "status": status, "body": body, "latency_ms": latency_ms,
+        }
+        if events is not None:
+            entry["events"] = events
+        self._write(entry)
+
+    def record_conversation(self, conversation_id: str, status: int, body, latency_ms: float):
+        with self._lock:
+            history = list(self._histories.get(conversation_id, []))
+        self._write({
+            "type": "conversation", "history": history,
+            "status": status, "body": body, "latency_ms": latency_ms,
+        })
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+# ══════════════════════════════════════════════
+#  REJEU
+# ══════════════════════════════════════════════
+
+class Cassette:
+    """Index en mémoire d'une ou plusieurs cassettes, par historique de messages."""
+
+    def __init__(self, paths: List[Path]):
+        self.health: Optional[Dict] = None
+        self.init_latencies: List[float] = []
+        self.messages: Dict[Tuple[str, ...], Dict] = {}
+        self.conversations: Dict[Tuple[str, ...], Dict] = {}
+
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self._add(json.loads(line))
+
+    def _add(self, entry: Dict):
+        kind = entry.get("type")
+        if kind == "health":
+            self.health = entry
+        elif kind == "init":
+            self.init_latencies.append(entry.get("latency_ms", 0))
+        elif kind == "message":
+            # Premier enregistrement gagnant : rejeu déterministe
+            self.messages.setdefault(tuple(entry["history"]), entry)
+        elif kind == "conversation":
+            self.conversations.setdefault(tuple(entry["history"]), entry)
+
+    @property
+    def init_latency_ms(self) -> float:
+        return statistics.median(self.init_latencies) if self.init_latencies else 0
+
+
+class CassetteServer:
+    """Faux backend HTTP rejouant une cassette (thread dédié)."""
+
+    def __init__(self, cassette: Cassette, port: int = 0, latency: str = "original"):
+        self.cassette = cassette
+        self.latency = latency
+        self._histories: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.base_url}/api"
+
+    def start(self) -> "CassetteServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def wait(self, latency_ms: float):
+        if self.latency == "original" and latency_ms:
+            time.sleep(latency_ms / 1000)
+
+    # ─── État des conversations rejouées ──────
+
+    def new_conversation(self) -> str:
+        conversation_id = str(uuid.uuid4())
+        with self._lock:
+            self._histories[conversation_id] = []
+        return conversation_id
+
+    def push_message(self, conversation_id: str, message: str) -> Tuple[str, ...]:
+        with self._lock:
+            history = self._histories.setdefault(conversation_id, [])
+            history.append(message)
+            return tuple(history)
+
+    def history(self, conversation_id: str) -> Tuple[str, ...]:
+        with self._lock:
+            return tuple(self._histories.get(conversation_id, []))
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(_CassetteHandler):
+            stub = server
+
+        return Handler
+
+
+class _CassetteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # sinon ~40ms d'ACK retardé par réponse
+    stub: CassetteServer
+
+    MESSAGE_RE = re.compile(r"^/api/conversation/([^/]+)/message(/stream)?$")
+    CONVERSATION_RE = re.compile(r"^/api/conversation/([^/]+)$")
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_recorded(self, history):
+        self._send_json(404, {
+            "error": "Not recorded",
+            "message": f"Aucun enregistrement pour l'historique {list(history)}",
+        })
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw or b"{}")
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            entry = self.stub.cassette.health or {"status": 200, "body": {"status": "ok"}}
+            return self._send_json(entry["status"], entry["body"])
+
+        match = self.CONVERSATION_RE.match(path)
+        if match:
+            history = self.stub.history(match.group(1))
+            entry = self.stub.cassette.conversations.get(history)
+            if not entry:
+                return self._not_recorded(history)
+            self.stub.wait(entry.get("latency_ms", 0))
+            return self._send_json(entry["status"], entry["body"])
+
+        self._send_json(404, {"error": "Not Found"})
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        body = self._read_json()
+
+        if path == "/api/conversation/init":
+            self.stub.wait(self.stub.cassette.init_latency_ms)
+            return self._send_json(200, {"conversationId": self.stub.new_conversation(), "isNew": True})
+
+        match = self.MESSAGE_RE.match(path)
+        if not match:
+            return self._send_json(404, {"error": "Not Found"})
+
+        history = self.stub.push_message(match.group(1), body.get("message", ""))
+        entry = self.stub.cassette.messages.get(history)
+        if not entry:
+            return self._not_recorded(history)
+
+        if match.group(2):
+            return self._send_stream(entry)
+        self.stub.wait(entry.get("latency_ms", 0))
+        self._send_json(entry["status"], _rest_body(entry))
+
+    def _send_stream(self, entry: Dict):
+        """Rejoue la timeline SSE enregistrée (ou la synthétise depuis une réponse REST)."""
+        if entry["status"] >= 400:
+            self.stub.wait(entry.get("latency_ms", 0))
+            return self._send_json(entry["status"], entry["body"])
+
+        events = entry.get("events") or _events_from_rest(entry)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        start = time.perf_counter()
+        for event in events:
+            if self.stub.latency == "original":
+                delay = event["t_ms"] / 1000 - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            payload = f"data: {json.dumps(event['data'], ensure_ascii=False)}\n\n".encode('utf-8')
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def _rest_body(entry: Dict) -> Dict:
+    """Corps REST d'un message, reconstruit depuis le `done` SSE si besoin."""
+    if "events" not in entry or entry["status"] >= 400:
+        return entry["body"]
+    done = next((e["data"] for e in entry["events"] if e["data"].get("type") == "done"), {})
+    reply = "".join(e["data"].get("c", "") for e in entry["events"] if e["data"].get("type") == "text")
+    return {k: v for k, v in done.items() if k != "type"} | {"reply": reply}
+
+
+def _events_from_rest(entry: Dict) -> List[Dict]:
+    body = entry["body"]
+    latency = entry.get("latency_ms", 0)
+    return [
+        {"t_ms": latency, "data": {"type": "text", "c": body.get("reply", "")}},
+        {"t_ms": latency, "data": {"type": "done", **{k: v for k, v in body.items() if k != "reply"}}},
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat4Lead — Serveur de rejeu de cassettes")
+    parser.add_argument("cassettes", nargs="+", help="Fichier(s) cassette JSONL")
+    parser.add_argument("--port", type=int, default=3100)
+    parser.add_argument("--latency", choices=LATENCY_MODES, default="original")
+    args = parser.parse_args()
+
+    server = CassetteServer(Cassette(args.cassettes), port=args.port, latency=args.latency)
+    print(f"Rejeu de {len(server.cassette.messages)} messages → API_URL={server.api_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
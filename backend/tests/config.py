@@ -17,6 +17,81 @@ DELAY_BETWEEN_MESSAGES = 1.0   # secondes (le LLM a besoin de 1-3s)
 TIMEOUT = 60                   # secondes max par requête
 SAVE_RESULTS = True
 GENERATE_HTML_REPORT = True
+QUALIFIED_PRIORITIES = ("CHAUD", "TIEDE")  # leads comptés comme qualifiés (coût/lead)
+CONCURRENCY = int(os.getenv("CONCURRENCY", "1"))  # scénarios en parallèle
+TRANSPORT = os.getenv("TRANSPORT", "rest")          # rest | stream (SSE)
+
+# ──────────────────────────────────────────────
+#  SLO de performance (assertions latence / durée / tokens)
+# ──────────────────────────────────────────────
+# Appliqués à tous les scénarios, prioritaires sur les seuils de leur
+# `expected` (None = seuil du scénario s'il en a un). Latences client,
+# hors attentes du limiteur et retries.
+SLO = {
+    "latency_max_ms": int(os.getenv("SLO_LATENCY_MAX_MS", "0")) or None,   # message le plus lent
+    "latency_p95_ms": int(os.getenv("SLO_LATENCY_P95_MS", "0")) or None,   # tout latency_pNN_ms accepté
+    "duration_max_s": None,            # conversation complète (pauses comprises)
+    "tokens_max_per_turn": None,
+    "tokens_max": int(os.getenv("SLO_TOKENS_MAX", "0")) or None,           # conversation complète
+    "ttft_max_ms": None,               # premier token, transport stream uniquement
+}
+
+# ──────────────────────────────────────────────
+#  Échauffement (--warmup)
+# ──────────────────────────────────────────────
+WARMUP_CONVERSATIONS = int(os.getenv("WARMUP", "0"))  # conversations jetables avant les stats (opt-in : coûte des appels LLM)
+WARMUP_TURNS = 2               # messages envoyés par conversation d'échauffement
+
+# ──────────────────────────────────────────────
+#  Répétition (--repeat)
+# ──────────────────────────────────────────────
+REPEAT_FIELDS = ("email", "telephone", "prenom", "nom")   # fiabilité d'extraction suivie
+
+# ──────────────────────────────────────────────
+#  Comparaison A/B (--target)
+# ──────────────────────────────────────────────
+AB_ALPHA = 0.05                # seuil de significativité des tests
+
+# ──────────────────────────────────────────────
+#  Limiteur de débit et retries (429 / 5xx)
+# ──────────────────────────────────────────────
+THROTTLE_RATE = float(os.getenv("THROTTLE_RATE", "0"))   # requêtes/s max (0 = illimité)
+THROTTLE_BURST = 5                  # rafale autorisée au-delà du débit
+THROTTLE_MAX_CONVERSATIONS = 0      # conversations simultanées max (0 = illimité)
+RETRY_MAX = 4                       # tentatives supplémentaires par requête
+RETRY_BASE_DELAY = 0.5              # secondes, doublé à chaque tentative (avec jitter)
+RETRY_MAX_DELAY = 30                # plafond du backoff et du Retry-After honoré
+RETRY_STATUSES = (429, 502, 503, 504)
+# POST /message(/stream) n'est pas idempotent : un 502/504 ou une coupure en
+# cours de requête peut survenir après l'enregistrement du tour et l'appel
+# LLM. Seuls les refus explicites (et les échecs de connexion) sont rejoués.
+RETRY_STATUSES_NON_IDEMPOTENT = (429, 503)
+
+# ──────────────────────────────────────────────
+#  Métriques live (--metrics-port / --metrics-file / --progress)
+# ──────────────────────────────────────────────
+METRICS_WINDOW_SECONDS = 60    # fenêtre glissante des percentiles et tokens/s
+METRICS_FILE_INTERVAL = 5      # secondes entre deux réécritures du fichier .prom
+
+# ──────────────────────────────────────────────
+#  Test de charge (--load)
+# ──────────────────────────────────────────────
+LOAD_RATE = 0.5                # nouvelles conversations / seconde
+LOAD_DURATION = 120            # secondes d'injection
+LOAD_RAMP_UP = 30              # secondes de montée linéaire
+LOAD_MAX_IN_FLIGHT = 100       # conversations simultanées max côté client
+
+# ──────────────────────────────────────────────
+#  Sessions manuelles rejouées (runner.py import-sessions / --manual-ratio)
+# ──────────────────────────────────────────────
+MANUAL_RATIO = 0.0             # part des conversations de charge tirées des sessions manuelles
+MANUAL_THINK_SCALE = 1.0       # facteur sur les temps de réflexion d'origine (0.5 = deux fois plus vite)
+MANUAL_THINK_MAX = 120         # secondes : plafond d'une pause (onglet laissé ouvert…)
+
+# ──────────────────────────────────────────────
+#  Gateway Socket.io (--socketio)
+# ──────────────────────────────────────────────
+SOCKETIO_STEP = 25             # sockets ouvertes par palier
 
 # ──────────────────────────────────────────────
 #  Chemins
@@ -24,3 +99,39 @@ GENERATE_HTML_REPORT = True
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
 REPORTS_DIR = os.path.join(os.path.dirname(__file__), "reports")
 SCENARIOS_FILE = os.path.join(os.path.dirname(__file__), "scenarios.json")
+CASSETTES_DIR = os.path.join(os.path.dirname(__file__), "cassettes")
+SYNTH_DIR = os.path.join(os.path.dirname(__file__), "scenarios")   # corpus générés (synth.py)
+MANUAL_SESSIONS_DIR = os.path.join(os.path.dirname(__file__), "manual-sessions")   # module test-session
+MANUAL_SCENARIOS_FILE = os.path.join(SYNTH_DIR, "manual_sessions.jsonl")   # scripts importés
+
+# ──────────────────────────────────────────────
+#  Benchmark des routes de lecture (runner.py readbench)
+# ──────────────────────────────────────────────
+READBENCH_TIERS = (1000, 10000, 100000)   # conversations en base par palier
+READBENCH_MESSAGES = 12        # messages par conversation seedée
+READBENCH_DURATION = 15        # secondes de mesure par route et par palier
+READBENCH_CONCURRENCY = 8      # clients simultanés (boucle fermée)
+READBENCH_CLIFF_RATIO = 3.0    # p95 × ce facteur d'un palier au suivant ⇒ falaise signalée
+READBENCH_DIR = os.path.join(RESULTS_DIR, "readbench")   # un fichier par palier et par run
+
+# ──────────────────────────────────────────────
+#  Garde-fou de performance (--baseline)
+# ──────────────────────────────────────────────
+BASELINE_TOLERANCE_PCT = 20          # latences et durées
+BASELINE_TOKENS_TOLERANCE_PCT = 10   # tokens consommés
+BASELINE_MIN_DELTA_MS = 250          # écart absolu minimal pour une régression
+BASELINE_MIN_DELTA_TOKENS = 100
+
+# ──────────────────────────────────────────────
+#  Historique des runs (SQLite)
+# ──────────────────────────────────────────────
+SAVE_HISTORY = True
+HISTORY_DB = os.path.join(RESULTS_DIR, "history.sqlite")
+
+# ──────────────────────────────────────────────
+#  Cache des résultats (--changed-only)
+# ──────────────────────────────────────────────
+CACHE_RESULTS = True
+CACHE_DIR = os.path.join(RESULTS_DIR, "cache")
+CACHE_MAX_AGE_DAYS = 14        # entrées plus anciennes supprimées
+CACHE_MAX_MB = 200             # au-delà, les moins récemment utilisées partent
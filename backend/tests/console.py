@@ -0,0 +1,14 @@
+"""
+Chat4Lead - Helpers d'affichage terminal partagés par les outils de test
+"""
+
+
+class Colors:
+    GREEN  = '\033[92m'
+    RED    = '\033[91m'
+    YELLOW = '\033[93m'
+    BLUE   = '\033[94m'
+    CYAN   = '\033[96m'
+    END    = '\033[0m'
+    BOLD   = '\033[1m'
+    DIM    = '\033[2m'
@@ -0,0 +1,332 @@
+"""
+Chat4Lead — Test de charge en boucle ouverte
+=============================================
+Démarre de nouvelles conversations à un débit cible (conversations/s),
+indépendamment des temps de réponse du backend, pendant une durée fixe
+avec une montée en charge linéaire. Chaque conversation rejoue le script
+`messages` d'un scénario (tourniquet sur le fichier de scénarios ; un
+corpus JSONL est relu au fil de l'eau, jamais chargé en entier). Une part
+des conversations peut rejouer des sessions manuelles importées, avec
+leurs temps de réflexion d'origine (voir manual_replay.py).
+
+Le rapport donne le débit, le taux d'erreur et les percentiles
+p50/p95/p99 + histogramme de latence par index de tour.
+"""
+
+import itertools
+import json
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from config import RESULTS_DIR, MANUAL_THINK_MAX
+from console import Colors
+from manual_replay import mix_scenarios
+from stats import fmt_ms, histogram, latency_summary
+
+
+class LoadTest:
+    """Injecteur de charge open-loop réutilisant les appels de ChatBotTester."""
+
+    def __init__(
+        self,
+        tester,
+        scenarios: Iterable[Dict],
+        rate: float,
+        duration: float,
+        ramp_up: float = 0,
+        max_in_flight: int = 100,
+        manual: Sequence[Dict] = (),
+        manual_ratio: float = 0,
+        think_scale: float = 1.0,
+    ):
+        self.tester = tester
+        # Liste : tourniquet en mémoire ; itérateur (cycle_scenarios) : flux paresseux
+        if isinstance(scenarios, list):
+            self.scenario_ids: Optional[List[str]] = [s["id"] for s in scenarios]
+            self._scenarios = itertools.cycle(scenarios)
+        else:
+            self.scenario_ids = None
+            self._scenarios = iter(scenarios)
+        self.manual_ratio = manual_ratio if manual else 0
+        self.manual_ids = [s["id"] for s in manual]
+        if self.manual_ratio:
+            self._scenarios = mix_scenarios(self._scenarios, manual, self.manual_ratio)
+        self.think_scale = think_scale
+        self.rate = rate
+        self.duration = duration
+        self.ramp_up = min(ramp_up, duration)
+        self.max_in_flight = max_in_flight
+
+        self._lock = threading.Lock()
+        # Colonnes numériques compactes : mémoire ~constante sur un long soak
+        self._turn_latencies: Dict[int, array] = {}
+        self._turn_ttfts: Dict[int, array] = {}
+        self._cold_warm: Dict[str, array] = {"cold": array("l"), "warm": array("l")}
+        self._turn_errors: Dict[int, int] = {}
+        self._start_lags = array("d")
+        self._errors: Dict[str, int] = {}
+        self._conversations = {"started": 0, "completed": 0, "failed": 0}
+        # Sessions manuelles vs catalogue : conversations et latences séparées
+        self._sources: Dict[str, Dict] = {}
+        self._in_flight = 0
+
+    # ─── Planification ────────────────────────
+
+    def arrival_times(self) -> Iterator[float]:
+        """
+        Instants de démarrage (s depuis t0). Débit linéaire de 0 à `rate`
+        pendant `ramp_up`, puis constant jusqu'à `duration`.
+        """
+        ramp_arrivals = self.rate * self.ramp_up / 2
+        k = 0
+        while True:
+            if k < ramp_arrivals:
+                # N(t) = rate·t² / (2·ramp)  ⇒  t = √(2·ramp·k / rate)
+                t = (2 * self.ramp_up * k / self.rate) ** 0.5
+            else:
+                t = self.ramp_up + (k - ramp_arrivals) / self.rate
+            if t >= self.duration:
+                return
+            yield t
+            k += 1
+
+    # ─── Exécution ────────────────────────────
+
+    def run(self) -> Dict:
+        """Lance la charge, attend la fin des conversations et renvoie le rapport."""
+        print(f"\n  {Colors.BOLD}🚀 Charge : {self.rate} conv/s pendant {self.duration:.0f}s "
+              f"(montée {self.ramp_up:.0f}s, ≤ {self.max_in_flight} en vol){Colors.END}")
+
+        t0 = time.time()
+        with ThreadPoolExecutor(
+            max_workers=self.max_in_flight,
+            thread_name_prefix="load",
+        ) as pool:
+            for offset in self.arrival_times():
+                delay = t0 + offset - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                scenario = next(self._scenarios, None)
+                if scenario is None:
+                    break
+                pool.submit(self._run_conversation, scenario, t0 + offset)
+                with self._lock:
+                    self._conversations["started"] += 1
+                    self._source(scenario)["started"] += 1
+                self._print_progress(time.time() - t0)
+            print(f"\n  {Colors.DIM}Injection terminée — attente des conversations en cours…{Colors.END}")
+
+        return self._build_report(time.time() - t0)
+
+    def _run_conversation(self, scenario: Dict, scheduled_at: float):
+        """Rejoue un script de conversation ; s'arrête à la première erreur."""
+        with self.tester.tracer.span("conversation", "scenario", id=scenario["id"]):
+            with self.tester.throttle.conversation_slot():
+                self.tester.metrics.conversation_started()
+                completed = False
+                try:
+                    completed = self._converse(scenario, scheduled_at)
+                finally:
+                    self.tester.metrics.conversation_finished("passed" if completed else "error")
+
+    def _converse(self, scenario: Dict, scheduled_at: float) -> bool:
+        """Renvoie True si la conversation est allée au bout, False à la première erreur."""
+        with self._lock:
+            self._start_lags.append((time.time() - scheduled_at) * 1000)
+            self._in_flight += 1
+
+        turn = 0
+        try:
+            conversation_id = self.tester.init_conversation()
+            messages = scenario["messages"]
+            for turn, message in enumerate(messages, 1):
+                msg_start = time.time()
+                response = self.tester.send(conversation_id, message)
+                elapsed_ms = (int((time.time() - msg_start) * 1000)
+                              - response["throttle_wait_ms"] - response["retry_ms"])
+
+                # Le handler renvoie 200 + metadata.error en cas d'échec interne
+                if (response.get("metadata") or {}).get("error"):
+                    raise RuntimeError("metadata.error (échec interne du handler)")
+
+                with self._lock:
+                    self._turn_latencies.setdefault(turn, array("l")).append(elapsed_ms)
+                    self._source(scenario)["latencies"].append(elapsed_ms)
+                    self._cold_warm["cold" if response["cold_reason"] else "warm"].append(elapsed_ms)
+                    if response.get("ttft_ms") is not None:
+                        self._turn_ttfts.setdefault(turn, array("l")).append(int(response["ttft_ms"]))
+
+                if turn < len(messages):
+                    with self.tester.tracer.span("sleep", "client"):
+                        time.sleep(self._think_time(scenario, turn))
+
+            with self._lock:
+                self._conversations["completed"] += 1
+                self._source(scenario)["completed"] += 1
+            return True
+        except Exception as e:
+            key = f"{type(e).__name__}: {str(e)[:120]}"
+            self.tester.metrics.error(type(e).__name__)
+            with self._lock:
+                self._conversations["failed"] += 1
+                self._source(scenario)["failed"] += 1
+                self._turn_errors[turn] = self._turn_errors.get(turn, 0) + 1
+                self._errors[key] = self._errors.get(key, 0) + 1
+            return False
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _source(self, scenario: Dict) -> Dict:
+        """Compteurs de la source du scénario (appelant sous verrou)."""
+        name = "manual" if scenario.get("source") == "manual" else "catalogue"
+        if name not in self._sources:
+            self._sources[name] = {"started": 0, "completed": 0, "failed": 0, "latencies": array("l")}
+        return self._sources[name]
+
+    def _think_time(self, scenario: Dict, turn: int) -> float:
+        """Pause après le tour `turn` : pause mesurée d'une session manuelle, délai fixe sinon."""
+        think_times = scenario.get("think_times_s") or ()
+        if turn <= len(think_times) and think_times[turn - 1] is not None:
+            return min(think_times[turn - 1] * self.think_scale, MANUAL_THINK_MAX)
+        return self.tester.delay
+
+    def _print_progress(self, elapsed: float):
+        with self._lock:
+            c = dict(self._conversations)
+            in_flight = self._in_flight
+        live = self.tester.metrics.snapshot()
+        print(f"\r  {Colors.DIM}t={elapsed:5.0f}s  démarrées={c['started']}  "
+              f"en vol={in_flight}  ok={c['completed']}  ko={c['failed']}  "
+              f"p95={fmt_ms(live['latency_ms'][95])}  {live['tokens_per_second']:.0f} tok/s{Colors.END}   ",
+              end="", flush=True)
+
+    # ─── Rapport ──────────────────────────────
+
+    def _build_report(self, elapsed: float) -> Dict:
+        requests_ok = sum(len(v) for v in self._turn_latencies.values())
+        requests_ko = sum(self._turn_errors.values())
+        total_requests = requests_ok + requests_ko
+
+        turns = []
+        for turn in sorted(set(self._turn_latencies) | set(self._turn_errors)):
+            latencies = self._turn_latencies.get(turn, array("l"))
+            errors = self._turn_errors.get(turn, 0)
+            entry = {
+                "turn": turn,
+                "requests": len(latencies) + errors,
+                "errors": errors,
+                "latency_ms": latency_summary(latencies),
+                "histogram": histogram(latencies),
+            }
+            if turn in self._turn_ttfts:
+                entry["ttft_ms"] = latency_summary(self._turn_ttfts[turn])
+            turns.append(entry)
+
+        return {
+            "mode": "load",
+            "timestamp": datetime.now().isoformat(),
+            "config": {
+                "rate": self.rate,
+                "duration_seconds": self.duration,
+                "ramp_up_seconds": self.ramp_up,
+                "max_in_flight": self.max_in_flight,
+                "throttle_rps": self.tester.throttle.bucket.rate,
+                "max_conversations": self.tester.throttle.max_conversations,
+                "transport": self.tester.transport,
+                "delay_between_messages": self.tester.delay,
+                "scenarios": self.scenario_ids if self.scenario_ids is not None else "flux JSONL",
+                "manual_ratio": self.manual_ratio,
+                "manual_sessions": self.manual_ids if self.manual_ratio else [],
+                "think_scale": self.think_scale,
+            },
+            "elapsed_seconds": round(elapsed, 1),
+            "conversations": dict(self._conversations),
+            "requests": total_requests,
+            "errors": requests_ko,
+            "error_rate": round(requests_ko / total_requests, 4) if total_requests else 0,
+            "throughput_rps": round(requests_ok / elapsed, 3) if elapsed else 0,
+            "conversations_per_second": round(
+                self._conversations["completed"] / elapsed, 3
+            ) if elapsed else 0,
+            # Retard de démarrage : > 0 quand l'injecteur lui-même sature
+            "start_lag_ms": latency_summary(self._start_lags),
+            "error_types": self._errors,
+            # Attentes du limiteur client et retries (429/5xx), hors latences
+            "client": self.tester.throttle.stats.snapshot(),
+            # Premiers messages (démarrage) et caches de prompt manqués vs le reste
+            "cold_warm": {k: latency_summary(v) for k, v in self._cold_warm.items()},
+            "sources": {
+                name: {
+                    "conversations": {k: v for k, v in source.items() if k != "latencies"},
+                    "latency_ms": latency_summary(source["latencies"]),
+                }
+                for name, source in sorted(self._sources.items())
+            },
+            "turns": turns,
+        }
+
+
+def print_load_report(report: Dict):
+    """Affiche le rapport de charge dans le terminal."""
+    c = report["conversations"]
+    err_color = Colors.GREEN if report["error_rate"] < 0.01 else Colors.RED
+
+    print(f"\n{'═'*70}")
+    print(f"  {Colors.BOLD}📈  RAPPORT DE CHARGE{Colors.END}")
+    print(f"{'═'*70}")
+    print(f"  Durée :          {report['elapsed_seconds']}s")
+    print(f"  Conversations :  {c['started']} démarrées · {c['completed']} terminées · {c['failed']} échouées")
+    print(f"  Requêtes :       {report['requests']}  ({report['throughput_rps']} req/s)")
+    print(f"  Erreurs :        {err_color}{report['errors']} ({report['error_rate']*100:.1f}%){Colors.END}")
+    print(f"  Retard démarrage p95 : {fmt_ms(report['start_lag_ms']['p95'])}")
+    cold, warm = report["cold_warm"]["cold"], report["cold_warm"]["warm"]
+    if cold["count"]:
+        print(f"  Froid/chaud :    {cold['count']} froids p50 {fmt_ms(cold['p50'])} · "
+              f"{warm['count']} chauds p50 {fmt_ms(warm['p50'])}")
+    sources = report.get("sources") or {}
+    if "manual" in sources:
+        for name, label in (("catalogue", "Catalogue"), ("manual", "Manuelles")):
+            if name in sources:
+                sc, lat = sources[name]["conversations"], sources[name]["latency_ms"]
+                print(f"  {label + ' :':<16}{sc['started']} conv. · {sc['failed']} échouées · "
+                      f"p50 {fmt_ms(lat['p50'])} · p95 {fmt_ms(lat['p95'])}")
+    client = report.get("client") or {}
+    if client.get("retries") or client.get("throttled_requests"):
+        by_status = ", ".join(f"{k}×{v}" for k, v in sorted(client["retries_by_status"].items()))
+        print(f"  Limiteur :       {client['throttled_requests']} requêtes retardées (+{client['throttle_wait_s']:.1f}s)")
+        print(f"  Retries :        {client['retries']} ({by_status or '—'}, +{client['retry_wait_s']:.1f}s) "
+              f"· {client['gave_up']} abandon(s)")
+
+    streaming = any("ttft_ms" in t for t in report["turns"])
+    ttft_header = f"  {'TTFT p50':>9}  {'TTFT p95':>9}" if streaming else ""
+    print(f"\n  {'Tour':>4}  {'Req':>5}  {'Err':>4}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'max':>8}{ttft_header}")
+    for t in report["turns"]:
+        lat = t["latency_ms"]
+        ttft_cols = ""
+        if streaming:
+            ttft = t.get("ttft_ms") or {}
+            ttft_cols = f"  {fmt_ms(ttft.get('p50')):>9}  {fmt_ms(ttft.get('p95')):>9}"
+        print(f"  {t['turn']:>4}  {t['requests']:>5}  {t['errors']:>4}  "
+              f"{fmt_ms(lat['p50']):>8}  {fmt_ms(lat['p95']):>8}  "
+              f"{fmt_ms(lat['p99']):>8}  {fmt_ms(lat['max']):>8}{ttft_cols}")
+
+    if report["error_types"]:
+        print(f"\n  {Colors.RED}Erreurs :{Colors.END}")
+        for key, count in sorted(report["error_types"].items(), key=lambda kv: -kv[1]):
+            print(f"     {count:>4} × {key}")
+    print(f"{'═'*70}\n")
+
+
+def save_load_report(report: Dict, filename: str) -> Path:
+    Path(RESULTS_DIR).mkdir(parents=True, exist_ok=True)
+    filepath = Path(RESULTS_DIR) / filename
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+    print(f"{Colors.BLUE}💾  Rapport de charge → {filepath}{Colors.END}")
+    return filepath
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Chat4Lead — Rejeu des sessions de test manuelles
+=================================================
+Le module `test-session` garde une trace de chaque session de test menée
+par un humain (tests/manual-sessions/*.json : phase, conversationId,
+horodatages). Ces conversations réelles ont des messages de longueur
+variable, des tours hors script et un rythme humain — ce que les
+scénarios écrits à la main ou synthétiques n'ont pas.
+
+`import-sessions` convertit ces sessions en scripts rejouables (JSONL,
+même format que scenarios.json, `source: "manual"`) :
+  - messages utilisateur dans l'ordre d'origine (messages système et
+    réponses du bot écartés) ;
+  - `think_times_s` : pour chaque tour suivant, écart entre la réponse
+    du bot et le message suivant de l'utilisateur (lecture + frappe).
+
+Les fichiers de session ne contiennent que l'ID de conversation : les
+messages sont lus via GET /api/conversation/:id (clé API de l'entreprise
+qui a mené les tests), sauf si la session les embarque déjà (`messages`
+ou `conversation.messages`).
+
+En mode charge, `--manual-ratio R` tire une part R des conversations
+dans ces scripts (tourniquet mélangé, graine fixe) et rejoue leurs
+pauses d'origine (× `--think-scale`, plafonnées à MANUAL_THINK_MAX) ;
+le reste suit le catalogue habituel et DELAY_BETWEEN_MESSAGES.
+
+Usage:
+    python runner.py import-sessions                          # toutes les sessions de MANUAL_SESSIONS_DIR
+    python runner.py import-sessions manual-sessions/phase1-*.json --api-key <clé> -o scenarios/manual_phase1.jsonl
+    python runner.py --load --rate 2 --duration 600 --manual-ratio 0.3
+"""
+
+import argparse
+import itertools
+import json
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import requests
+
+from config import API_URL, API_KEY, TIMEOUT, MANUAL_SESSIONS_DIR, MANUAL_SCENARIOS_FILE
+from console import Colors
+from stats import percentile
+
+
+# ══════════════════════════════════════════════
+#  IMPORT
+# ══════════════════════════════════════════════
+
+def _parse_ts(value) -> Optional[datetime]:
+    """Horodatage ISO 8601 de Prisma (« …Z ») → datetime, None si absent ou illisible."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def conversation_fetcher(api_url: str, api_key: str) -> Callable[[str], Dict]:
+    """GET /api/conversation/:id avec la clé de l'entreprise propriétaire."""
+    session = requests.Session()
+    session.headers.update({"x-api-key": api_key})
+
+    def fetch(conversation_id: str) -> Dict:
+        r = session.get(f"{api_url}/conversation/{conversation_id}", timeout=TIMEOUT)
+        r.raise_for_status()
+        return r.json()
+
+    return fetch
+
+
+def session_messages(session: Dict, fetch: Optional[Callable[[str], Dict]]) -> List[Dict]:
+    """Messages de la conversation d'une session : embarqués s'ils y sont, sinon lus via l'API."""
+    embedded = session.get("messages") or (session.get("conversation") or {}).get("messages")
+    if embedded:
+        return embedded
+    if fetch is None or not session.get("conversationId"):
+        return []
+    return fetch(session["conversationId"]).get("messages") or []
+
+
+def to_script(session: Dict, messages: Sequence[Dict]) -> Optional[Dict]:
+    """
+    Script rejouable d'une session. `think_times_s[k]` est la pause avant
+    le message k+2 (même indexation que les pauses du runner, après chaque
+    tour sauf le dernier) ; None si un horodatage manque. Messages dans
+    l'ordre chronologique (celui de l'API). None si la session n'a aucun
+    message utilisateur.
+    """
+    user_messages: List[str] = []
+    think_times: List[Optional[float]] = []
+    previous_at: Optional[datetime] = None
+    for message in messages:
+        if message.get("role") not in ("user", "assistant"):
+            continue
+        created_at = _parse_ts(message.get("createdAt"))
+        if message["role"] == "user" and (message.get("content") or "").strip():
+            if user_messages:
+                gap = (created_at - previous_at).total_seconds() if created_at and previous_at else None
+                think_times.append(round(max(0.0, gap), 1) if gap is not None else None)
+            user_messages.append(message["content"])
+        previous_at = created_at
+    if not user_messages:
+        return None
+
+    session_id = session.get("sessionId") or session.get("id") or session.get("conversationId")
+    return {
+        "id": f"manual-{session_id}",
+        "name": f"Session manuelle {session.get('phase') or '?'} {session_id}",
+        "description": f"Rejeu de la conversation {session.get('conversationId') or '?'} "
+                       f"du {(session.get('startTime') or '?')[:10]}",
+        "source": "manual",
+        "messages": user_messages,
+        "think_times_s": think_times,
+        "imported": {
+            "sessionId": session_id,
+            "phase": session.get("phase"),
+            "conversationId": session.get("conversationId"),
+            "startTime": session.get("startTime"),
+        },
+    }
+
+
+def import_sessions(paths: Iterable[Path], fetch: Optional[Callable[[str], Dict]]) -> Iterator[Dict]:
+    """Scripts des sessions lisibles ; les autres sont signalées et ignorées."""
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8') as f:
+                session = json.load(f)
+            script = to_script(session, session_messages(session, fetch))
+        except requests.RequestException as e:   # avant OSError, dont elle hérite
+            print(f"  {Colors.YELLOW}⚠  {path.name} : conversation inaccessible ({e}){Colors.END}")
+            continue
+        except (OSError, ValueError) as e:
+            print(f"  {Colors.YELLOW}⚠  {path.name} : illisible ({e}){Colors.END}")
+            continue
+        if script is None:
+            print(f"  {Colors.YELLOW}⚠  {path.name} : aucun message utilisateur{Colors.END}")
+            continue
+        yield script
+
+
+def think_time_summary(scripts: Sequence[Dict]) -> Dict:
+    """Distribution de toutes les pauses mesurées (secondes)."""
+    pauses = [t for s in scripts for t in s["think_times_s"] if t is not None]
+    return {
+        "count": len(pauses),
+        "p50": percentile(pauses, 50),
+        "p90": percentile(pauses, 90),
+        "max": max(pauses) if pauses else None,
+    }
+
+
+# ══════════════════════════════════════════════
+#  MÉLANGE EN MODE CHARGE
+# ══════════════════════════════════════════════
+
+def mix_scenarios(catalogue: Iterator[Dict], manual: Sequence[Dict], ratio: float, seed: int = 0) -> Iterator[Dict]:
+    """
+    Flux de scénarios où chaque conversation est tirée des sessions
+    manuelles avec la probabilité `ratio`, du catalogue sinon. Graine
+    fixe : même run ⇒ même séquence. S'arrête avec le catalogue.
+    """
+    rng = random.Random(seed)
+    manual_cycle = itertools.cycle(rng.sample(list(manual), len(manual)))
+    while True:
+        if rng.random() < ratio:
+            yield next(manual_cycle)
+            continue
+        scenario = next(catalogue, None)
+        if scenario is None:
+            return
+        yield scenario
+
+
+# ══════════════════════════════════════════════
+#  CLI
+# ══════════════════════════════════════════════
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="runner.py import-sessions",
+                                     description="Convertit les sessions de test manuelles en scripts rejouables (JSONL)")
+    parser.add_argument("sessions", nargs="*", metavar="FICHIER",
+                        help="Fichiers de session (défaut: MANUAL_SESSIONS_DIR/*.json)")
+    parser.add_argument("-o", "--output", default=MANUAL_SCENARIOS_FILE, metavar="FICHIER",
+                        help=f"Fichier de sortie (défaut: {MANUAL_SCENARIOS_FILE})")
+    parser.add_argument("--api-url", default=API_URL, help="API d'où lire les conversations (défaut: config.API_URL)")
+    parser.add_argument("--api-key", default=API_KEY,
+                        help="Clé de l'entreprise qui a mené les tests (défaut: config.API_KEY)")
+    parser.add_argument("--offline", action="store_true",
+                        help="N'utilise que les messages embarqués dans les sessions, sans appeler l'API")
+    args = parser.parse_args(argv)
+
+    paths = [Path(p) for p in args.sessions] or sorted(Path(MANUAL_SESSIONS_DIR).glob("*.json"))
+    if not paths:
+        print(f"{Colors.YELLOW}Aucune session dans {MANUAL_SESSIONS_DIR}.{Colors.END}")
+        return 1
+    fetch = None if args.offline else conversation_fetcher(args.api_url, args.api_key)
+    scripts = list(import_sessions(paths, fetch))
+    if not scripts:
+        print(f"{Colors.RED}❌  Aucune session importable sur {len(paths)}.{Colors.END}")
+        return 1
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        for script in scripts:
+            f.write(json.dumps(script, ensure_ascii=False) + "\n")
+
+    turns = sum(len(s["messages"]) for s in scripts)
+    think = think_time_summary(scripts)
+    print(f"{Colors.GREEN}✓ {len(scripts)}/{len(paths)} sessions · {turns} messages → {output}{Colors.END}")
+    if think["count"]:
+        print(f"  {Colors.DIM}Temps de réflexion : {think['count']} pauses · p50 {think['p50']:.1f}s · "
+              f"p90 {think['p90']:.1f}s · max {think['max']:.1f}s{Colors.END}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,273 @@
+"""
+Chat4Lead — Métriques live pendant un run
+==========================================
+`LiveMetrics` agrège au fil de l'eau : conversations en vol, scénarios
+terminés / échoués, requêtes par statut HTTP, retries, erreurs,
+percentiles de latence et tokens/s sur une fenêtre glissante.
+
+Exposition au format texte Prometheus :
+  - `--metrics-port 9464` : endpoint local http://127.0.0.1:9464/metrics ;
+  - `--metrics-file f.prom` : fichier réécrit périodiquement (atomique),
+    pour le textfile collector de node_exporter.
+
+`ProgressLine` affiche un résumé sur une seule ligne (`--progress`).
+"""
+
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+
+from config import METRICS_WINDOW_SECONDS, METRICS_FILE_INTERVAL
+from console import Colors
+from stats import fmt_ms, percentile
+
+PREFIX = "chat4lead_tests"
+QUANTILES = (50, 95, 99)
+
+
+class LiveMetrics:
+    """Compteurs et fenêtre glissante, alimentés par le runner (thread-safe)."""
+
+    def __init__(self, window_seconds: float = METRICS_WINDOW_SECONDS):
+        self.window = window_seconds
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.scenarios: Dict[str, int] = {"passed": 0, "failed": 0, "error": 0}
+        self.requests: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.retries = 0
+        self.messages = 0
+        self.latency_sum_ms = 0
+        self.tokens = 0
+        # (instant, latence ms, tokens) des messages de la fenêtre
+        self._recent: Deque[Tuple[float, int, int]] = deque()
+
+    def reset(self):
+        """Remet les compteurs à zéro (après l'échauffement)."""
+        with self._lock:
+            self.started = time.time()
+            self.in_flight = 0
+            self.scenarios = {"passed": 0, "failed": 0, "error": 0}
+            self.requests = {}
+            self.errors = {}
+            self.retries = 0
+            self.messages = 0
+            self.latency_sum_ms = 0
+            self.tokens = 0
+            self._recent.clear()
+
+    # ─── Alimentation ─────────────────────────
+
+    def conversation_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def conversation_finished(self, outcome: str):
+        """
+        `outcome` : passed | failed | error. En mode charge (sans assertions) :
+        passed = conversation menée au bout, error = interrompue par une erreur.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            self.scenarios[outcome] = self.scenarios.get(outcome, 0) + 1
+
+    def request_done(self, status: str):
+        """Une tentative HTTP : statut, ou nom de l'exception réseau."""
+        with self._lock:
+            self.requests[status] = self.requests.get(status, 0) + 1
+
+    def retried(self):
+        with self._lock:
+            self.retries += 1
+
+    def error(self, kind: str):
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def message_done(self, latency_ms: int, tokens: Optional[int]):
+        now = time.time()
+        with self._lock:
+            self.messages += 1
+            self.latency_sum_ms += latency_ms
+            self.tokens += tokens or 0
+            self._recent.append((now, latency_ms, tokens or 0))
+            self._trim(now)
+
+    def _trim(self, now: float):
+        while self._recent and self._recent[0][0] < now - self.window:
+            self._recent.popleft()
+
+    # ─── Lecture ──────────────────────────────
+
+    def snapshot(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            recent = list(self._recent)
+            snap = {
+                "elapsed_s": now - self.started,
+                "in_flight": self.in_flight,
+                "scenarios": dict(self.scenarios),
+                "requests": dict(self.requests),
+                "errors": dict(self.errors),
+                "retries": self.retries,
+                "messages": self.messages,
+                "latency_sum_ms": self.latency_sum_ms,
+                "tokens": self.tokens,
+            }
+        latencies = [lat for _, lat, _ in recent]
+        span = min(self.window, snap["elapsed_s"]) or 1
+        snap["latency_ms"] = {q: percentile(latencies, q) for q in QUANTILES}
+        snap["tokens_per_second"] = sum(tok for _, _, tok in recent) / span
+        snap["messages_per_second"] = len(recent) / span
+        return snap
+
+    def render(self) -> str:
+        """Format d'exposition texte Prometheus."""
+        s = self.snapshot()
+        lines = []
+
+        def metric(name: str, kind: str, help_: str, samples):
+            lines.append(f"# HELP {PREFIX}_{name} {help_}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                label_str = "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}" if labels else ""
+                lines.append(f"{PREFIX}_{name}{label_str} {value}")
+
+        metric("conversations_in_flight", "gauge", "Conversations en cours.", [({}, s["in_flight"])])
+        metric("scenarios_total", "counter", "Scénarios terminés, par résultat.",
+               [({"result": k}, v) for k, v in s["scenarios"].items()])
+        metric("requests_total", "counter", "Requêtes HTTP (chaque tentative), par statut.",
+               [({"status": k}, v) for k, v in sorted(s["requests"].items())])
+        metric("retries_total", "counter", "Requêtes rejouées (429/5xx, erreurs réseau).", [({}, s["retries"])])
+        metric("errors_total", "counter", "Erreurs de scénario ou de conversation, par type.",
+               [({"type": k}, v) for k, v in sorted(s["errors"].items())])
+        metric("tokens_total", "counter", "Tokens consommés (metadata.tokensUsed).", [({}, s["tokens"])])
+        metric("tokens_per_second", "gauge", f"Tokens/s sur les {self.window:.0f} dernières secondes.",
+               [({}, round(s["tokens_per_second"], 3))])
+        latency = [({"quantile": f"{q / 100:g}"}, round(s["latency_ms"][q], 1))
+                   for q in QUANTILES if s["latency_ms"][q] is not None]
+        metric("message_latency_ms", "summary",
+               f"Latence client des messages (quantiles sur {self.window:.0f}s glissantes).", latency)
+        lines.append(f"{PREFIX}_message_latency_ms_sum {s['latency_sum_ms']}")
+        lines.append(f"{PREFIX}_message_latency_ms_count {s['messages']}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ══════════════════════════════════════════════
+#  EXPOSITION
+# ══════════════════════════════════════════════
+
+class MetricsServer:
+    """Endpoint /metrics local (thread dédié)."""
+
+    def __init__(self, metrics: LiveMetrics, port: int, host: str = "127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _Periodic(ABC):
+    """Thread daemon appelant `tick()` toutes les `interval` secondes jusqu'à stop()."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.tick()
+
+    @abstractmethod
+    def tick(self):
+        """Une itération : export, ligne de progression…"""
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1)
+        self.tick()
+
+
+class TextfileExporter(_Periodic):
+    """Réécrit le fichier .prom (tmp + rename : jamais lu à moitié écrit)."""
+
+    def __init__(self, metrics: LiveMetrics, path: Path, interval: float = METRICS_FILE_INTERVAL):
+        super().__init__(interval)
+        self.metrics = metrics
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def tick(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.metrics.render())
+        os.replace(tmp, self.path)
+
+
+class ProgressLine(_Periodic):
+    """Une ligne de progression réécrite sur place (\\r)."""
+
+    def __init__(self, metrics: LiveMetrics, total: Optional[int] = None, interval: float = 1.0):
+        super().__init__(interval)
+        self.metrics = metrics
+        self.total = total
+
+    def tick(self):
+        s = self.metrics.snapshot()
+        sc = s["scenarios"]
+        done = sc["passed"] + sc["failed"] + sc["error"]
+        progress = f"{done}/{self.total}" if self.total else f"{done}"
+        errors = sum(s["errors"].values())
+        err = f"{Colors.RED}{errors} err{Colors.END}" if errors else "0 err"
+        sys.stdout.write(
+            f"\r  {Colors.DIM}t={s['elapsed_s']:5.0f}s{Colors.END}  [{progress}]  "
+            f"{Colors.GREEN}✓{sc['passed']}{Colors.END} {Colors.RED}✗{sc['failed'] + sc['error']}{Colors.END}  "
+            f"en vol={s['in_flight']}  p50={fmt_ms(s['latency_ms'][50])} p95={fmt_ms(s['latency_ms'][95])}  "
+            f"{s['tokens_per_second']:.0f} tok/s  {s['retries']} retry  {err}   "
+        )
+        sys.stdout.flush()
+
+    def stop(self):
+        super().stop()
+        sys.stdout.write("\n")
+        sys.stdout.flush()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Chat4Lead — Benchmark des routes de lecture (dashboard)
+========================================================
+Le runner ne mesure que l'écriture (POST /message). Le dashboard lit :
+  - GET /api/conversation/:id          conversation complète
+  - GET /api/conversations             liste paginée (1re page et pages profondes)
+  - GET /api/analytics/satisfaction
+  - GET /api/analytics/negative-comments
+dont le coût croît avec le volume de conversations et de messages.
+
+Pour chaque palier (1k, 10k, 100k conversations par défaut), la base
+locale est complétée par le seed Prisma `prisma/seed-bench.ts` (entreprise
+« bench » dédiée, paliers croissants réutilisés), puis chaque route est
+mesurée en boucle fermée par N clients simultanés pendant une durée fixe :
+débit, percentiles de latence, taille des réponses.
+
+Un fichier par palier et par run (READBENCH_DIR/tier-<n>_<ts>.json) : le
+tableau final compare le dernier run de chaque palier, même lancés
+séparément, et signale les falaises (p95 × READBENCH_CLIFF_RATIO ou plus
+d'un palier au suivant).
+
+Usage:
+    python runner.py readbench                              # paliers de config.READBENCH_TIERS
+    python runner.py readbench --tiers 1000 10000 --concurrency 16 --duration 30
+    python runner.py readbench --no-seed                    # base actuelle, clé config.API_KEY
+    python runner.py readbench --report                     # compare les derniers fichiers, sans mesurer
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import threading
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import requests
+
+from config import (
+    API_URL, API_KEY, TIMEOUT,
+    READBENCH_TIERS, READBENCH_MESSAGES, READBENCH_DURATION, READBENCH_CONCURRENCY,
+    READBENCH_CLIFF_RATIO, READBENCH_DIR,
+)
+from console import Colors
+from stats import fmt_ms, latency_summary
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SEED_SCRIPT = "prisma/seed-bench.ts"
+PAGE_SIZE = 20
+ID_POOL = 500                  # conversations échantillonnées pour GET /conversation/:id
+
+
+# ══════════════════════════════════════════════
+#  SEED
+# ══════════════════════════════════════════════
+
+def seed_tier(conversations: int, messages: int) -> Dict:
+    """Complète la base jusqu'à `conversations` (seed Prisma) ; renvoie clé API et volumes réels."""
+    proc = subprocess.run(
+        ["npx", "tsx", SEED_SCRIPT, "--conversations", str(conversations), "--messages", str(messages)],
+        cwd=BACKEND_DIR, stdout=subprocess.PIPE, text=True, check=True,
+    )
+    lines = [line for line in proc.stdout.splitlines() if line.strip()]
+    return json.loads(lines[-1])
+
+
+# ══════════════════════════════════════════════
+#  MESURE
+# ══════════════════════════════════════════════
+
+class ReadBench:
+    """Clients HTTP en boucle fermée sur une route, pool de connexions partagé."""
+
+    def __init__(self, api_url: str, api_key: str, concurrency: int, duration: float):
+        self.api_url = api_url.rstrip("/")
+        self.concurrency = concurrency
+        self.duration = duration
+        self.session = requests.Session()
+        self.session.headers.update({'x-api-key': api_key})
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(concurrency, 10))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.conversation_ids: List[str] = []
+        self.total = 0
+
+    def health_check(self) -> Dict:
+        root = self.api_url[:-4] if self.api_url.endswith("/api") else self.api_url
+        r = self.session.get(f"{root}/health", timeout=10)
+        r.raise_for_status()
+        return r.json()
+
+    def sample(self, rng: random.Random):
+        """Nombre de conversations visibles et échantillon d'IDs réparti sur toute la liste."""
+        first = self._get_json("/conversations?limit=100")
+        self.total = first["total"]
+        ids = [c["id"] for c in first["conversations"]]
+        for _ in range(min(4, self.total // 100)):
+            offset = rng.randrange(0, max(1, self.total - 100))
+            ids += [c["id"] for c in self._get_json(f"/conversations?limit=100&offset={offset}")["conversations"]]
+        self.conversation_ids = list(dict.fromkeys(ids))[:ID_POOL]
+
+    def _get_json(self, path: str) -> Dict:
+        r = self.session.get(self.api_url + path, timeout=TIMEOUT)
+        r.raise_for_status()
+        return r.json()
+
+    def endpoints(self) -> Dict[str, Callable[[random.Random], str]]:
+        """Nom → générateur de chemin (tiré au hasard à chaque requête)."""
+        deepest = max(0, self.total - PAGE_SIZE)
+        routes = {
+            "conversation": lambda rng: f"/conversation/{rng.choice(self.conversation_ids)}",
+            "list": lambda rng: f"/conversations?limit={PAGE_SIZE}",
+            # OFFSET profond : le coût du skip croît avec le volume
+            "list_deep": lambda rng: f"/conversations?limit={PAGE_SIZE}&offset={rng.randint(deepest // 2, deepest)}",
+            "satisfaction": lambda rng: "/analytics/satisfaction",
+            "negative_comments": lambda rng: "/analytics/negative-comments",
+        }
+        if not self.conversation_ids:
+            del routes["conversation"]
+        return routes
+
+    def measure(self, name: str, path_for: Callable[[random.Random], str], warmup: int = 3) -> Dict:
+        """`concurrency` clients enchaînent les requêtes pendant `duration` secondes."""
+        warm_rng = random.Random(name)
+        for _ in range(warmup):
+            self.session.get(self.api_url + path_for(warm_rng), timeout=TIMEOUT)
+
+        lock = threading.Lock()
+        latencies = array("d")
+        sizes = array("l")
+        statuses: Dict[str, int] = {}
+        deadline = time.perf_counter() + self.duration
+
+        def client(k: int):
+            rng = random.Random(f"{name}:{k}")
+            local_lat, local_size, local_status = array("d"), array("l"), {}
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    r = self.session.get(self.api_url + path_for(rng), timeout=TIMEOUT)
+                    status = str(r.status_code)
+                    if r.ok:
+                        local_lat.append((time.perf_counter() - start) * 1000)
+                        local_size.append(len(r.content))
+                except requests.RequestException as e:
+                    status = type(e).__name__
+                local_status[status] = local_status.get(status, 0) + 1
+            with lock:
+                latencies.extend(local_lat)
+                sizes.extend(local_size)
+                for status, count in local_status.items():
+                    statuses[status] = statuses.get(status, 0) + count
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(k,), name=f"readbench-{k}") for k in range(self.concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        requests_total = sum(statuses.values())
+        errors = requests_total - len(latencies)
+        return {
+            "requests": requests_total,
+            "errors": errors,
+            "statuses": statuses,
+            "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0,
+            "latency_ms": latency_summary([round(v, 1) for v in latencies]),
+            "bytes_mean": round(sum(sizes) / len(sizes)) if sizes else None,
+        }
+
+
+def run_tier(tier: Optional[int], args) -> Dict:
+    """Seed (sauf --no-seed) puis mesure de chaque route. Renvoie le résultat du palier."""
+    api_key = API_KEY
+    volumes: Dict = {}
+    if tier is not None and not args.no_seed:
+        print(f"\n  {Colors.BOLD}🌱 Palier {tier:,} conversations{Colors.END}".replace(",", " "))
+        volumes = seed_tier(tier, args.messages)
+        api_key = volumes["apiKey"]
+        if volumes["conversations"] > tier:
+            print(f"{Colors.YELLOW}⚠  La base contient déjà {volumes['conversations']} conversations bench "
+                  f"(> {tier}) : le palier mesure ce volume.{Colors.END}")
+
+    bench = ReadBench(args.api_url, api_key, args.concurrency, args.duration)
+    bench.health_check()
+    bench.sample(random.Random(0))
+    tier = tier if tier is not None else bench.total
+    print(f"  ✓ {bench.total} conversations visibles, {len(bench.conversation_ids)} IDs échantillonnés "
+          f"| {args.concurrency} clients × {args.duration:.0f}s par route")
+
+    endpoints = {}
+    for name, path_for in bench.endpoints().items():
+        if args.endpoints and name not in args.endpoints:
+            continue
+        endpoints[name] = result = bench.measure(name, path_for)
+        lat = result["latency_ms"]
+        err = f"  {Colors.RED}{result['errors']} err{Colors.END}" if result["errors"] else ""
+        print(f"     {name:<18} {result['throughput_rps']:>7.1f} req/s  p50 {fmt_ms(lat['p50']):>7}  "
+              f"p95 {fmt_ms(lat['p95']):>7}  p99 {fmt_ms(lat['p99']):>7}{err}")
+
+    return {
+        "tier": tier,
+        "timestamp": datetime.now().isoformat(),
+        "api_url": args.api_url,
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "conversations": volumes.get("conversations", bench.total),
+        "messages": volumes.get("messages"),
+        "endpoints": endpoints,
+    }
+
+
+# ══════════════════════════════════════════════
+#  STOCKAGE ET COMPARAISON
+# ══════════════════════════════════════════════
+
+def save_tier(result: Dict, directory: Path = Path(READBENCH_DIR)) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    path = directory / f"tier-{result['tier']}_{ts}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def latest_tiers(directory: Path = Path(READBENCH_DIR)) -> List[Dict]:
+    """Dernier résultat de chaque palier, par volume croissant."""
+    latest: Dict[int, Path] = {}
+    for path in sorted(directory.glob("tier-*_*.json")):   # horodatage ISO : tri = ordre chronologique
+        latest[int(path.stem.split("_", 1)[0][len("tier-"):])] = path
+    results = []
+    for tier in sorted(latest):
+        with open(latest[tier], 'r', encoding='utf-8') as f:
+            results.append(json.load(f))
+    return results
+
+
+def scaling(tiers: Sequence[Dict]) -> Dict[str, List[Dict]]:
+    """Par route : une ligne par palier, avec le facteur p95 vis-à-vis du palier précédent."""
+    table: Dict[str, List[Dict]] = {}
+    for result in tiers:
+        for name, data in result["endpoints"].items():
+            rows = table.setdefault(name, [])
+            p95 = data["latency_ms"]["p95"]
+            previous = rows[-1]["p95"] if rows else None
+            ratio = round(p95 / previous, 2) if p95 is not None and previous else None
+            rows.append({
+                "tier": result["tier"],
+                "conversations": result["conversations"],
+                "rps": data["throughput_rps"],
+                "p50": data["latency_ms"]["p50"],
+                "p95": p95,
+                "p99": data["latency_ms"]["p99"],
+                "bytes_mean": data["bytes_mean"],
+                "errors": data["errors"],
+                "p95_ratio": ratio,
+                "cliff": ratio is not None and ratio >= READBENCH_CLIFF_RATIO,
+            })
+    return table
+
+
+def print_scaling(table: Dict[str, List[Dict]]):
+    print(f"\n{'═'*70}")
+    print(f"  {Colors.BOLD}📚  ROUTES DE LECTURE — passage à l'échelle{Colors.END}")
+    print(f"{'═'*70}")
+    cliffs = []
+    for name, rows in table.items():
+        print(f"\n  {Colors.BOLD}{name}{Colors.END}")
+        print(f"     {'Palier':>8} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'octets':>9} {'err':>5} {'× p95':>7}")
+        for row in rows:
+            ratio = f"{row['p95_ratio']:.1f}×" if row["p95_ratio"] is not None else "—"
+            if row["cliff"]:
+                ratio = f"{Colors.RED}{ratio:>7}{Colors.END}"
+                cliffs.append(f"{name} @ {row['tier']}")
+            size = f"{row['bytes_mean']:,}".replace(",", " ") if row["bytes_mean"] is not None else "—"
+            print(f"     {row['tier']:>8} {row['rps']:>8.1f} {fmt_ms(row['p50']):>8} {fmt_ms(row['p95']):>8} "
+                  f"{fmt_ms(row['p99']):>8} {size:>9} {row['errors']:>5} {ratio:>7}")
+    if cliffs:
+        print(f"\n  {Colors.RED}⚠  Falaises (p95 ×{READBENCH_CLIFF_RATIO:g} ou plus d'un palier au suivant) : "
+              f"{', '.join(cliffs)}{Colors.END}")
+    print(f"{'═'*70}\n")
+
+
+# ══════════════════════════════════════════════
+#  CLI
+# ══════════════════════════════════════════════
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="runner.py readbench", description="Chat4Lead — Benchmark des routes de lecture")
+    parser.add_argument("--tiers", nargs="+", type=int, default=list(READBENCH_TIERS), metavar="N",
+                        help=f"Conversations en base par palier (défaut: {' '.join(map(str, READBENCH_TIERS))})")
+    parser.add_argument("--messages", type=int, default=READBENCH_MESSAGES,
+                        help=f"Messages par conversation seedée (défaut: {READBENCH_MESSAGES})")
+    parser.add_argument("--concurrency", type=int, default=READBENCH_CONCURRENCY,
+                        help=f"Clients simultanés (défaut: {READBENCH_CONCURRENCY})")
+    parser.add_argument("--duration", type=float, default=READBENCH_DURATION,
+                        help=f"Secondes de mesure par route (défaut: {READBENCH_DURATION})")
+    parser.add_argument("--endpoints", nargs="+", metavar="ROUTE",
+                        help="Sous-ensemble : conversation list list_deep satisfaction negative_comments")
+    parser.add_argument("--api-url", default=API_URL, help="API à mesurer (défaut: config.API_URL)")
+    parser.add_argument("--no-seed", action="store_true",
+                        help="Pas de seed : mesure la base actuelle (un palier, clé config.API_KEY)")
+    parser.add_argument("--report", action="store_true", help="Compare les derniers résultats stockés, sans mesurer")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1 or args.duration <= 0 or min(args.tiers) < 1:
+        parser.error("--tiers, --concurrency et --duration doivent être > 0")
+
+    if not args.report:
+        tiers = [None] if args.no_seed else sorted(set(args.tiers))
+        for tier in tiers:
+            try:
+                result = run_tier(tier, args)
+            except FileNotFoundError:
+                print(f"{Colors.RED}❌  npx introuvable : le seed Prisma nécessite Node (npm install dans backend/){Colors.END}")
+                return 1
+            except subprocess.CalledProcessError as e:
+                print(f"{Colors.RED}❌  Seed en échec (code {e.returncode}) — base accessible ? DATABASE_URL ?{Colors.END}")
+                return 1
+            except requests.RequestException as e:
+                print(f"{Colors.RED}❌  API injoignable : {e}{Colors.END}")
+                return 1
+            print(f"{Colors.BLUE}💾  Palier → {save_tier(result)}{Colors.END}")
+
+    tiers = latest_tiers()
+    if not tiers:
+        print(f"{Colors.YELLOW}Aucun résultat dans {READBENCH_DIR}.{Colors.END}")
+        return 0
+    print_scaling(scaling(tiers))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+"""
+Chat4Lead — Représentation compacte des résultats
+==================================================
+Un résultat complet (réponses du bot, lead, projetData, assertions)
+part sur disque dès la fin du scénario (flux JSONL, voir
+results_store.py). En mémoire ne reste qu'un `ScenarioRecord` : statut,
+quelques scalaires et des colonnes numériques par échange (latence,
+score, tokens) stockées dans des `array` plutôt que des listes de dicts.
+
+Un run de charge ou de répétition de 100k échanges garde ainsi une
+empreinte mémoire de quelques octets par échange.
+"""
+
+from array import array
+from typing import Dict, Iterator, Optional, Tuple
+
+from config import REPEAT_FIELDS
+
+MISSING = -1  # valeur absente dans une colonne (score ou tokens non renvoyés)
+
+
+def field_outcome(result: Dict, field: str) -> bool:
+    """Extraction du champ réussie ? (assertion finale si le scénario l'attend, sinon présence)."""
+    for assertion in result.get("assertions") or []:
+        if assertion["type"] == f"field.{field}" and "turn" not in assertion:
+            return assertion["passed"]
+    return (result.get("final_lead") or {}).get(field) not in (None, "")
+
+
+class ScenarioRecord:
+    """Résumé d'un résultat de scénario ; le transcript complet reste dans le JSONL."""
+
+    __slots__ = (
+        "id", "run", "passed", "aborted_at_turn", "cached", "error_count",
+        "duration_seconds", "final_score", "priorite", "fields",
+        "latency_ms", "score", "tokens",
+    )
+
+    def __init__(self, sid: str, run: Optional[int] = None):
+        self.id = sid
+        self.run = run
+        self.passed = False
+        self.aborted_at_turn: Optional[int] = None
+        self.cached = False
+        self.error_count = 0
+        self.duration_seconds = 0.0
+        self.final_score: Optional[int] = None
+        self.priorite: Optional[str] = None
+        self.fields: Tuple[bool, ...] = ()
+        self.latency_ms = array("l")
+        self.score = array("h")
+        self.tokens = array("l")
+
+    @classmethod
+    def from_result(cls, result: Dict, run: Optional[int] = None) -> "ScenarioRecord":
+        record = cls(result["id"], run if run is not None else result.get("run"))
+        record.passed = bool(result.get("passed"))
+        record.aborted_at_turn = result.get("aborted_at_turn")
+        record.cached = bool(result.get("cached"))
+        record.error_count = len(result.get("errors") or [])
+        record.duration_seconds = result.get("duration_seconds") or 0.0
+        record.final_score = result.get("final_score")
+        record.priorite = (result.get("final_lead") or {}).get("priorite")
+        record.fields = tuple(field_outcome(result, field) for field in REPEAT_FIELDS)
+        for ex in result.get("exchanges") or []:
+            if ex.get("latency_ms") is None:
+                continue
+            record.latency_ms.append(int(ex["latency_ms"]))
+            record.score.append(MISSING if ex.get("score") is None else int(ex["score"]))
+            record.tokens.append(MISSING if ex.get("tokens_used") is None else int(ex["tokens_used"]))
+        return record
+
+    def field(self, name: str) -> bool:
+        return self.fields[REPEAT_FIELDS.index(name)]
+
+    def present_tokens(self) -> Iterator[int]:
+        return (t for t in self.tokens if t != MISSING)
+
+    def total_tokens(self) -> Optional[int]:
+        """Tokens du scénario, None si le backend n'en a renvoyé aucun."""
+        values = list(self.present_tokens())
+        return sum(values) if values else None
+
+    def __repr__(self) -> str:
+        status = "PASS" if self.passed else "FAIL"
+        run = f" #{self.run}" if self.run is not None else ""
+        return f"<ScenarioRecord {self.id}{run} {status} {len(self.latency_ms)} échanges>"
@@ -0,0 +1,139 @@
+"""
+Chat4Lead — Répétition des scénarios et instabilité
+====================================================
+Les réponses du LLM varient d'un run à l'autre : un PASS/FAIL isolé ne
+dit pas grand-chose. `--repeat N` exécute chaque scénario N fois (en
+parallèle avec --concurrency) et rapporte, par scénario :
+  - le taux de réussite et son intervalle de confiance (Wilson, 95 %) ;
+  - la fiabilité d'extraction des champs suivis (REPEAT_FIELDS) : valeur
+    attendue trouvée si le scénario l'indique, sinon simple présence ;
+  - latence par message : moyenne, écart-type, percentiles.
+
+Les scénarios instables (ni toujours OK, ni toujours KO) sont classés du
+plus au moins instable. Les transcripts partent dans un flux JSONL au
+fil de l'eau ; les statistiques sont calculées sur des `ScenarioRecord`.
+
+    python runner.py --repeat 10 --concurrency 8
+"""
+
+from array import array
+from typing import Dict, List, Optional
+
+from config import REPEAT_FIELDS
+from console import Colors
+from records import ScenarioRecord
+from stats import fmt_ms, latency_summary, wilson_interval
+
+
+def _field_checked(scenario: Dict, field: str) -> str:
+    return "valeur" if field in (scenario.get("expected") or {}).get("fields", {}) else "présence"
+
+
+def _rate(ok: int, n: int) -> Dict:
+    low, high = wilson_interval(ok, n)
+    return {"ok": ok, "n": n, "rate": round(ok / n, 3) if n else None, "ci_low": low, "ci_high": high}
+
+
+def repeat_report(scenarios: List[Dict], records: List[ScenarioRecord], repeat: int,
+                  wall_clock: Optional[float] = None) -> Dict:
+    """Agrège les N exécutions de chaque scénario."""
+    by_id: Dict[str, List[ScenarioRecord]] = {}
+    for record in records:
+        by_id.setdefault(record.id, []).append(record)
+
+    rows = []
+    field_totals = {field: [0, 0] for field in REPEAT_FIELDS}
+    for scenario in scenarios:
+        runs = by_id.get(scenario["id"], [])
+        if not runs:
+            continue
+        passed = sum(1 for r in runs if r.passed)
+        fields = {}
+        for field in REPEAT_FIELDS:
+            ok = sum(1 for r in runs if r.field(field))
+            fields[field] = _rate(ok, len(runs)) | {"checked": _field_checked(scenario, field)}
+            field_totals[field][0] += ok
+            field_totals[field][1] += len(runs)
+        latencies = array("l")
+        for r in runs:
+            latencies.extend(r.latency_ms)
+        tokens = [t for t in (r.total_tokens() for r in runs) if t is not None]
+        rows.append({
+            "id": scenario["id"],
+            "name": scenario["name"],
+            "runs": len(runs),
+            "passed": passed,
+            **{k: v for k, v in _rate(passed, len(runs)).items() if k not in ("ok", "n")},
+            "flaky": 0 < passed < len(runs),
+            # 0 = stable, 0.5 = pile ou face
+            "instability": round(min(passed, len(runs) - passed) / len(runs), 3),
+            "errors": sum(1 for r in runs if r.error_count),
+            "fields": fields,
+            "latency_ms": latency_summary(latencies),
+            "duration_s": latency_summary([r.duration_seconds for r in runs]),
+            "tokens_mean": round(sum(tokens) / len(tokens)) if tokens else None,
+        })
+
+    def unstable_fields(row: Dict) -> float:
+        return sum(min(f["ok"], f["n"] - f["ok"]) / f["n"] for f in row["fields"].values())
+
+    flaky = sorted(
+        (row for row in rows if row["flaky"]),
+        key=lambda row: (row["instability"], unstable_fields(row)),
+        reverse=True,
+    )
+    total_runs = sum(row["runs"] for row in rows)
+    total_passed = sum(row["passed"] for row in rows)
+    return {
+        "mode": "repeat",
+        "repeat": repeat,
+        "wall_clock_seconds": round(wall_clock, 1) if wall_clock is not None else None,
+        "overall": _rate(total_passed, total_runs),
+        "fields": {field: _rate(ok, n) for field, (ok, n) in field_totals.items()},
+        "scenarios": rows,
+        "flaky": [row["id"] for row in flaky],
+    }
+
+
+def _pct(value: Optional[float]) -> str:
+    return "—" if value is None else f"{value:.0%}"
+
+
+def _ci(rate: Dict) -> str:
+    return f"[{_pct(rate['ci_low'])}–{_pct(rate['ci_high'])}]"
+
+
+def print_repeat_report(report: Dict):
+    """Affiche taux de réussite, fiabilité des champs, latences et classement des instables."""
+    print(f"\n{'═'*70}")
+    print(f"  {Colors.BOLD}🔁  RÉPÉTITION — {report['repeat']} exécutions par scénario{Colors.END}")
+    print(f"{'═'*70}")
+    field_header = " ".join(f"{field[:6]:>6}" for field in REPEAT_FIELDS)
+    print(f"  {'Scénario':<22} {'Réussite':>12}  {'IC 95 %':<11} {field_header}  {'moy ± σ':>13}  {'p95':>7}")
+    for row in report["scenarios"]:
+        color = Colors.GREEN if row["passed"] == row["runs"] else Colors.RED if not row["passed"] else Colors.YELLOW
+        fields = " ".join(f"{_pct(row['fields'][field]['rate']):>6}" for field in REPEAT_FIELDS)
+        lat = row["latency_ms"]
+        spread = f"{fmt_ms(lat['mean'])} ± {lat['stddev']:.0f}" if lat["count"] else "—"
+        print(f"  {row['id'][:22]:<22} {color}{row['passed']:>3}/{row['runs']:<3} {_pct(row['rate']):>4}{Colors.END}"
+              f"  {_ci(row):<11} {fields}  {spread:>13}  {fmt_ms(lat['p95']):>7}")
+
+    overall = report["overall"]
+    print(f"\n  Global :      {overall['ok']}/{overall['n']} ({_pct(overall['rate'])}, IC 95 % {_ci(overall)})")
+    print("  Champs :      " + " · ".join(
+        f"{field} {_pct(rate['rate'])} {_ci(rate)}" for field, rate in report["fields"].items()
+    ))
+    if report.get("wall_clock_seconds") is not None:
+        print(f"  Durée :       {report['wall_clock_seconds']:.0f}s")
+
+    if report["flaky"]:
+        rows = {row["id"]: row for row in report["scenarios"]}
+        print(f"\n  {Colors.YELLOW}🎲 Scénarios instables (du plus au moins instable) :{Colors.END}")
+        for rank, sid in enumerate(report["flaky"], 1):
+            row = rows[sid]
+            shaky = [field for field, rate in row["fields"].items() if 0 < rate["ok"] < rate["n"]]
+            detail = f" — champs variables : {', '.join(shaky)}" if shaky else ""
+            print(f"     {rank}. {sid}  {row['passed']}/{row['runs']} {_ci(row)}{detail}")
+    else:
+        print(f"\n  {Colors.GREEN}Aucun scénario instable sur {report['repeat']} exécutions.{Colors.END}")
+    print(f"{'═'*70}\n")
@@ -0,0 +1,425 @@
+"""
+Chat4Lead — Rapport HTML
+=========================
+Rapport paginé qui reste léger quel que soit le nombre de résultats :
+
+    reports/
+      assets/report.css, assets/report.js     ← partagés par tous les rapports
+      report_<ts>.html                        ← page principale (résumé + tableau)
+      report_<ts>_data/index.js               ← 1 ligne compacte par scénario
+      report_<ts>_data/chunk_0000.js, …       ← conversations complètes, par paquets
+
+Les résultats sont écrits au fil de l'eau (un seul passage, mémoire
+constante). Côté navigateur, le tableau est paginé et filtrable
+(statut, priorité, latence, texte) et chaque conversation n'est chargée
+qu'à l'ouverture de sa ligne. Les données sont des fichiers .js chargés
+par <script> pour fonctionner aussi en file:// (pas de fetch/CORS).
+"""
+
+import json
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from config import REPORTS_DIR
+from console import Colors
+from stats import fmt_ms, percentile
+
+CHUNK_SIZE = 50     # résultats complets par fichier chunk
+PAGE_SIZE = 50      # lignes par page du tableau
+
+
+def _js(value) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+def _index_row(position: int, r: Dict) -> Dict:
+    """Ligne compacte du tableau de synthèse."""
+    latencies = [ex["latency_ms"] for ex in r.get("exchanges", []) if ex.get("latency_ms") is not None]
+    perf = r.get("perf") or {}
+    lead = r.get("final_lead") or {}
+    return {
+        "i": position,
+        "id": r["id"],
+        "n": r.get("name", ""),
+        "p": bool(r.get("passed")),
+        "pr": lead.get("priorite"),
+        "s": r.get("final_score"),
+        "m": r.get("messages_sent", 0),
+        "d": r.get("duration_seconds", 0),
+        "lm": round(sum(latencies) / len(latencies)) if latencies else None,
+        "lx": max(latencies) if latencies else None,
+        "lo": round(perf["overhead_ms"] / perf["exchanges"]) if perf.get("llm_share") is not None else None,
+        "t": perf.get("tokens"),
+        "e": len(r.get("errors") or []),
+        "c": bool(r.get("cached")),
+    }
+
+
+class _ChunkWriter:
+    """Écrit les résultats complets par paquets de CHUNK_SIZE."""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        self.count = 0
+        self._file = None
+
+    def add(self, r: Dict):
+        chunk, offset = divmod(self.count, CHUNK_SIZE)
+        if offset == 0:
+            self._close_current()
+            self._file = open(self.data_dir / f"chunk_{chunk:04d}.js", 'w', encoding='utf-8')
+            self._file.write(f"window.C4L_CHUNK({chunk},[\n")
+        else:
+            self._file.write(",\n")
+        self._file.write(_js(r))
+        self.count += 1
+
+    def _close_current(self):
+        if self._file:
+            self._file.write("\n]);\n")
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._close_current()
+
+
+def generate_html_report(results: Iterable[Dict], filename: str, summary: Optional[Dict] = None) -> Path:
+    """
+    Écrit le rapport en streaming depuis n'importe quel itérable de résultats.
+    `summary` : agrégats du run (runner.run_summary) pour les cartes de coût.
+    """
+    started = time.perf_counter()
+    reports_dir = Path(REPORTS_DIR)
+    data_name = Path(filename).stem + "_data"
+    data_dir = reports_dir / data_name
+    data_dir.mkdir(parents=True, exist_ok=True)
+    _write_assets(reports_dir / "assets")
+
+    total = passed_count = 0
+    total_duration = 0.0
+    ttfts = array("l")   # colonne compacte : mémoire ~8 octets par échange
+    chunks = _ChunkWriter(data_dir)
+
+    with open(data_dir / "index.js", 'w', encoding='utf-8') as index:
+        index.write("window.C4L_INDEX=[\n")
+        for r in results:
+            if total:
+                index.write(",\n")
+            index.write(_js(_index_row(total, r)))
+            chunks.add(r)
+
+            total += 1
+            passed_count += 1 if r.get("passed") else 0
+            total_duration += r.get("duration_seconds", 0) or 0
+            ttfts.extend(
+                ex["ttft_ms"] for ex in r.get("exchanges", []) if ex.get("ttft_ms") is not None
+            )
+        index.write("\n];\n")
+    chunks.close()
+
+    failed_count = total - passed_count
+    rate = (passed_count / total * 100) if total else 0
+    rate_color = "var(--green)" if rate >= 80 else "var(--amber)" if rate >= 60 else "var(--red)"
+    now_str = datetime.now().strftime('%d/%m/%Y à %H:%M:%S')
+
+    cards = [
+        (total, "Tests exécutés", None),
+        (passed_count, "Réussis", "var(--green)"),
+        (failed_count, "Échoués", "var(--red)"),
+        (f"{rate:.0f}%", "Taux de succès", rate_color),
+    ]
+    if (summary or {}).get("slo_failed"):
+        cards.append((summary["slo_failed"], "Hors SLO (latence / tokens)", "var(--red)"))
+    if ttfts:
+        cards.append((fmt_ms(percentile(ttfts, 50)), "TTFT p50", None))
+        cards.append((fmt_ms(percentile(ttfts, 95)), "TTFT p95", None))
+    perf = (summary or {}).get("perf") or {}
+    if perf.get("llm_share") is not None:
+        cards.append((f"{perf['llm_share']:.0%}", "Part LLM du temps client", None))
+        cards.append((fmt_ms(perf["overhead_p50_ms"]), "Pipeline p50 / tour", None))
+    split = (summary or {}).get("cold_warm") or {}
+    if (split.get("cold") or {}).get("exchanges") and split["warm"]["exchanges"]:
+        cards.append((f"{fmt_ms(split['cold']['p50_ms'])} → {fmt_ms(split['warm']['p50_ms'])}",
+                      f"p50 froid → chaud ({split['cold']['exchanges']} froids)", None))
+    if perf.get("tokens") is not None:
+        cards.append((f"{perf['tokens']:,}".replace(",", " "), "Tokens consommés", None))
+    if (summary or {}).get("tokens_per_qualified_lead") is not None:
+        cards.append((summary["tokens_per_qualified_lead"], "Tokens / lead qualifié", None))
+    cards_html = "\n".join(
+        f'  <div class="stat"><div class="stat-value" style="color:{color or "inherit"}">{value}</div>'
+        f'<div class="stat-label">{label}</div></div>'
+        for value, label, color in cards
+    )
+
+    filepath = reports_dir / filename
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Rapport Tests Chat4Lead — {now_str}</title>
+<link rel="stylesheet" href="assets/report.css">
+</head>
+<body>
+<div class="container">
+<h1>📊 Rapport Tests Chat4Lead</h1>
+<p class="subtitle">Généré le {now_str} — Durée totale : {total_duration:.0f}s</p>
+
+<div class="summary">
+{cards_html}
+</div>
+
+<div class="filters">
+  <select id="f-status"><option value="">Tous statuts</option><option value="pass">✓ PASS</option><option value="fail">✗ FAIL</option></select>
+  <select id="f-priority"><option value="">Toutes priorités</option></select>
+  <label>Latence max ≥ <input id="f-latency" type="number" min="0" step="500" placeholder="ms"></label>
+  <input id="f-text" type="search" placeholder="Rechercher un ID ou un nom…">
+  <span id="f-count" class="muted"></span>
+</div>
+
+<table class="results">
+  <thead><tr>
+    <th>ID</th><th>Scénario</th><th>Statut</th><th>Priorité</th><th>Score</th>
+    <th>Msgs</th><th>Latence moy.</th><th>Latence max</th><th>Pipeline moy.</th><th>Tokens</th><th>Durée</th>
+  </tr></thead>
+  <tbody id="rows"></tbody>
+</table>
+<div class="pager"><button id="prev">← Préc.</button><span id="page"></span><button id="next">Suiv. →</button></div>
+</div>
+<script>window.C4L_REPORT={_js({"dataDir": data_name, "chunkSize": CHUNK_SIZE, "pageSize": PAGE_SIZE})};</script>
+<script src="{data_name}/index.js"></script>
+<script src="assets/report.js"></script>
+</body>
+</html>
+""")
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"{Colors.BLUE}📄  Rapport HTML → {filepath}{Colors.END}  "
+          f"{Colors.DIM}({total} résultats, {elapsed_ms:.0f}ms){Colors.END}")
+    return filepath
+
+
+def _write_assets(assets_dir: Path):
+    assets_dir.mkdir(parents=True, exist_ok=True)
+    (assets_dir / "report.css").write_text(REPORT_CSS, encoding='utf-8')
+    (assets_dir / "report.js").write_text(REPORT_JS, encoding='utf-8')
+
+
+REPORT_CSS = """:root {
+  --bg: #0f172a; --card: #1e293b; --border: #334155;
+  --text: #e2e8f0; --muted: #94a3b8; --accent: #6366f1;
+  --green: #10b981; --red: #ef4444; --amber: #f59e0b;
+}
+* { box-sizing: border-box; margin: 0; padding: 0; }
+body { font-family: 'Segoe UI', system-ui, -apple-system, sans-serif; background: var(--bg); color: var(--text); line-height: 1.6; }
+.container { max-width: 1200px; margin: 0 auto; padding: 40px 24px; }
+h1 { font-size: 28px; margin-bottom: 4px; }
+.subtitle, .muted { color: var(--muted); }
+.subtitle { margin-bottom: 32px; }
+
+/* Summary cards */
+.summary { display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 16px; margin-bottom: 32px; }
+.stat { background: var(--card); border: 1px solid var(--border); border-radius: 12px; padding: 24px; text-align: center; }
+.stat-value { font-size: 36px; font-weight: 700; }
+.stat-label { color: var(--muted); font-size: 13px; margin-top: 4px; text-transform: uppercase; letter-spacing: .5px; }
+
+/* Filters + table */
+.filters { display: flex; flex-wrap: wrap; gap: 12px; align-items: center; margin-bottom: 16px; font-size: 14px; }
+.filters select, .filters input { background: var(--card); color: var(--text); border: 1px solid var(--border); border-radius: 8px; padding: 6px 10px; }
+.filters input[type=number] { width: 100px; }
+table.results { width: 100%; border-collapse: collapse; background: var(--card); border-radius: 12px; overflow: hidden; font-size: 14px; }
+table.results th { text-align: left; padding: 10px 12px; background: rgba(99,102,241,.1); color: var(--accent); font-size: 12px; text-transform: uppercase; letter-spacing: .5px; }
+table.results td { padding: 10px 12px; border-top: 1px solid var(--border); }
+tr.row { cursor: pointer; }
+tr.row:hover { background: rgba(99,102,241,.06); }
+tr.detail > td { padding: 0 24px 24px; background: rgba(15,23,42,.4); }
+.pager { display: flex; gap: 16px; justify-content: center; align-items: center; margin-top: 16px; }
+.pager button { background: var(--card); color: var(--text); border: 1px solid var(--border); border-radius: 8px; padding: 6px 14px; cursor: pointer; }
+.pager button:disabled { opacity: .4; cursor: default; }
+
+.badge { display: inline-block; padding: 4px 14px; border-radius: 20px; font-size: 12px; font-weight: 700; letter-spacing: .5px; }
+.badge.pass { background: rgba(16,185,129,.15); color: var(--green); }
+.badge.fail { background: rgba(239,68,68,.15); color: var(--red); }
+
+/* Conversation */
+.exchange { margin: 8px 0; }
+.msg { padding: 10px 14px; border-radius: 10px; margin: 4px 0; max-width: 85%; font-size: 14px; }
+.msg.user { background: var(--accent); color: #fff; margin-left: auto; text-align: right; }
+.msg.bot  { background: #334155; }
+.msg-meta { font-size: 11px; color: var(--muted); margin-top: 2px; }
+
+/* Assertions */
+.assertion { display: flex; align-items: center; gap: 8px; padding: 8px 12px; border-radius: 8px; margin: 4px 0; font-size: 14px; }
+.assertion.pass { background: rgba(16,185,129,.08); }
+.assertion.fail { background: rgba(239,68,68,.08); }
+
+/* Lead info table */
+.lead-table { width: 100%; border-collapse: collapse; margin: 12px 0; }
+.lead-table td { padding: 8px 12px; border-bottom: 1px solid var(--border); font-size: 14px; }
+.lead-table td:first-child { color: var(--muted); width: 160px; }
+
+.section-title { font-size: 14px; font-weight: 600; color: var(--accent); margin: 20px 0 8px; text-transform: uppercase; letter-spacing: .5px; }
+.error { color: var(--red); font-size: 14px; }
+"""
+
+REPORT_JS = r"""(function () {
+  'use strict';
+  var cfg = window.C4L_REPORT;
+  var rows = window.C4L_INDEX || [];
+  var chunks = {}, waiting = {};
+  var state = { page: 0, open: {} };
+  var $ = function (id) { return document.getElementById(id); };
+
+  function esc(v) {
+    return String(v === null || v === undefined ? '' : v)
+      .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;')
+      .replace(/"/g, '&quot;').replace(/\n/g, '<br>');
+  }
+  function dash(v) { return v === null || v === undefined || v === '' ? '—' : v; }
+  function ms(v) { return v === null || v === undefined ? '—' : Math.round(v) + 'ms'; }
+
+  // ── Chargement paresseux des conversations (JSONP, compatible file://)
+  window.C4L_CHUNK = function (n, results) {
+    chunks[n] = results;
+    (waiting[n] || []).forEach(function (cb) { cb(results); });
+    delete waiting[n];
+  };
+  function withChunk(n, cb) {
+    if (chunks[n]) return cb(chunks[n]);
+    if (waiting[n]) return waiting[n].push(cb);
+    waiting[n] = [cb];
+    var s = document.createElement('script');
+    s.src = cfg.dataDir + '/chunk_' + ('000' + n).slice(-4) + '.js';
+    document.body.appendChild(s);
+  }
+
+  // ── Filtres
+  function filtered() {
+    var status = $('f-status').value, prio = $('f-priority').value;
+    var minLat = parseFloat($('f-latency').value), text = $('f-text').value.toLowerCase();
+    return rows.filter(function (r) {
+      if (status === 'pass' && !r.p) return false;
+      if (status === 'fail' && r.p) return false;
+      if (prio && r.pr !== prio) return false;
+      if (!isNaN(minLat) && !(r.lx >= minLat)) return false;
+      if (text && (r.id + ' ' + r.n).toLowerCase().indexOf(text) < 0) return false;
+      return true;
+    });
+  }
+
+  function renderDetail(r) {
+    var lead = r.final_lead || {}, projet = lead.projetData || {};
+    var h = '<div class="section-title">📋 Résumé</div><table class="lead-table">';
+    var summary = [['Description', esc(r.description)], ['Messages envoyés', r.messages_sent],
+     ['Score final', '<strong>' + dash(r.final_score) + '/100</strong>'],
+     ['Priorité', esc(dash(lead.priorite))], ['Prénom', esc(dash(lead.prenom))],
+     ['Nom', esc(dash(lead.nom))], ['Email', esc(dash(lead.email))],
+     ['Téléphone', esc(dash(lead.telephone))], ['Formule', esc(dash(projet.formule))],
+     ['Durée', r.duration_seconds + 's']
+    ];
+    if (r.aborted_at_turn) summary.push(['Arrêt (fail-fast)', 'tour ' + r.aborted_at_turn]);
+    var perf = r.perf || {};
+    if (perf.llm_share !== undefined && perf.llm_share !== null) {
+      summary.push(['Temps client', ms(perf.client_ms) + ' = LLM ' + ms(perf.llm_ms) + ' (' +
+        Math.round(perf.llm_share * 100) + '%) + pipeline ' + ms(perf.overhead_ms)]);
+    }
+    if (perf.tokens !== undefined && perf.tokens !== null) {
+      summary.push(['Tokens', perf.tokens + ' (' + perf.tokens_per_turn + '/tour)']);
+    }
+    summary.forEach(function (kv) { h += '<tr><td>' + kv[0] + '</td><td>' + kv[1] + '</td></tr>'; });
+    h += '</table>';
+
+    var asserts = r.assertions || [];
+    var ok = asserts.filter(function (a) { return a.passed; }).length;
+    h += '<div class="section-title">🔍 Assertions (' + ok + '/' + asserts.length + ')</div>';
+    asserts.forEach(function (a) {
+      h += '<div class="assertion ' + (a.passed ? 'pass' : 'fail') + '"><span>' + (a.passed ? '✓' : '✗') +
+        '</span><strong>' + esc(a.type) + '</strong>: attendu ' + esc(JSON.stringify(a.expected)) +
+        ', obtenu ' + esc(JSON.stringify(a.actual)) + '</div>';
+    });
+
+    var ex = r.exchanges || [];
+    if (ex.length) {
+      h += '<div class="section-title">💬 Conversation (' + ex.length + ' échanges)</div>';
+      ex.forEach(function (e) {
+        var meta = ms(e.latency_ms);
+        if (e.ttft_ms !== undefined && e.ttft_ms !== null) {
+          meta += ' · TTFT ' + ms(e.ttft_ms) + ' · ' + (e.chunks || 0) + ' chunks · écart max ' + ms(e.chunk_gap_max_ms || 0);
+        }
+        if (e.server_latency_ms !== undefined && e.server_latency_ms !== null) {
+          meta += ' · LLM ' + ms(e.server_latency_ms) + ' + pipeline ' + ms(e.overhead_ms);
+        }
+        if (e.tokens_used !== undefined && e.tokens_used !== null) meta += ' · ' + e.tokens_used + ' tokens';
+        if (e.cache_read_tokens !== undefined && e.cache_read_tokens !== null) meta += ' (' + e.cache_read_tokens + ' lus en cache)';
+        if (e.cold) meta += ' · ❄ froid : ' + esc(e.cold_reason);
+        h += '<div class="exchange"><div class="msg user">' + esc(e.user) + '</div><div class="msg bot">' +
+          esc(e.bot) + '</div><div class="msg-meta">' + meta + ' · score=' + dash(e.score) + '</div></div>';
+      });
+    }
+    if (r.errors && r.errors.length) {
+      h += '<div class="section-title" style="color:var(--red)">⚠️ Erreurs</div><p class="error">' +
+        r.errors.map(esc).join('<br>') + '</p>';
+    }
+    return h;
+  }
+
+  function toggle(r, tr) {
+    var next = tr.nextSibling;
+    if (next && next.className === 'detail') {
+      next.parentNode.removeChild(next);
+      delete state.open[r.i];
+      return;
+    }
+    state.open[r.i] = true;
+    var detail = document.createElement('tr');
+    detail.className = 'detail';
+    detail.innerHTML = '<td colspan="11"><p class="muted">Chargement…</p></td>';
+    tr.parentNode.insertBefore(detail, tr.nextSibling);
+    withChunk(Math.floor(r.i / cfg.chunkSize), function (results) {
+      detail.firstChild.innerHTML = renderDetail(results[r.i % cfg.chunkSize]);
+    });
+  }
+
+  function render() {
+    var list = filtered();
+    var pages = Math.max(1, Math.ceil(list.length / cfg.pageSize));
+    state.page = Math.min(state.page, pages - 1);
+    var body = $('rows');
+    body.innerHTML = '';
+    list.slice(state.page * cfg.pageSize, (state.page + 1) * cfg.pageSize).forEach(function (r) {
+      var tr = document.createElement('tr');
+      tr.className = 'row';
+      tr.innerHTML = '<td>' + esc(r.id) + '</td><td>' + esc(r.n) + '</td><td><span class="badge ' +
+        (r.p ? 'pass">✓ PASS' : 'fail">✗ FAIL') + '</span>' + (r.e ? ' ⚠️' : '') + (r.c ? ' <span class="muted">cache</span>' : '') + '</td><td>' +
+        esc(dash(r.pr)) + '</td><td>' + dash(r.s) + '</td><td>' + r.m + '</td><td>' + ms(r.lm) +
+        '</td><td>' + ms(r.lx) + '</td><td>' + ms(r.lo) + '</td><td>' + dash(r.t) + '</td><td>' + r.d + 's</td>';
+      tr.onclick = function () { toggle(r, tr); };
+      body.appendChild(tr);
+      if (state.open[r.i]) { delete state.open[r.i]; toggle(r, tr); }
+    });
+    $('page').textContent = 'Page ' + (state.page + 1) + ' / ' + pages;
+    $('prev').disabled = state.page === 0;
+    $('next').disabled = state.page >= pages - 1;
+    $('f-count').textContent = list.length + ' / ' + rows.length + ' scénarios';
+  }
+
+  var priorities = {};
+  rows.forEach(function (r) { if (r.pr) priorities[r.pr] = true; });
+  Object.keys(priorities).sort().forEach(function (p) {
+    var o = document.createElement('option');
+    o.value = o.textContent = p;
+    $('f-priority').appendChild(o);
+  });
+  ['f-status', 'f-priority', 'f-latency', 'f-text'].forEach(function (id) {
+    $(id).addEventListener('input', function () { state.page = 0; render(); });
+  });
+  $('prev').onclick = function () { state.page--; render(); };
+  $('next').onclick = function () { state.page++; render(); };
+  render();
+})();
+"""
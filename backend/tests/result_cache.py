@@ -0,0 +1,156 @@
+"""
+Chat4Lead — Cache des résultats par empreinte de contenu
+=========================================================
+Clé d'un scénario = sha256(messages + attentes + transport + API visée
++ empreinte du backend). L'empreinte vient de /health (`promptHash` + modèle LLM) ;
+avec un backend plus ancien qui ne l'expose pas, on hache les sources
+locales du prompt, du handler et des providers LLM.
+
+Un fichier JSON par clé dans CACHE_DIR. Éviction à la fin de chaque
+run : entrées enregistrées il y a plus de CACHE_MAX_AGE_DAYS (même si
+elles servent encore), puis les moins récemment utilisées (mtime) tant
+que le cache dépasse CACHE_MAX_MB.
+
+    python runner.py --changed-only   # ne rejoue que les scénarios dont la clé a changé
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import CACHE_DIR, CACHE_MAX_AGE_DAYS, CACHE_MAX_MB, SLO
+
+# Sources qui déterminent les réponses du bot (empreinte de repli) : mêmes
+# entrées que le promptHash du backend (src/utils/build-info.ts)
+BACKEND_SRC = Path(__file__).resolve().parent.parent / "src"
+FINGERPRINT_SOURCES = (
+    "modules/prompt",
+    "modules/conversation",
+    "modules/llm",
+    "services/distance.service.ts",
+)
+
+# Date d'enregistrement en tête d'entrée (voir ResultCache.put)
+_STORED_AT = re.compile(r'"stored_at":\s*([0-9.]+)')
+
+
+def backend_fingerprint(health: Dict) -> Tuple[str, str]:
+    """Empreinte du backend et sa provenance (« health » ou « sources locales »)."""
+    if health.get("promptHash"):
+        parts = [health["promptHash"], health.get("llmProvider") or "", health.get("llmModel") or ""]
+        return ":".join(parts), "health"
+
+    digest = hashlib.sha256()
+    for source in FINGERPRINT_SOURCES:
+        root = BACKEND_SRC / source
+        files = sorted(root.rglob("*.ts")) if root.is_dir() else [root]
+        for path in files:
+            if path.name.endswith(".d.ts") or not path.exists():
+                continue
+            digest.update(str(path.relative_to(BACKEND_SRC)).encode('utf-8'))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16], "sources locales"
+
+
+def _api_target(api_url: str) -> str:
+    """URL d'API normalisée (schéma, hôte, chemin) : un verdict ne vaut que pour ce déploiement."""
+    parts = urlsplit(api_url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path.rstrip('/')}"
+
+
+def scenario_key(scenario: Dict, fingerprint: str, transport: str, api_url: str) -> str:
+    content = {
+        "messages": scenario["messages"],
+        "expected": scenario.get("expected", {}),
+        "transport": transport,
+        # L'empreinte de repli (sources locales) ne distingue pas localhost de la prod
+        "api": _api_target(api_url),
+        "backend": fingerprint,
+    }
+    # SLO globaux : changent le verdict, donc la clé (absents, les clés existantes restent valides)
+    slo = {key: value for key, value in SLO.items() if value is not None}
+    if slo:
+        content["slo"] = slo
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Résultats de scénarios indexés par clé de contenu."""
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(path)  # mtime = dernière utilisation (éviction LRU)
+        return entry["result"]
+
+    def put(self, key: str, result: Dict):
+        """
+        N'enregistre que les scénarios allés au bout : ni erreur transitoire,
+        ni arrêt fail-fast (assertions finales non vérifiées).
+        """
+        if result.get("errors") or result.get("aborted_at_turn"):
+            return
+        entry = {"key": key, "stored_at": time.time(), "result": result}
+        tmp = self._path(key).with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False, default=str)
+        os.replace(tmp, self._path(key))
+
+    @staticmethod
+    def _stored_at(path: Path) -> Optional[float]:
+        """
+        Date d'enregistrement d'une entrée (`stored_at`, écrit en tête par put()) :
+        lue sur les premiers octets, le fichier entier seulement en repli.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            match = _STORED_AT.search(f.read(512))
+            if match:
+                return float(match.group(1))
+            f.seek(0)
+            try:
+                return json.load(f).get("stored_at")
+            except json.JSONDecodeError:
+                return None
+
+    def evict(self, max_age_days: float = CACHE_MAX_AGE_DAYS, max_mb: float = CACHE_MAX_MB) -> int:
+        """
+        Supprime les entrées expirées (âge depuis l'enregistrement, pas depuis
+        le dernier accès) puis les moins récemment utilisées au-delà de la taille max.
+        """
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            stat = path.stat()
+            stored_at = self._stored_at(path)
+            if stored_at is None or now - stored_at > max_age_days * 86400:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_mb * 1024 * 1024:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
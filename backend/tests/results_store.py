@@ -0,0 +1,131 @@
+"""
+Chat4Lead - Stockage incrémental des résultats (JSONL)
+========================================================
+Chaque résultat de scénario est ajouté dès qu'il est terminé, puis
+flush + fsync : un crash, un Ctrl-C ou une panne du backend en fin de
+run ne fait perdre que les scénarios en cours. Le fichier sert aussi de
+point de reprise (--resume) et de source pour les rapports finaux :
+ils relisent le fichier résultat par résultat (index des positions par
+ID), la mémoire ne dépend pas de la taille du run.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from config import RESULTS_DIR
+from console import Colors
+
+
+class ResultsWriter:
+    """Écriture append-only d'un résultat par ligne (thread-safe)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def write(self, result: Dict):
+        line = json.dumps(result, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def iter_results(path: Path) -> Iterator[Dict]:
+    """
+    Relit un fichier JSONL de résultats. Une dernière ligne tronquée
+    (crash pendant l'écriture) est ignorée.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def index_results(path: Path) -> Dict[str, int]:
+    """Position (octets) de la dernière ligne de chaque ID (une reprise remplace l'ancien)."""
+    offsets: Dict[str, int] = {}
+    offset = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                offsets[json.loads(line)["id"]] = offset
+            except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+                pass
+            offset += len(line)
+    return offsets
+
+
+def iter_latest(path: Path, order: Optional[Sequence[str]] = None) -> Iterator[Dict]:
+    """Résultats dédoublonnés, triés selon `order` (IDs de scénarios), relus un à un."""
+    offsets = index_results(path)
+    ids = list(offsets)
+    if order:
+        rank = {sid: i for i, sid in enumerate(order)}
+        ids.sort(key=lambda sid: rank.get(sid, len(rank)))
+    with open(path, 'rb') as f:
+        for sid in ids:
+            f.seek(offsets[sid])
+            yield json.loads(f.readline())
+
+
+def completed_ids(path: Path) -> Set[str]:
+    """
+    IDs déjà exécutés jusqu'aux assertions. Les scénarios interrompus par
+    une erreur (backend indisponible, timeout…) sont rejoués à la reprise.
+    """
+    return {r["id"] for r in iter_latest(path) if not r.get("errors")}
+
+
+def load_results(path: Path, order: Optional[Sequence[str]] = None) -> List[Dict]:
+    """Résultats du fichier, dédoublonnés et triés selon `order` (IDs de scénarios)."""
+    return list(iter_latest(path, order))
+
+
+def load_run(path: Path) -> Iterable[Dict]:
+    """Résultats d'un run, depuis un dump JSON ou un flux JSONL (relu à la demande)."""
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        return iter_latest(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_json_array(items: Iterable, filename: str) -> Path:
+    """Comme save_json pour une liste, écrite élément par élément (même format)."""
+    Path(RESULTS_DIR).mkdir(parents=True, exist_ok=True)
+    filepath = Path(RESULTS_DIR) / filename
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write("[")
+        empty = True
+        for item in items:
+            f.write("\n  " if empty else ",\n  ")
+            f.write(json.dumps(item, indent=2, ensure_ascii=False, default=str).replace("\n", "\n  "))
+            empty = False
+        f.write("]" if empty else "\n]")
+    print(f"\n{Colors.BLUE}💾  Résultats → {filepath}{Colors.END}")
+    return filepath
+
+
+def save_json(data, filename: str) -> Path:
+    """Dump JSON indenté dans RESULTS_DIR."""
+    Path(RESULTS_DIR).mkdir(parents=True, exist_ok=True)
+    filepath = Path(RESULTS_DIR) / filename
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+    print(f"\n{Colors.BLUE}💾  Résultats → {filepath}{Colors.END}")
+    return filepath
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Chat4Lead — Historique des runs (SQLite)
+=========================================
+Chaque run fonctionnel est ingéré dans une base SQLite locale (tables
+runs / scenarios / exchanges / assertions, indexées) pour comparer les
+runs dans le temps sans relire les dumps JSON.
+
+Usage:
+    python runner.py history runs --last 20
+    python runner.py history latency --turn 5 --last 20 --percentile 95
+    python runner.py history flips --last 10
+    python runner.py history scenario test-01 --last 20
+    python runner.py history ingest results/*.json     # import des anciens runs
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config import HISTORY_DB
+from console import Colors
+from results_store import iter_latest
+from stats import fmt_ms, percentile
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id               INTEGER PRIMARY KEY,
+    run_key          TEXT NOT NULL UNIQUE,
+    started_at       TEXT NOT NULL,
+    api_url          TEXT,
+    transport        TEXT,
+    total            INTEGER NOT NULL,
+    passed           INTEGER NOT NULL,
+    duration_seconds REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started_at);
+
+CREATE TABLE IF NOT EXISTS scenarios (
+    id               INTEGER PRIMARY KEY,
+    run_id           INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    scenario_id      TEXT NOT NULL,
+    name             TEXT,
+    passed           INTEGER NOT NULL,
+    final_score      INTEGER,
+    priorite         TEXT,
+    messages_sent    INTEGER,
+    duration_seconds REAL,
+    error_count      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_sid_run ON scenarios(scenario_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_scenarios_run ON scenarios(run_id);
+
+CREATE TABLE IF NOT EXISTS exchanges (
+    id           INTEGER PRIMARY KEY,
+    scenario_row INTEGER NOT NULL REFERENCES scenarios(id) ON DELETE CASCADE,
+    run_id       INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    scenario_id  TEXT NOT NULL,
+    turn         INTEGER NOT NULL,
+    latency_ms   INTEGER,
+    ttft_ms      INTEGER,
+    score        INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_exchanges_turn_run ON exchanges(turn, run_id);
+CREATE INDEX IF NOT EXISTS idx_exchanges_sid_run ON exchanges(scenario_id, run_id);
+
+CREATE TABLE IF NOT EXISTS assertions (
+    id           INTEGER PRIMARY KEY,
+    scenario_row INTEGER NOT NULL REFERENCES scenarios(id) ON DELETE CASCADE,
+    run_id       INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    scenario_id  TEXT NOT NULL,
+    type         TEXT NOT NULL,
+    expected     TEXT,
+    actual       TEXT,
+    passed       INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assertions_sid_run ON assertions(scenario_id, run_id);
+"""
+
+
+def connect(db_path: Path = HISTORY_DB) -> sqlite3.Connection:
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ══════════════════════════════════════════════
+#  INGESTION
+# ══════════════════════════════════════════════
+
+def ingest_run(
+    conn: sqlite3.Connection,
+    run_key: str,
+    results: Iterable[Dict],
+    api_url: Optional[str] = None,
+    transport: Optional[str] = None,
+    duration_seconds: Optional[float] = None,
+) -> int:
+    """
+    Ingère un run (idempotent : un run_key déjà présent est remplacé).
+    `results` est parcouru une seule fois : les totaux du run sont
+    complétés après les scénarios.
+    """
+    total = passed = 0
+    started_at = ""
+    summed_duration = 0.0
+
+    with conn:
+        conn.execute("DELETE FROM runs WHERE run_key = ?", (run_key,))
+        run_id = conn.execute(
+            "INSERT INTO runs (run_key, started_at, api_url, transport, total, passed, duration_seconds)"
+            " VALUES (?, ?, ?, ?, 0, 0, NULL)",
+            (run_key, run_key, api_url, transport),
+        ).lastrowid
+
+        for r in results:
+            total += 1
+            passed += 1 if r.get("passed") else 0
+            summed_duration += r.get("duration_seconds") or 0
+            if r.get("timestamp") and (not started_at or r["timestamp"] < started_at):
+                started_at = r["timestamp"]
+            lead = r.get("final_lead") or {}
+            scenario_row = conn.execute(
+                "INSERT INTO scenarios (run_id, scenario_id, name, passed, final_score, priorite,"
+                " messages_sent, duration_seconds, error_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id, r["id"], r.get("name"), int(bool(r.get("passed"))),
+                    r.get("final_score"), lead.get("priorite"), r.get("messages_sent"),
+                    r.get("duration_seconds"), len(r.get("errors") or []),
+                ),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO exchanges (scenario_row, run_id, scenario_id, turn, latency_ms, ttft_ms, score)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (scenario_row, run_id, r["id"], turn, ex.get("latency_ms"), ex.get("ttft_ms"), ex.get("score"))
+                    for turn, ex in enumerate(r.get("exchanges") or [], 1)
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO assertions (scenario_row, run_id, scenario_id, type, expected, actual, passed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (scenario_row, run_id, r["id"], a["type"],
+                     json.dumps(a.get("expected"), ensure_ascii=False, default=str),
+                     json.dumps(a.get("actual"), ensure_ascii=False, default=str),
+                     int(bool(a.get("passed"))))
+                    for a in r.get("assertions") or []
+                ],
+            )
+
+        conn.execute(
+            "UPDATE runs SET started_at = ?, total = ?, passed = ?, duration_seconds = ? WHERE id = ?",
+            (
+                started_at or run_key, total, passed,
+                duration_seconds if duration_seconds is not None else summed_duration,
+                run_id,
+            ),
+        )
+    return run_id
+
+
+def _last_runs(conn: sqlite3.Connection, last: int) -> List[sqlite3.Row]:
+    """Les `last` runs les plus récents, du plus ancien au plus récent."""
+    rows = conn.execute(
+        "SELECT id, run_key, started_at, total, passed, duration_seconds, transport"
+        " FROM runs ORDER BY started_at DESC LIMIT ?",
+        (last,),
+    ).fetchall()
+    return list(reversed(rows))
+
+
+# ══════════════════════════════════════════════
+#  REQUÊTES
+# ══════════════════════════════════════════════
+
+def cmd_runs(conn, args):
+    print(f"\n  {'Run':<22} {'Début':<20} {'Réussis':>9} {'Taux':>6} {'Durée':>8}  Transport")
+    for run_id, key, started, total, passed, duration, transport in _last_runs(conn, args.last):
+        rate = passed / total * 100 if total else 0
+        color = Colors.GREEN if rate >= 80 else Colors.YELLOW if rate >= 60 else Colors.RED
+        print(f"  {key:<22} {started[:19]:<20} {passed:>4}/{total:<4} "
+              f"{color}{rate:>5.0f}%{Colors.END} {duration or 0:>7.0f}s  {transport or '—'}")
+
+
+def cmd_latency(conn, args):
+    runs = _last_runs(conn, args.last)
+    if not runs:
+        return
+    placeholders = ",".join("?" * len(runs))
+    params: List = [r[0] for r in runs]
+    where = f"run_id IN ({placeholders}) AND latency_ms IS NOT NULL"
+    if args.turn is not None:
+        where += " AND turn = ?"
+        params.append(args.turn)
+    if args.scenario:
+        where += " AND scenario_id = ?"
+        params.append(args.scenario)
+
+    by_run: Dict[int, List[int]] = {}
+    for run_id, latency in conn.execute(f"SELECT run_id, latency_ms FROM exchanges WHERE {where}", params):
+        by_run.setdefault(run_id, []).append(latency)
+
+    scope = f"tour {args.turn}" if args.turn is not None else "tous tours"
+    if args.scenario:
+        scope += f", {args.scenario}"
+    print(f"\n  Latence p{args.percentile:g} ({scope}) sur les {len(runs)} derniers runs\n")
+    print(f"  {'Run':<22} {'n':>5} {'p' + format(args.percentile, 'g'):>9} {'moy.':>9}")
+    for run_id, key, *_ in runs:
+        values = by_run.get(run_id, [])
+        mean = sum(values) / len(values) if values else None
+        print(f"  {key:<22} {len(values):>5} {fmt_ms(percentile(values, args.percentile)):>9} {fmt_ms(mean):>9}")
+
+
+def cmd_flips(conn, args):
+    runs = _last_runs(conn, args.last)
+    if len(runs) < 2:
+        print("  Il faut au moins 2 runs.")
+        return
+    placeholders = ",".join("?" * len(runs))
+    order = {r[0]: i for i, r in enumerate(runs)}
+    keys = {r[0]: r[1] for r in runs}
+
+    history: Dict[str, List] = {}
+    for sid, run_id, passed in conn.execute(
+        f"SELECT scenario_id, run_id, passed FROM scenarios WHERE run_id IN ({placeholders})",
+        [r[0] for r in runs],
+    ):
+        history.setdefault(sid, []).append((order[run_id], run_id, passed))
+
+    print(f"\n  Changements de statut sur les {len(runs)} derniers runs\n")
+    found = False
+    for sid in sorted(history):
+        points = sorted(history[sid])
+        for (_, prev_run, prev), (_, run_id, cur) in zip(points, points[1:]):
+            if prev == cur:
+                continue
+            found = True
+            arrow = f"{Colors.RED}PASS → FAIL{Colors.END}" if prev else f"{Colors.GREEN}FAIL → PASS{Colors.END}"
+            print(f"  {sid:<16} {arrow}   {keys[prev_run]} → {keys[run_id]}")
+    if not found:
+        print("  Aucun changement.")
+
+
+def cmd_scenario(conn, args):
+    runs = _last_runs(conn, args.last)
+    placeholders = ",".join("?" * len(runs)) or "NULL"
+    rows = {
+        run_id: (passed, score, priorite, duration)
+        for run_id, passed, score, priorite, duration in conn.execute(
+            f"SELECT run_id, passed, final_score, priorite, duration_seconds FROM scenarios"
+            f" WHERE scenario_id = ? AND run_id IN ({placeholders})",
+            [args.scenario_id] + [r[0] for r in runs],
+        )
+    }
+    print(f"\n  {args.scenario_id} sur les {len(runs)} derniers runs\n")
+    print(f"  {'Run':<22} {'Statut':<8} {'Score':>6} {'Priorité':<9} {'Durée':>7}")
+    for run_id, key, *_ in runs:
+        if run_id not in rows:
+            continue
+        passed, score, priorite, duration = rows[run_id]
+        status = f"{Colors.GREEN}PASS{Colors.END}  " if passed else f"{Colors.RED}FAIL{Colors.END}  "
+        print(f"  {key:<22} {status}  {score if score is not None else '—':>6} "
+              f"{priorite or '—':<9} {duration or 0:>6.1f}s")
+
+
+def cmd_ingest(conn, args):
+    for path in args.files:
+        path = Path(path)
+        if path.suffix == ".jsonl":
+            # Flux --resume : dernière entrée de chaque scénario seulement
+            results = list(iter_latest(path))
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                results = json.load(f)
+        if not isinstance(results, list):
+            print(f"  {Colors.YELLOW}⚠  {path.name} ignoré (pas une liste de résultats){Colors.END}")
+            continue
+        ingest_run(conn, path.stem.replace("results_", "", 1), results)
+        print(f"  ✓ {path.name} ({len(results)} scénarios)")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="runner.py history", description="Chat4Lead — Historique des runs")
+    parser.add_argument("--db", default=HISTORY_DB, help=f"Base SQLite (défaut: {HISTORY_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("runs", help="Liste des derniers runs")
+    p.add_argument("--last", type=int, default=20)
+    p.set_defaults(func=cmd_runs)
+
+    p = sub.add_parser("latency", help="Percentile de latence par run")
+    p.add_argument("--turn", type=int, help="Index du tour (1 = premier message)")
+    p.add_argument("--scenario", help="Restreindre à un scénario")
+    p.add_argument("--percentile", type=float, default=95)
+    p.add_argument("--last", type=int, default=20)
+    p.set_defaults(func=cmd_latency)
+
+    p = sub.add_parser("flips", help="Scénarios passés de PASS à FAIL (ou l'inverse)")
+    p.add_argument("--last", type=int, default=2)
+    p.set_defaults(func=cmd_flips)
+
+    p = sub.add_parser("scenario", help="Tendance d'un scénario")
+    p.add_argument("scenario_id")
+    p.add_argument("--last", type=int, default=20)
+    p.set_defaults(func=cmd_scenario)
+
+    p = sub.add_parser("ingest", help="Importe des fichiers de résultats existants")
+    p.add_argument("files", nargs="+")
+    p.set_defaults(func=cmd_ingest)
+
+    args = parser.parse_args(argv)
+    with closing(connect(args.db)) as conn:
+        args.func(conn, args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -9,109 +9,520 @@ Usage:
     python runner.py                   # Tous les tests
     python runner.py --id test-01      # Un seul test
     python runner.py --id test-01 test-05   # Plusieurs tests
+    python runner.py --concurrency 8   # 8 scénarios en parallèle
+    python runner.py --fail-fast       # Arrête un scénario à la 1re attente par tour en échec
+    python runner.py --changed-only    # Ne rejoue que les scénarios modifiés (voir result_cache.py)
+    python runner.py --rps 2 --max-conversations 5 --retries 6   # Sous les limites du provider
+    python runner.py --concurrency 8 --trace --trace-otlp   # Spans Perfetto / OpenTelemetry (voir tracing.py)
+    python runner.py --concurrency 8 --progress --metrics-port 9464   # Métriques live (voir metrics.py)
+    python runner.py --concurrency 8 --warmup 8   # Échauffe pool de connexions et cache de prompt avant les stats
+    python runner.py --repeat 10 --concurrency 8   # Taux de réussite, IC et scénarios instables (voir repeat.py)
+    python runner.py --target prod=https://x/api --target dev=http://localhost:3000/api   # A/B (voir ab.py)
+    python runner.py --load --rate 2 --duration 300 --ramp-up 60   # Test de charge
+    python runner.py synth --count 5000 --seed 42   # Corpus synthétique JSONL (voir synth.py)
+    python runner.py --scenarios scenarios/synth_5000_seed-42.jsonl --load --rate 5 --duration 600
+    python runner.py import-sessions --api-key <clé>   # Sessions manuelles → scripts rejouables (voir manual_replay.py)
+    python runner.py --load --rate 2 --duration 600 --manual-ratio 0.3   # 30 % de conversations réelles
+    python runner.py readbench --tiers 1000 10000 100000   # Routes de lecture par volume (voir readbench.py)
+    python runner.py --transport stream   # Route SSE /message/stream (mesure TTFT)
+    python runner.py --socketio 300 --socketio-step 50   # Utilisateurs virtuels Socket.io
+    python runner.py --record                  # Enregistre une cassette des échanges HTTP
+    python runner.py --replay cassettes/x.jsonl --replay-latency zero   # Rejeu hors-ligne
+    python runner.py --resume results/results_<ts>.jsonl   # Reprend un run interrompu
+    python runner.py history latency --turn 5 --last 20   # Historique SQLite (voir run_history.py)
+    python runner.py --baseline results/results_<ts>.json --tolerance 15   # Garde-fou perf
+    python runner.py --scenarios scenarios.json scenarios-33.json --shard 2/4   # 2e quart du catalogue
+    python runner.py merge results/results_<ts>_shard-*.jsonl   # Fusionne les shards (voir shard.py)
 """
 
+import codecs
+import functools
+import itertools
 import json
 import requests
 import time
 import argparse
+import atexit
+import re
 import sys
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing, nullcontext
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Any, Optional, Tuple
+
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
 
 from config import (
     API_URL, API_KEY, DELAY_BETWEEN_MESSAGES,
-    TIMEOUT, SAVE_RESULTS, GENERATE_HTML_REPORT,
-    RESULTS_DIR, REPORTS_DIR, SCENARIOS_FILE,
+    TIMEOUT, SAVE_RESULTS, GENERATE_HTML_REPORT, CONCURRENCY,
+    RESULTS_DIR, SCENARIOS_FILE,
+    LOAD_RATE, LOAD_DURATION, LOAD_RAMP_UP, LOAD_MAX_IN_FLIGHT, TRANSPORT,
+    SOCKETIO_STEP, CASSETTES_DIR, SAVE_HISTORY,
+    BASELINE_TOLERANCE_PCT, BASELINE_TOKENS_TOLERANCE_PCT, CACHE_RESULTS,
+    THROTTLE_RATE, THROTTLE_MAX_CONVERSATIONS, RETRY_MAX, RETRY_STATUSES,
+    WARMUP_CONVERSATIONS, WARMUP_TURNS, SLO,
+    MANUAL_RATIO, MANUAL_THINK_SCALE, MANUAL_SCENARIOS_FILE,
+)
+from ab import ABCollector, ab_report, parse_target, print_ab_report
+import baseline as perf_baseline
+from cassette import LATENCY_MODES, Cassette, CassetteRecorder, CassetteServer
+from console import Colors
+from loadtest import LoadTest, print_load_report, save_load_report
+from results_store import ResultsWriter, completed_ids, iter_latest, load_run, save_json, save_json_array
+import run_history
+from socketio_load import SocketLoadTest, print_socketio_report, save_socketio_report
+from records import ScenarioRecord
+from report import generate_html_report
+from repeat import print_repeat_report, repeat_report
+from result_cache import ResultCache, backend_fingerprint, scenario_key
+from shard import (
+    cycle_scenarios, is_streamable, load_scenarios, parse_shard, select_shard, shard_suffix,
+    main as merge_main,
 )
+import synth
+import readbench
+import manual_replay
+from stats import fmt_ms, latency_breakdown, percentile
+from metrics import LiveMetrics, MetricsServer, ProgressLine, TextfileExporter
+from throttle import Throttle, ThrottleStats, parse_retry_after
+from tracing import Tracer
+from summary import fmt_breakdown, print_summary, run_summary
+
+TRANSPORTS = ("rest", "stream")
 
 
 # ══════════════════════════════════════════════
-#  COULEURS TERMINAL
+#  CHAT BOT TESTER
 # ══════════════════════════════════════════════
 
-class Colors:
-    GREEN  = '\033[92m'
-    RED    = '\033[91m'
-    YELLOW = '\033[93m'
-    BLUE   = '\033[94m'
-    CYAN   = '\033[96m'
-    END    = '\033[0m'
-    BOLD   = '\033[1m'
-    DIM    = '\033[2m'
+# Connexions HTTP ouvertes par le thread courant (échanges « froids »)
+_opened = threading.local()
 
 
-# ══════════════════════════════════════════════
-#  CHAT BOT TESTER
-# ══════════════════════════════════════════════
+class _CountNewConnections:
+    """Mixin de pool urllib3 : compte les connexions neuves du thread appelant."""
+
+    def _new_conn(self):
+        _opened.count = getattr(_opened, "count", 0) + 1
+        return super()._new_conn()
+
+
+class _HTTPPool(_CountNewConnections, HTTPConnectionPool):
+    pass
+
+
+class _HTTPSPool(_CountNewConnections, HTTPSConnectionPool):
+    pass
+
+
+def _traced(name: str):
+    """Span autour d'une méthode de ChatBotTester (appel API complet, retries compris)."""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name, "api"):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
 
 class ChatBotTester:
     """Exécute des scénarios de test contre l'API Chat4Lead."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool_size: int = 1,
+        transport: str = "rest",
+        api_url: str = API_URL,
+        api_key: str = API_KEY,
+        recorder: Optional[CassetteRecorder] = None,
+        delay: float = DELAY_BETWEEN_MESSAGES,
+        fail_fast: bool = False,
+        throttle: Optional[Throttle] = None,
+        tracer: Optional[Tracer] = None,
+        metrics: Optional[LiveMetrics] = None,
+        quiet: bool = False,
+    ):
+        self.api_url = api_url
+        self.delay = delay
+        self.recorder = recorder
+        self.fail_fast = fail_fast
+        self.throttle = throttle or Throttle()
+        self.tracer = tracer or Tracer(enabled=False)
+        self.metrics = metrics or LiveMetrics()
+        self.quiet = quiet
         self.session = requests.Session()
         self.session.headers.update({
-            'x-api-key': API_KEY,
+            'x-api-key': api_key,
             'Content-Type': 'application/json',
         })
-        self.results: List[Dict] = []
+        # Pool de connexions partagé entre les workers (keep-alive)
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max(pool_size, 10),
+        )
+        adapter.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.transport = transport
+        # Premier message du processus : clients LLM / DB du backend encore froids
+        self._first_send = True
+        self._cold_lock = threading.Lock()
+
+        # Sortie console : bufferisée par scénario en mode concurrent
+        self._local = threading.local()
+        self._print_lock = threading.Lock()
+
+    # ─── Sortie console ───────────────────────
+
+    def _print(self, text: str = ""):
+        """print() ou ajout au buffer du scénario courant (mode concurrent)."""
+        if self.quiet:
+            return
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            print(text)
+        else:
+            buffer.append(text)
+
+    def _flush_output(self):
+        """Affiche d'un bloc la sortie bufferisée du scénario courant."""
+        buffer = getattr(self._local, "buffer", None)
+        self._local.buffer = None
+        if buffer:
+            with self._print_lock:
+                print("\n".join(buffer), flush=True)
 
     # ─── API helpers ──────────────────────────
 
+    @_traced("health_check")
     def health_check(self) -> Dict:
         """Vérifie que le backend est en ligne."""
         try:
+            start = time.perf_counter()
+            # Seul le suffixe /api est retiré : https://api.example.com/api → https://api.example.com
+            root = self.api_url[:-4] if self.api_url.endswith("/api") else self.api_url
             r = self.session.get(
-                f"{API_URL.replace('/api', '')}/health",
+                f"{root}/health",
                 timeout=10,
             )
+            if self.recorder:
+                self.recorder.record_health(r.status_code, _json_or_text(r), _ms_since(start))
             r.raise_for_status()
             return r.json()
         except Exception as e:
             raise ConnectionError(f"Backend indisponible: {e}")
 
+    def _request(self, method: str, url: str, idempotent: Optional[bool] = None,
+                 **kwargs) -> Tuple[requests.Response, Dict]:
+        """
+        Requête via le limiteur, avec retries (backoff + jitter, Retry-After)
+        sur RETRY_STATUSES et erreurs de connexion. Une requête non idempotente
+        (POST par défaut) n'est rejouée que sur 429/503 et échec d'établissement
+        de la connexion : jamais si le corps a pu atteindre le backend.
+        Renvoie la réponse finale et le coût côté client, à exclure de la
+        latence mesurée : throttle_wait_ms (limiteur), retries, retry_ms
+        (tentatives échouées + backoff).
+        """
+        if idempotent is None:
+            idempotent = method == "GET"
+        call = {"retries": 0, "throttle_wait_ms": 0.0, "retry_ms": 0.0}
+        # Nom de span stable (sans l'ID de conversation) : agrégeable dans Perfetto
+        path = re.sub(r"/conversation/(?!init$)[^/]+", "/conversation/:id", url.replace(self.api_url, "", 1))
+        while True:
+            limited = self.throttle.bucket.rate > 0
+            with self.tracer.span("throttle_wait", "client") if limited else nullcontext():
+                call["throttle_wait_ms"] += self.throttle.wait_turn() * 1000
+            start = time.perf_counter()
+            try:
+                with self.tracer.span(f"{method} {path}", "http", attempt=call["retries"] + 1) as span:
+                    r = self.session.request(method, url, **kwargs)
+                    span["status"] = r.status_code
+            except requests.ConnectionError as e:
+                self.metrics.request_done(type(e).__name__)
+                if not (idempotent or _connect_failed(e)):
+                    raise
+                r, error, reason, retry_after = None, e, type(e).__name__, None
+            else:
+                self.metrics.request_done(str(r.status_code))
+                if not self.throttle.retryable(r.status_code, idempotent):
+                    break
+                error, reason = None, str(r.status_code)
+                retry_after = parse_retry_after(r.headers.get("Retry-After"))
+
+            if call["retries"] >= self.throttle.max_retries:
+                self.throttle.stats.add(gave_up=1)
+                if error:
+                    raise error
+                break  # l'appelant lève via raise_for_status()
+            if r is not None:
+                r.close()
+            delay = self.throttle.backoff(call["retries"] + 1, retry_after)
+            self.throttle.stats.add_retry(reason, delay)
+            self.metrics.retried()
+            with self.tracer.span("retry_backoff", "client", reason=reason):
+                time.sleep(delay)
+            call["retries"] += 1
+            call["retry_ms"] += (time.perf_counter() - start) * 1000
+
+        call["throttle_wait_ms"] = int(call["throttle_wait_ms"])
+        call["retry_ms"] = int(call["retry_ms"])
+        return r, call
+
+    @_traced("init_conversation")
     def init_conversation(self) -> str:
         """POST /api/conversation/init → conversationId"""
-        r = self.session.post(
-            f"{API_URL}/conversation/init",
+        start = time.perf_counter()
+        r, call = self._request(
+            "POST",
+            f"{self.api_url}/conversation/init",
+            # Rejouer ne coûte au pire qu'une conversation vide orpheline
+            idempotent=True,
             json={},
             timeout=TIMEOUT,
         )
+        if self.recorder:
+            body = _json_or_text(r)
+            conversation_id = body.get("conversationId") if r.ok and isinstance(body, dict) else None
+            self.recorder.record_init(conversation_id, r.status_code, body, _net_ms(start, call))
         r.raise_for_status()
         data = r.json()
         return data["conversationId"]
 
+    @_traced("send_message")
     def send_message(self, conversation_id: str, message: str) -> Dict:
         """POST /api/conversation/:id/message → { reply, score, … }"""
-        r = self.session.post(
-            f"{API_URL}/conversation/{conversation_id}/message",
+        start = time.perf_counter()
+        r, call = self._request(
+            "POST",
+            f"{self.api_url}/conversation/{conversation_id}/message",
             json={"message": message},
             timeout=TIMEOUT,
         )
+        if self.recorder:
+            self.recorder.record_message(
+                conversation_id, message, r.status_code, _json_or_text(r), _net_ms(start, call)
+            )
         r.raise_for_status()
-        return r.json()
+        return r.json() | call
+
+    @_traced("send_message_stream")
+    def send_message_stream(self, conversation_id: str, message: str) -> Dict:
+        """
+        POST /api/conversation/:id/message/stream (SSE).
+        Lit les événements `text` au fil de l'eau puis `done`, et renvoie
+        la même forme que send_message + les mesures de streaming :
+        ttft_ms (premier chunk), chunks, chunk_gap_mean_ms, chunk_gap_max_ms.
+        """
+        start = time.perf_counter()
+        chunk_times: List[float] = []
+        parts: List[str] = []
+        events: List[Dict] = []
+        final: Optional[Dict] = None
+
+        r, call = self._request(
+            "POST",
+            f"{self.api_url}/conversation/{conversation_id}/message/stream",
+            json={"message": message},
+            timeout=TIMEOUT,
+            stream=True,
+        )
+        # Les temps du flux partent du début de la tentative retenue
+        start += (call["throttle_wait_ms"] + call["retry_ms"]) / 1000
+        with r:
+            if not r.ok:
+                if self.recorder:
+                    self.recorder.record_message(
+                        conversation_id, message, r.status_code, _json_or_text(r), _ms_since(start)
+                    )
+                r.raise_for_status()
+            for event in _iter_sse_events(r):
+                events.append({"t_ms": _ms_since(start), "data": event})
+                if event.get("type") == "text":
+                    chunk_times.append(time.perf_counter())
+                    parts.append(event.get("c", ""))
+                elif event.get("type") == "done":
+                    final = event
+                elif event.get("type") == "error":
+                    raise RuntimeError(f"SSE error: {event.get('message')}")
+
+        if self.recorder:
+            self.recorder.record_message(
+                conversation_id, message, r.status_code, None, _ms_since(start), events=events
+            )
+        if final is None:
+            raise RuntimeError("Flux SSE interrompu avant l'événement 'done'")
+
+        gaps = [(b - a) * 1000 for a, b in zip(chunk_times, chunk_times[1:])]
+        return {
+            "reply": "".join(parts),
+            "score": final.get("score"),
+            "leadData": final.get("leadData"),
+            "actions": final.get("actions"),
+            "metadata": final.get("metadata"),
+            "ttft_ms": int((chunk_times[0] - start) * 1000) if chunk_times else None,
+            "chunks": len(chunk_times),
+            "chunk_gap_mean_ms": round(sum(gaps) / len(gaps), 1) if gaps else None,
+            "chunk_gap_max_ms": int(max(gaps)) if gaps else None,
+            **call,
+        }
+
+    def send(self, conversation_id: str, message: str) -> Dict:
+        """Envoie un message via le transport configuré (rest | stream)."""
+        with self._cold_lock:
+            first, self._first_send = self._first_send, False
+        opened = getattr(_opened, "count", 0)
+        start = time.perf_counter()
+        if self.transport == "stream":
+            response = self.send_message_stream(conversation_id, message)
+        else:
+            response = self.send_message(conversation_id, message)
+        metadata = response.get("metadata") or {}
+        self.metrics.message_done(_net_ms(start, response), metadata.get("tokensUsed"))
+        new_connection = getattr(_opened, "count", 0) > opened
+        return response | {"cold_reason": _cold_reason(first, new_connection, metadata)}
+
+    def warm_up(self, scenarios: List[Dict], conversations: int, turns: int = WARMUP_TURNS,
+                concurrency: int = 1) -> Dict:
+        """
+        Conversations jetables (les `turns` premiers messages des premiers
+        scénarios) : ouvrent le pool de connexions et amorcent le cache de
+        prompt du provider. Ni enregistrées, ni comptées dans les stats.
+        """
+        recorder, self.recorder = self.recorder, None
+        latencies: List[int] = []
+        errors: List[str] = []
+
+        def converse(scenario: Dict):
+            conversation_id = self.init_conversation()
+            for message in scenario["messages"][:turns]:
+                start = time.perf_counter()
+                response = self.send(conversation_id, message)
+                latencies.append(_net_ms(start, response))
 
+        start = time.time()
+        try:
+            with self.tracer.span("warmup", "runner", conversations=conversations), \
+                    ThreadPoolExecutor(max_workers=max(1, min(conversations, concurrency)),
+                                       thread_name_prefix="warmup") as pool:
+                futures = [pool.submit(converse, scenarios[i % len(scenarios)]) for i in range(conversations)]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors.append(f"{type(e).__name__}: {e}")
+        finally:
+            self.recorder = recorder
+        # Les compteurs repartent de zéro : l'échauffement n'entre dans aucun agrégat
+        self.throttle.stats = ThrottleStats()
+        self.metrics.reset()
+        return {
+            "conversations": conversations,
+            "messages": len(latencies),
+            "seconds": round(time.time() - start, 1),
+            "first_ms": latencies[0] if latencies else None,
+            "last_ms": latencies[-1] if latencies else None,
+            "errors": errors,
+        }
+
+    @_traced("get_conversation")
     def get_conversation(self, conversation_id: str) -> Dict:
         """GET /api/conversation/:id → conversation + lead + messages"""
-        r = self.session.get(
-            f"{API_URL}/conversation/{conversation_id}",
+        start = time.perf_counter()
+        r, call = self._request(
+            "GET",
+            f"{self.api_url}/conversation/{conversation_id}",
             timeout=TIMEOUT,
         )
+        if self.recorder:
+            self.recorder.record_conversation(
+                conversation_id, r.status_code, _json_or_text(r), _net_ms(start, call)
+            )
         r.raise_for_status()
         return r.json()
 
     # ─── Exécution d'un scénario ──────────────
 
-    def run_scenario(self, scenario: Dict) -> Dict:
-        """Exécute un scénario de test complet et retourne le résultat."""
-
+    def run_scenarios(
+        self,
+        scenarios: Iterable[Dict],
+        concurrency: int = 1,
+        on_result: Optional[Callable[[Dict], None]] = None,
+        keep_records: bool = True,
+    ) -> List[ScenarioRecord]:
+        """
+        Exécute plusieurs scénarios, avec au plus `concurrency` en parallèle.
+        `on_result` reçoit chaque résultat complet dès la fin du scénario
+        (ordre de complétion) : c'est à lui de l'écrire sur disque. Seuls
+        des `ScenarioRecord` compacts sont gardés et renvoyés, dans l'ordre
+        des scénarios — aucun si `keep_records` est faux (l'appelant relit
+        le flux). `scenarios` peut être un générateur : il est consommé
+        au fil de l'eau, jamais matérialisé.
+        """
+        def run_one(scenario: Dict) -> Optional[ScenarioRecord]:
+            result = self.run_scenario(scenario, buffered=concurrency > 1)
+            if on_result:
+                on_result(result)
+            return ScenarioRecord.from_result(result) if keep_records else None
+
+        records: List[ScenarioRecord] = []
+
+        def keep(record: Optional[ScenarioRecord]):
+            if record is not None:
+                records.append(record)
+
+        if concurrency <= 1:
+            for s in scenarios:
+                keep(run_one(s))
+            return records
+
+        pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scenario")
+        # Au plus 2 × concurrency scénarios soumis d'avance (pool.map soumettrait tout)
+        pending: Deque[Future] = deque()
+        try:
+            for scenario in scenarios:
+                if len(pending) >= 2 * concurrency:
+                    keep(pending.popleft().result())
+                pending.append(pool.submit(run_one, scenario))
+            while pending:
+                keep(pending.popleft().result())
+            return records
+        finally:
+            # Ctrl-C : on laisse finir les scénarios en cours, pas les suivants
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def run_scenario(self, scenario: Dict, buffered: bool = False) -> Dict:
+        """
+        Exécute un scénario de test complet et retourne le résultat.
+        Si `buffered`, la sortie console est affichée d'un bloc à la fin
+        (lisible quand plusieurs scénarios tournent en parallèle).
+        """
+        if buffered:
+            self._local.buffer = []
+        try:
+            with self.tracer.span("scenario", "scenario", id=scenario["id"]):
+                with self.throttle.conversation_slot():
+                    self.metrics.conversation_started()
+                    result = self._run_scenario(scenario)
+                    outcome = "error" if result["errors"] else "passed" if result["passed"] else "failed"
+                    self.metrics.conversation_finished(outcome)
+                    return result
+        finally:
+            if buffered:
+                self._flush_output()
+
+    def _run_scenario(self, scenario: Dict) -> Dict:
         sid = scenario["id"]
-        print(f"\n{'═'*70}")
-        print(f"  {Colors.BOLD}{Colors.CYAN}🧪  {scenario['name']}{Colors.END}  "
+        self._print(f"\n{'═'*70}")
+        self._print(f"  {Colors.BOLD}{Colors.CYAN}🧪  {scenario['name']}{Colors.END}  "
               f"{Colors.DIM}({sid}){Colors.END}")
-        print(f"  {Colors.DIM}{scenario['description']}{Colors.END}")
-        print(f"{'═'*70}")
+        self._print(f"  {Colors.DIM}{scenario['description']}{Colors.END}")
+        self._print(f"{'═'*70}")
 
         result: Dict[str, Any] = {
             "id": sid,
@@ -128,6 +539,8 @@ class ChatBotTester:
             "assertions": [],
             "duration_seconds": 0,
         }
+        if "run" in scenario:  # --repeat : n° d'exécution
+            result["run"] = scenario["run"]
 
         start = time.time()
 
@@ -135,37 +548,85 @@ class ChatBotTester:
             # 1.  Init conversation
             conversation_id = self.init_conversation()
             result["conversation_id"] = conversation_id
-            print(f"\n  {Colors.GREEN}✓{Colors.END} Conversation créée: "
+            self._print(f"\n  {Colors.GREEN}✓{Colors.END} Conversation créée: "
                   f"{Colors.DIM}{conversation_id[:12]}…{Colors.END}")
 
             # 2.  Envoyer les messages un par un
             last_score: Optional[int] = None
+            expected = scenario.get("expected", {})
+            turn_checks = {t["turn"]: t for t in expected.get("turns", [])}
+            lead_so_far: Dict[str, Any] = {}
             for i, message in enumerate(scenario["messages"], 1):
                 tag = f"[{i}/{len(scenario['messages'])}]"
-                print(f"\n  {Colors.YELLOW}▶ USER {tag}:{Colors.END}  {message}")
+                self._print(f"\n  {Colors.YELLOW}▶ USER {tag}:{Colors.END}  {message}")
 
                 msg_start = time.time()
-                response = self.send_message(conversation_id, message)
-                elapsed_ms = int((time.time() - msg_start) * 1000)
+                with self.tracer.span("turn", "scenario", turn=i):
+                    response = self.send(conversation_id, message)
+                # Attentes du limiteur et retries exclus : comptés à part
+                client_wait_ms = response["throttle_wait_ms"] + response["retry_ms"]
+                elapsed_ms = int((time.time() - msg_start) * 1000) - client_wait_ms
 
                 result["messages_sent"] = i
 
                 bot_reply = response.get("reply", "")
                 last_score = response.get("score")
                 display_reply = bot_reply[:220] + ("…" if len(bot_reply) > 220 else "")
-                print(f"  {Colors.GREEN}◀ BOT:{Colors.END}  {display_reply}")
-                print(f"       {Colors.DIM}({elapsed_ms}ms | score={last_score}){Colors.END}")
-
-                result["exchanges"].append({
+                self._print(f"  {Colors.GREEN}◀ BOT:{Colors.END}  {display_reply}")
+                metadata = response.get("metadata") or {}
+                server_ms = metadata.get("latencyMs")
+                cold_reason = response["cold_reason"]
+                ttft = f" | TTFT {response['ttft_ms']}ms" if response.get("ttft_ms") is not None else ""
+                llm = (f" | LLM {server_ms}ms + pipeline {elapsed_ms - server_ms}ms"
+                       if server_ms is not None else "")
+                tokens = f" | {metadata['tokensUsed']} tokens" if metadata.get("tokensUsed") is not None else ""
+                waits = ""
+                if response["retries"]:
+                    waits += f" | {response['retries']} retry (+{response['retry_ms']}ms)"
+                if response["throttle_wait_ms"]:
+                    waits += f" | limiteur +{response['throttle_wait_ms']}ms"
+                if cold_reason:
+                    waits += f" | froid : {cold_reason}"
+                self._print(f"       {Colors.DIM}({elapsed_ms}ms{ttft}{llm}{tokens}{waits} | score={last_score}){Colors.END}")
+
+                exchange = {
                     "user": message,
                     "bot": bot_reply,
                     "score": last_score,
                     "latency_ms": elapsed_ms,
-                })
+                    # Temps LLM côté serveur ; le reste = DB, contexte, extraction, réseau
+                    "server_latency_ms": server_ms,
+                    "overhead_ms": elapsed_ms - server_ms if server_ms is not None else None,
+                    "tokens_used": metadata.get("tokensUsed"),
+                    # Prompt caching (Claude) : absent avec les autres providers
+                    "cache_read_tokens": metadata.get("cacheReadTokens"),
+                    "cache_creation_tokens": metadata.get("cacheCreationTokens"),
+                    "cold": cold_reason is not None,
+                    "cold_reason": cold_reason,
+                    "retries": response["retries"],
+                    "retry_ms": response["retry_ms"],
+                    "throttle_wait_ms": response["throttle_wait_ms"],
+                }
+                if self.transport == "stream":
+                    for key in ("ttft_ms", "chunks", "chunk_gap_mean_ms", "chunk_gap_max_ms"):
+                        exchange[key] = response.get(key)
+                result["exchanges"].append(exchange)
+
+                # Attentes du tour : état du lead renvoyé par /message (leadData)
+                _merge_lead(lead_so_far, response.get("leadData"))
+                if i in turn_checks:
+                    with self.tracer.span("turn_assertions", "scenario", turn=i):
+                        ok = self._check_turn(turn_checks[i], i, bot_reply, last_score, lead_so_far, result)
+                    if not ok and self.fail_fast:
+                        result["aborted_at_turn"] = i
+                        self._print(f"\n  {Colors.RED}⏹  Fail-fast : scénario arrêté au tour {i}"
+                                    f"/{len(scenario['messages'])}{Colors.END}")
+                        break
 
                 # Attendre entre les messages
                 if i < len(scenario["messages"]):
-                    time.sleep(DELAY_BETWEEN_MESSAGES)
+                    with self.tracer.span("sleep", "client"):
+                        time.sleep(self.delay)
 
             # 3.  Récupérer l'état final complet
             conversation = self.get_conversation(conversation_id)
@@ -183,25 +644,30 @@ class ChatBotTester:
                 "projetData": lead.get("projetData", {}),
             }
 
+            result["perf"] = latency_breakdown(result["exchanges"])
+
             # Résumé visuel
-            print(f"\n  {Colors.BLUE}{'─'*50}{Colors.END}")
-            print(f"  {Colors.BOLD}📊 Résultats finaux{Colors.END}")
-            print(f"     Score:     {Colors.BOLD}{result['final_score']}/100{Colors.END}")
-            print(f"     Priorité:  {lead.get('priorite', '—')}")
-            print(f"     Prénom:    {lead.get('prenom') or '—'}")
-            print(f"     Nom:       {lead.get('nom') or '—'}")
-            print(f"     Email:     {lead.get('email') or '—'}")
-            print(f"     Téléphone: {lead.get('telephone') or '—'}")
-            print(f"     Formule:   {(lead.get('projetData') or {}).get('formule', '—')}")
-
-            # 4.  Vérification des assertions
-            result["passed"] = self._check_assertions(
-                scenario.get("expected", {}), result, lead
-            )
+            self._print(f"\n  {Colors.BLUE}{'─'*50}{Colors.END}")
+            self._print(f"  {Colors.BOLD}📊 Résultats finaux{Colors.END}")
+            self._print(f"     Score:     {Colors.BOLD}{result['final_score']}/100{Colors.END}")
+            self._print(f"     Priorité:  {lead.get('priorite', '—')}")
+            self._print(f"     Prénom:    {lead.get('prenom') or '—'}")
+            self._print(f"     Nom:       {lead.get('nom') or '—'}")
+            self._print(f"     Email:     {lead.get('email') or '—'}")
+            self._print(f"     Téléphone: {lead.get('telephone') or '—'}")
+            self._print(f"     Formule:   {(lead.get('projetData') or {}).get('formule', '—')}")
+            self._print(f"     Temps:     {fmt_breakdown(result['perf'])}")
+
+            # 4.  Vérification des assertions (inutile si la conversation a déraillé)
+            if "aborted_at_turn" not in result:
+                with self.tracer.span("assertions", "scenario"):
+                    result["passed"] = self._check_assertions(expected, result, lead,
+                                                              duration_s=time.time() - start)
 
         except Exception as e:
             result["errors"].append(str(e))
-            print(f"\n  {Colors.RED}❌ Erreur: {e}{Colors.END}")
+            self.metrics.error(type(e).__name__)
+            self._print(f"\n  {Colors.RED}❌ Erreur: {e}{Colors.END}")
 
         result["duration_seconds"] = round(time.time() - start, 1)
         return result
@@ -213,13 +679,20 @@ class ChatBotTester:
         expected: Dict,
         result: Dict,
         lead: Dict,
+        duration_s: Optional[float] = None,
     ) -> bool:
-        """Vérifie les assertions et les ajoute au résultat."""
+        """
+        Vérifie les assertions finales et les ajoute au résultat, après
+        celles des tours : le scénario passe si toutes passent. Les SLO de
+        performance (`latency_max_ms`, `latency_pNN_ms`, `duration_max_s`,
+        `tokens_max_per_turn`, `tokens_max`, `ttft_max_ms`) viennent de
+        `expected`, ou de config.SLO qui les remplace.
+        """
         assertions: List[Dict] = []
         all_passed = True
         score = result["final_score"] or 0
 
-        print(f"\n  {Colors.BOLD}🔍 Assertions{Colors.END}")
+        self._print(f"\n  {Colors.BOLD}🔍 Assertions{Colors.END}")
 
         # ── Score minimum
         if "score_min" in expected:
@@ -248,20 +721,7 @@ class ChatBotTester:
         if "fields" in expected:
             for field, expected_value in expected["fields"].items():
                 actual_value = lead.get(field)
-
-                # Normalisation téléphone
-                norm_actual = actual_value
-                norm_expected = expected_value
-                if field == "telephone" and actual_value:
-                    norm_actual = actual_value.replace(" ", "").replace(".", "").replace("-", "")
-                    norm_expected = expected_value.replace(" ", "").replace(".", "").replace("-", "")
-
-                # Normalisation prénom/nom (case-insensitive)
-                if field in ("prenom", "nom") and actual_value:
-                    norm_actual = actual_value.strip().lower()
-                    norm_expected = expected_value.strip().lower()
-
-                ok = norm_actual == norm_expected
+                ok = _field_matches(field, expected_value, actual_value)
                 assertions.append(self._make_assert(
                     f"field.{field}", expected_value, actual_value, ok
                 ))
@@ -272,234 +732,583 @@ class ChatBotTester:
                 )
                 all_passed = all_passed and ok
 
-        result["assertions"] = assertions
+        # ── SLO de performance : « le bot est devenu lent » échoue comme un champ perdu
+        for type_, label, limit, actual, unit in _slo_checks(_scenario_slo(expected), result["exchanges"], duration_s):
+            ok = actual <= limit
+            assertions.append(self._make_assert(type_, limit, actual, ok))
+            self._print_assert(label, f"{actual}{unit}", ok)
+            all_passed = all_passed and ok
+
+        turn_assertions = result["assertions"]
+        result["assertions"] = turn_assertions + assertions
+        all_passed = all_passed and all(a["passed"] for a in turn_assertions)
 
         status = f"{Colors.GREEN}✅ PASS{Colors.END}" if all_passed else f"{Colors.RED}❌ FAIL{Colors.END}"
+        assertions = result["assertions"]
         passed_count = sum(1 for a in assertions if a["passed"])
-        print(f"\n  {status} — {passed_count}/{len(assertions)} assertions réussies")
+        self._print(f"\n  {status} — {passed_count}/{len(assertions)} assertions réussies")
 
         return all_passed
 
+    def _check_turn(
+        self,
+        check: Dict,
+        turn: int,
+        reply: str,
+        score: Optional[int],
+        lead: Dict,
+        result: Dict,
+    ) -> bool:
+        """
+        Attentes d'un tour (`expected.turns` du scénario), vérifiées dès la
+        réponse du bot :
+
+            {"turn": 2, "score_min": 10, "score_max": 40,
+             "fields": ["villeDepart", "villeArrivee"],        # extraits au plus tard à ce tour
+             "fields": {"email": "a@b.fr"},                    # ou valeurs attendues
+             "reply_matches": "(?i)surface|m²", "reply_not_matches": "(?i)erreur",
+             "latency_max_ms": 6000, "tokens_max": 2500, "ttft_max_ms": 1500}   # SLO du tour
+        """
+        assertions: List[Dict] = []
+        prefix = f"tour {turn} · "
+
+        def add(type_: str, label: str, expected, actual, ok: bool):
+            assertion = self._make_assert(prefix + type_, expected, actual, ok)
+            assertion["turn"] = turn
+            assertions.append(assertion)
+            self._print_assert(prefix + label, actual, ok)
+
+        self._print(f"  {Colors.BOLD}🔍 Attentes du tour {turn}{Colors.END}")
+        if "score_min" in check:
+            add("score ≥", f"Score ≥ {check['score_min']}", check["score_min"], score,
+                (score or 0) >= check["score_min"])
+        if "score_max" in check:
+            add("score ≤", f"Score ≤ {check['score_max']}", check["score_max"], score,
+                (score or 0) <= check["score_max"])
+
+        fields = check.get("fields") or {}
+        if isinstance(fields, list):
+            fields = dict.fromkeys(fields)
+        for field, expected_value in fields.items():
+            actual = _lead_field(lead, field)
+            if expected_value is None:
+                add(f"field.{field}", f"{field} extrait", "présent", actual, actual not in (None, ""))
+            else:
+                add(f"field.{field}", f"{field} = «{expected_value}»", expected_value, actual,
+                    _field_matches(field, expected_value, actual))
+
+        turn_slo = {key: check[key] for key in TURN_SLO_KEYS if key in check}
+        for type_, label, limit, actual, _ in _slo_checks(turn_slo, result["exchanges"][-1:]):
+            add(type_, label, limit, actual, actual <= limit)
+
+        if "reply_matches" in check:
+            add("reply ~", f"Réponse ~ /{check['reply_matches']}/", check["reply_matches"],
+                reply[:120], re.search(check["reply_matches"], reply) is not None)
+        if "reply_not_matches" in check:
+            add("reply !~", f"Réponse !~ /{check['reply_not_matches']}/", check["reply_not_matches"],
+                reply[:120], re.search(check["reply_not_matches"], reply) is None)
+
+        result["assertions"].extend(assertions)
+        return all(a["passed"] for a in assertions)
+
     @staticmethod
     def _make_assert(type_: str, expected, actual, passed: bool) -> Dict:
         return {"type": type_, "expected": expected, "actual": actual, "passed": passed}
 
-    @staticmethod
-    def _print_assert(label: str, actual, passed: bool):
+    def _print_assert(self, label: str, actual, passed: bool):
         icon = f"{Colors.GREEN}✓{Colors.END}" if passed else f"{Colors.RED}✗{Colors.END}"
-        print(f"     {icon}  {label}  →  {actual}")
+        self._print(f"     {icon}  {label}  →  {actual}")
 
     # ─── Sauvegarde ───────────────────────────
 
-    def save_results(self, results: List[Dict], filename: str):
-        Path(RESULTS_DIR).mkdir(parents=True, exist_ok=True)
-        filepath = Path(RESULTS_DIR) / filename
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False, default=str)
-        print(f"\n{Colors.BLUE}💾  Résultats → {filepath}{Colors.END}")
-
-    # ─── Rapport HTML ─────────────────────────
-
-    def generate_html_report(self, results: List[Dict], filename: str):
-        Path(REPORTS_DIR).mkdir(parents=True, exist_ok=True)
-        filepath = Path(REPORTS_DIR) / filename
-
-        passed_count = sum(1 for r in results if r["passed"])
-        failed_count = len(results) - passed_count
-        total = len(results)
-        rate = (passed_count / total * 100) if total else 0
-        now_str = datetime.now().strftime('%d/%m/%Y à %H:%M:%S')
-        total_duration = sum(r.get("duration_seconds", 0) for r in results)
-
-        # Badge couleur globale
-        if rate >= 80:
-            rate_color = "#10b981"
-        elif rate >= 60:
-            rate_color = "#f59e0b"
-        else:
-            rate_color = "#ef4444"
-
-        # ── Construction HTML ──
-        html_parts: List[str] = []
-        html_parts.append(f"""<!DOCTYPE html>
-<html lang="fr">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>Rapport Tests Chat4Lead — {now_str}</title>
-<style>
-:root {{
-  --bg: #0f172a; --card: #1e293b; --border: #334155;
-  --text: #e2e8f0; --muted: #94a3b8; --accent: #6366f1;
-  --green: #10b981; --red: #ef4444; --amber: #f59e0b;
-}}
-* {{ box-sizing: border-box; margin: 0; padding: 0; }}
-body {{ font-family: 'Segoe UI', system-ui, -apple-system, sans-serif; background: var(--bg); color: var(--text); line-height: 1.6; }}
-.container {{ max-width: 1100px; margin: 0 auto; padding: 40px 24px; }}
-h1 {{ font-size: 28px; margin-bottom: 4px; }}
-.subtitle {{ color: var(--muted); margin-bottom: 32px; }}
-
-/* Summary cards */
-.summary {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 16px; margin-bottom: 40px; }}
-.stat {{ background: var(--card); border: 1px solid var(--border); border-radius: 12px; padding: 24px; text-align: center; }}
-.stat-value {{ font-size: 36px; font-weight: 700; }}
-.stat-label {{ color: var(--muted); font-size: 13px; margin-top: 4px; text-transform: uppercase; letter-spacing: .5px; }}
-
-/* Test cards */
-.test {{ background: var(--card); border: 1px solid var(--border); border-radius: 12px; margin-bottom: 20px; overflow: hidden; }}
-.test-header {{ display: flex; justify-content: space-between; align-items: center; padding: 20px 24px; cursor: pointer; }}
-.test-header:hover {{ background: rgba(99,102,241,.06); }}
-.test-name {{ font-weight: 600; font-size: 16px; }}
-.test-desc {{ color: var(--muted); font-size: 13px; }}
-.badge {{ display: inline-block; padding: 4px 14px; border-radius: 20px; font-size: 12px; font-weight: 700; letter-spacing: .5px; }}
-.badge.pass {{ background: rgba(16,185,129,.15); color: var(--green); }}
-.badge.fail {{ background: rgba(239,68,68,.15); color: var(--red); }}
-.test-body {{ padding: 0 24px 24px; display: none; }}
-.test.open .test-body {{ display: block; }}
-
-/* Conversation */
-.exchange {{ margin: 8px 0; }}
-.msg {{ padding: 10px 14px; border-radius: 10px; margin: 4px 0; max-width: 85%; font-size: 14px; }}
-.msg.user {{ background: var(--accent); color: #fff; margin-left: auto; text-align: right; }}
-.msg.bot  {{ background: #334155; }}
-.msg-meta {{ font-size: 11px; color: var(--muted); margin-top: 2px; }}
-
-/* Assertions */
-.assertion {{ display: flex; align-items: center; gap: 8px; padding: 8px 12px; border-radius: 8px; margin: 4px 0; font-size: 14px; }}
-.assertion.pass {{ background: rgba(16,185,129,.08); }}
-.assertion.fail {{ background: rgba(239,68,68,.08); }}
-.assertion-icon {{ font-size: 16px; }}
-
-/* Lead info table */
-.lead-table {{ width: 100%; border-collapse: collapse; margin: 12px 0; }}
-.lead-table th {{ text-align: left; padding: 8px 12px; background: rgba(99,102,241,.1); font-size: 13px; color: var(--accent); border-radius: 6px 6px 0 0; }}
-.lead-table td {{ padding: 8px 12px; border-bottom: 1px solid var(--border); font-size: 14px; }}
-.lead-table td:first-child {{ color: var(--muted); width: 140px; }}
-
-.section-title {{ font-size: 14px; font-weight: 600; color: var(--accent); margin: 20px 0 8px; text-transform: uppercase; letter-spacing: .5px; }}
-</style>
-</head>
-<body>
-<div class="container">
-<h1>📊 Rapport Tests Chat4Lead</h1>
-<p class="subtitle">Généré le {now_str} — Durée totale : {total_duration:.0f}s</p>
-
-<div class="summary">
-  <div class="stat"><div class="stat-value">{total}</div><div class="stat-label">Tests exécutés</div></div>
-  <div class="stat"><div class="stat-value" style="color:var(--green)">{passed_count}</div><div class="stat-label">Réussis</div></div>
-  <div class="stat"><div class="stat-value" style="color:var(--red)">{failed_count}</div><div class="stat-label">Échoués</div></div>
-  <div class="stat"><div class="stat-value" style="color:{rate_color}">{rate:.0f}%</div><div class="stat-label">Taux de succès</div></div>
-</div>
-""")
-
-        # ── Chaque test ──
-        for r in results:
-            cls = "pass" if r["passed"] else "fail"
-            badge = "✓ PASS" if r["passed"] else "✗ FAIL"
-            lead = r.get("final_lead") or {}
-            projet = lead.get("projetData", {})
-
-            html_parts.append(f"""
-<div class="test" onclick="this.classList.toggle('open')">
-  <div class="test-header">
-    <div>
-      <div class="test-name">{r['name']} <span style="color:var(--muted);font-weight:400;font-size:13px">{r['id']}</span></div>
-      <div class="test-desc">{r.get('description','')}</div>
-    </div>
-    <span class="badge {cls}">{badge}</span>
-  </div>
-  <div class="test-body">
-
-    <div class="section-title">📋 Résumé</div>
-    <table class="lead-table">
-      <tr><td>Messages envoyés</td><td>{r['messages_sent']}</td></tr>
-      <tr><td>Score final</td><td><strong>{r.get('final_score', '—')}/100</strong></td></tr>
-      <tr><td>Priorité</td><td>{lead.get('priorite','—')}</td></tr>
-      <tr><td>Prénom</td><td>{lead.get('prenom') or '—'}</td></tr>
-      <tr><td>Nom</td><td>{lead.get('nom') or '—'}</td></tr>
-      <tr><td>Email</td><td>{lead.get('email') or '—'}</td></tr>
-      <tr><td>Téléphone</td><td>{lead.get('telephone') or '—'}</td></tr>
-      <tr><td>Formule</td><td>{projet.get('formule','—')}</td></tr>
-      <tr><td>Durée</td><td>{r.get('duration_seconds', 0)}s</td></tr>
-    </table>
-""")
-
-            # Assertions
-            assertions = r.get("assertions", [])
-            passed_a = sum(1 for a in assertions if a["passed"])
-            html_parts.append(f"""
-    <div class="section-title">🔍 Assertions ({passed_a}/{len(assertions)})</div>
-""")
-            for a in assertions:
-                a_cls = "pass" if a["passed"] else "fail"
-                icon = "✓" if a["passed"] else "✗"
-                html_parts.append(f"""
-    <div class="assertion {a_cls}">
-      <span class="assertion-icon">{icon}</span>
-      <strong>{a['type']}</strong>: attendu {a['expected']}, obtenu {a['actual']}
-    </div>
-""")
-
-            # Conversation
-            exchanges = r.get("exchanges", [])
-            if exchanges:
-                html_parts.append(f"""
-    <div class="section-title">💬 Conversation ({len(exchanges)} échanges)</div>
-""")
-                for ex in exchanges:
-                    html_parts.append(f"""
-    <div class="exchange">
-      <div class="msg user">{_html_esc(ex.get('user',''))}</div>
-      <div class="msg bot">{_html_esc(ex.get('bot',''))}</div>
-      <div class="msg-meta">{ex.get('latency_ms', '?')}ms · score={ex.get('score','—')}</div>
-    </div>
-""")
-
-            # Erreurs
-            if r.get("errors"):
-                html_parts.append(f"""
-    <div class="section-title" style="color:var(--red)">⚠️ Erreurs</div>
-    <p style="color:var(--red);font-size:14px">{'<br>'.join(_html_esc(e) for e in r['errors'])}</p>
-""")
-
-            html_parts.append("  </div>\n</div>")
-
-        # ── Footer ──
-        html_parts.append("""
-</div>
-</body>
-</html>
-""")
-
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(''.join(html_parts))
-
-        print(f"{Colors.BLUE}📄  Rapport HTML → {filepath}{Colors.END}")
-
-
-def _html_esc(text: str) -> str:
-    """Échappe les caractères HTML."""
-    return (
-        str(text)
-        .replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-        .replace("\n", "<br>")
-    )
+    def save_results(self, results, filename: str):
+        save_json(results, filename)
+
+
+# ══════════════════════════════════════════════
+#  SLO DE PERFORMANCE
+# ══════════════════════════════════════════════
+
+TURN_SLO_KEYS = ("latency_max_ms", "tokens_max", "ttft_max_ms")
+_PERCENTILE_SLO = re.compile(r"latency_p(\d{1,2})_ms")
+
+
+def _scenario_slo(expected: Dict) -> Dict:
+    """Seuils de perf du scénario, remplacés par ceux de config.SLO quand ils sont définis."""
+    slo = {key: value for key, value in expected.items()
+           if key in SLO or _PERCENTILE_SLO.fullmatch(key)}
+    slo.update((key, value) for key, value in SLO.items() if value is not None)
+    return slo
+
+
+def _slo_checks(slo: Dict, exchanges: List[Dict],
+                duration_s: Optional[float] = None) -> Iterator[Tuple[str, str, float, float, str]]:
+    """
+    (type, libellé, seuil, mesure, unité) de chaque SLO, sur les échanges
+    donnés (tous pour le scénario, un seul pour un tour). Une mesure
+    absente — tokens non renvoyés, TTFT hors transport stream — n'est pas
+    vérifiée.
+    """
+    latencies = [ex["latency_ms"] for ex in exchanges if ex.get("latency_ms") is not None]
+    tokens = [ex["tokens_used"] for ex in exchanges if ex.get("tokens_used") is not None]
+    ttfts = [ex["ttft_ms"] for ex in exchanges if ex.get("ttft_ms") is not None]
+    for key, limit in slo.items():
+        if limit is None:
+            continue
+        quantile = _PERCENTILE_SLO.fullmatch(key)
+        if key == "latency_max_ms" and latencies:
+            yield "latency.max", f"Latence max ≤ {limit}ms", limit, max(latencies), "ms"
+        elif quantile and latencies:
+            q = int(quantile.group(1))
+            yield f"latency.p{q}", f"Latence p{q} ≤ {limit}ms", limit, round(percentile(latencies, q)), "ms"
+        elif key == "duration_max_s" and duration_s is not None:
+            yield "duration", f"Durée ≤ {limit}s", limit, round(duration_s, 1), "s"
+        elif key == "tokens_max_per_turn" and tokens:
+            yield "tokens.turn_max", f"Tokens par tour ≤ {limit}", limit, max(tokens), " tokens"
+        elif key == "tokens_max" and tokens:
+            yield "tokens.total", f"Tokens ≤ {limit}", limit, sum(tokens), " tokens"
+        elif key == "ttft_max_ms" and ttfts:
+            yield "ttft.max", f"TTFT max ≤ {limit}ms", limit, max(ttfts), "ms"
+
+
+def _normalize_phone(value: str) -> str:
+    return value.replace(" ", "").replace(".", "").replace("-", "")
+
+
+def _field_matches(field: str, expected, actual) -> bool:
+    """Comparaison d'un champ du lead, avec les normalisations usuelles."""
+    if actual and field == "telephone":
+        return _normalize_phone(actual) == _normalize_phone(expected)
+    if actual and field in ("prenom", "nom"):
+        return actual.strip().lower() == expected.strip().lower()
+    return actual == expected
+
+
+def _lead_field(lead: Dict, field: str):
+    """Champ du lead ou de son projetData (villeDepart, surface, formule…)."""
+    if lead.get(field) not in (None, ""):
+        return lead[field]
+    return (lead.get("projetData") or {}).get(field)
+
+
+def _merge_lead(lead: Dict, update: Optional[Dict]):
+    """Cumule les leadData successifs (une réponse peut ne renvoyer qu'un extrait)."""
+    for key, value in (update or {}).items():
+        if key == "projetData" and isinstance(value, dict):
+            projet = lead.setdefault("projetData", {})
+            projet.update({k: v for k, v in value.items() if v not in (None, "")})
+        elif value not in (None, ""):
+            lead[key] = value
+
+
+def _cold_reason(first: bool, new_connection: bool, metadata: Dict) -> Optional[str]:
+    """Pourquoi un échange est froid (None s'il est chaud)."""
+    if first:
+        return "premier message"
+    if new_connection:
+        return "connexion neuve"
+    if metadata.get("cacheReadTokens") == 0:
+        return "cache de prompt manqué"
+    return None
+
+
+def _net_ms(start: float, call: Dict) -> int:
+    """Durée de la tentative retenue (hors limiteur et retries)."""
+    return _ms_since(start) - call["throttle_wait_ms"] - call["retry_ms"]
+
+
+def _ms_since(start: float) -> int:
+    return int((time.perf_counter() - start) * 1000)
+
+
+def _connect_failed(error: requests.ConnectionError) -> bool:
+    """Échec avant l'envoi de la requête (connexion refusée, DNS, délai de connexion)."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _json_or_text(response: requests.Response):
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+def _iter_sse_events(response):
+    """
+    Parse incrémental d'un flux Server-Sent Events : renvoie chaque
+    payload `data:` (JSON) dès que son événement est complet.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    for chunk in response.iter_content(chunk_size=None):
+        buffer += decoder.decode(chunk).replace("\r\n", "\n")
+        while "\n\n" in buffer:
+            raw, buffer = buffer.split("\n\n", 1)
+            data = "\n".join(
+                line[5:].lstrip() for line in raw.split("\n") if line.startswith("data:")
+            )
+            if data:
+                yield json.loads(data)
 
 
 # ══════════════════════════════════════════════
 #  MAIN
 # ══════════════════════════════════════════════
 
+def _write_trace(tracer: Tracer, args, ts: str):
+    """Trace Chrome (+ OTLP) du run, à côté des résultats sauf --trace FICHIER."""
+    if not tracer.enabled:
+        return
+    path = Path(args.trace) if args.trace else Path(RESULTS_DIR) / f"trace_{ts}.json"
+    for written in tracer.write(path, otlp=args.trace_otlp):
+        print(f"{Colors.BLUE}🧵  Trace → {written}{Colors.END}")
+
+
+# Sous-commandes : python runner.py <commande> …
+SUBCOMMANDS = {
+    "history": run_history.main,
+    "merge": merge_main,
+    "synth": synth.main,
+    "readbench": readbench.main,
+    "import-sessions": manual_replay.main,
+}
+
+
+def _start_exporters(metrics: LiveMetrics, args) -> None:
+    """Endpoint /metrics et/ou fichier .prom, arrêtés (dernière écriture) à la sortie."""
+    if args.metrics_port is not None:
+        try:
+            server = MetricsServer(metrics, args.metrics_port)
+        except OSError as e:
+            print(f"{Colors.YELLOW}⚠  Port {args.metrics_port} indisponible : {e}{Colors.END}")
+        else:
+            atexit.register(server.stop)
+            print(f"  ✓ Métriques : {server.url}")
+    if args.metrics_file:
+        exporter = TextfileExporter(metrics, Path(args.metrics_file)).start()
+        atexit.register(exporter.stop)
+        print(f"  ✓ Métriques → {args.metrics_file} (toutes les {exporter.interval:g}s)")
+
+
+def _warm_up(tester: ChatBotTester, scenarios: List[Dict], args, concurrency: int) -> Optional[Dict]:
+    """Échauffement avant les mesures (sauf rejeu : la cassette ne contient que les vrais échanges)."""
+    if not args.warmup or args.replay or not scenarios:
+        return None
+    warm = tester.warm_up(scenarios, args.warmup, concurrency=concurrency)
+    print(f"  ✓ Échauffement : {warm['conversations']} conversations, {warm['messages']} messages "
+          f"en {warm['seconds']:.1f}s (1er {fmt_ms(warm['first_ms'])} → dernier {fmt_ms(warm['last_ms'])})")
+    if warm["errors"]:
+        print(f"{Colors.YELLOW}⚠  Échauffement : {len(warm['errors'])} erreur(s) — {warm['errors'][0]}{Colors.END}")
+    return warm
+
+
+def _run_repeat(tester: ChatBotTester, scenarios: List[Dict], args) -> int:
+    """--repeat N : chaque scénario N fois, puis statistiques d'instabilité. Renvoie le code de sortie."""
+    runs = (dict(s, run=k) for k in range(1, args.repeat + 1) for s in scenarios)
+    total = args.repeat * len(scenarios)
+    print(f"  ✓ Répétition : {args.repeat} × {len(scenarios)} scénarios = {total} exécutions")
+    ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    # Transcripts sur disque au fil de l'eau ; en mémoire, des ScenarioRecord
+    stream_path = (Path(RESULTS_DIR) / f"repeat_{ts}.jsonl" if SAVE_RESULTS
+                   else Path(tempfile.mkstemp(suffix=".jsonl")[1]))
+    writer = ResultsWriter(stream_path)
+    progress = ProgressLine(tester.metrics, total=total).start() if args.progress else None
+    run_start = time.time()
+    try:
+        records = tester.run_scenarios(runs, concurrency=args.concurrency, on_result=writer.write)
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠  Interrompu.{Colors.END}")
+        _write_trace(tester.tracer, args, f"repeat_{ts}")
+        return 130
+    finally:
+        if progress:
+            progress.stop()
+        writer.close()
+        if not SAVE_RESULTS:
+            stream_path.unlink(missing_ok=True)
+
+    report = repeat_report(scenarios, records, args.repeat, wall_clock=time.time() - run_start)
+    print_repeat_report(report)
+    if SAVE_RESULTS:
+        save_json(report | {"results_file": str(stream_path)}, f"repeat_{ts}.json")
+    _write_trace(tester.tracer, args, f"repeat_{ts}")
+    # 0 ⇒ chaque scénario réussi à chaque exécution
+    return 0 if report["overall"]["ok"] == report["overall"]["n"] else 1
+
+
+def _run_ab(scenarios: List[Dict], args) -> int:
+    """--target × N : chaque scénario sur toutes les cibles en même temps, puis comparaison. Code de sortie."""
+    names = [name for name, _, _ in args.target]
+    print(f"  ✓ A/B : {len(scenarios)} scénarios × {len(names)} cibles | Concurrence : {args.concurrency} par cible")
+    # Une seule vue live pour toutes les cibles ; limiteur et pool propres à chacune
+    metrics = LiveMetrics()
+    tracer = Tracer(enabled=args.trace is not None or args.trace_otlp, process_name="ab")
+    testers: Dict[str, ChatBotTester] = {}
+    for name, url, key in args.target:
+        tester = ChatBotTester(
+            pool_size=args.concurrency,
+            transport=args.transport,
+            api_url=url,
+            api_key=key,
+            fail_fast=args.fail_fast,
+            throttle=Throttle(rate=args.rps, max_conversations=args.max_conversations, max_retries=args.retries),
+            tracer=tracer,
+            metrics=metrics,
+            quiet=True,
+        )
+        try:
+            tester.health_check()
+        except ConnectionError as e:
+            print(f"\n{Colors.RED}❌  {name} : {e}{Colors.END}")
+            return 1
+        print(f"  ✓ {name} en ligne — {url}")
+        testers[name] = tester
+
+    _start_exporters(metrics, args)
+    for tester in testers.values():
+        _warm_up(tester, scenarios, args, concurrency=args.concurrency)
+
+    ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    paths = {
+        name: (Path(RESULTS_DIR) / f"ab_{ts}_{name}.jsonl" if SAVE_RESULTS
+               else Path(tempfile.mkstemp(suffix=".jsonl")[1]))
+        for name in names
+    }
+    writers = {name: ResultsWriter(path) for name, path in paths.items()}
+    collector = ABCollector(names)
+
+    def run_one(name: str, scenario: Dict) -> ScenarioRecord:
+        result = testers[name].run_scenario(scenario, buffered=True)
+        writers[name].write(result)
+        return collector.add(name, result)
+
+    def settle(scenario: Dict, futures: List[Future]):
+        records = [f.result() for f in futures]
+        if progress:
+            return
+        cells = " · ".join(
+            f"{name} {Colors.GREEN + '✓' if r.passed else Colors.RED + '✗'}{Colors.END} "
+            f"{r.final_score if r.final_score is not None else '—'} {r.priorite or '—'} {r.duration_seconds:.1f}s"
+            for name, r in zip(names, records)
+        )
+        print(f"  {scenario['id'][:22]:<22} {cells}")
+
+    progress = ProgressLine(metrics, total=len(scenarios) * len(names)).start() if args.progress else None
+    pool = ThreadPoolExecutor(max_workers=args.concurrency * len(names), thread_name_prefix="ab")
+    # Les conversations d'un scénario sont soumises ensemble : même instant, même charge
+    pending: Deque[Tuple[Dict, List[Future]]] = deque()
+    run_start = time.time()
+    try:
+        for scenario in scenarios:
+            if len(pending) >= 2 * args.concurrency:
+                settle(*pending.popleft())
+            pending.append((scenario, [pool.submit(run_one, name, scenario) for name in names]))
+        while pending:
+            settle(*pending.popleft())
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠  Interrompu.{Colors.END}")
+        _write_trace(tracer, args, f"ab_{ts}")
+        return 130
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if progress:
+            progress.stop()
+        for name, writer in writers.items():
+            writer.close()
+            if not SAVE_RESULTS:
+                paths[name].unlink(missing_ok=True)
+
+    report = ab_report(scenarios, args.target, collector, wall_clock=time.time() - run_start)
+    print_ab_report(report)
+    if SAVE_RESULTS:
+        save_json(report | {"results_files": {name: str(path) for name, path in paths.items()}}, f"ab_{ts}.json")
+    _write_trace(tracer, args, f"ab_{ts}")
+    return 0
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        return SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+
     parser = argparse.ArgumentParser(description="Chat4Lead — Test Runner")
     parser.add_argument(
         "--id", nargs="*",
         help="ID(s) de scénarii à exécuter (ex: test-01 test-05). Tous si omis.",
     )
+    parser.add_argument(
+        "--scenarios", nargs="+", default=[SCENARIOS_FILE], metavar="FICHIER",
+        help="Catalogue(s) de scénarios JSON ou JSONL (défaut: config.SCENARIOS_FILE). Doublons d'ID : le premier gagne.",
+    )
+    parser.add_argument(
+        "--shard", type=parse_shard, metavar="K/N",
+        help="N'exécute que le shard K sur N (partition déterministe des IDs, K de 1 à N).",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=CONCURRENCY,
+        help=f"Nombre de scénarios exécutés en parallèle (défaut: {CONCURRENCY}).",
+    )
+    load = parser.add_argument_group("test de charge (boucle ouverte)")
+    load.add_argument(
+        "--load", action="store_true",
+        help="Démarre des conversations à débit fixe au lieu du test fonctionnel.",
+    )
+    load.add_argument(
+        "--rate", type=float, default=LOAD_RATE,
+        help=f"Nouvelles conversations par seconde (défaut: {LOAD_RATE}).",
+    )
+    load.add_argument(
+        "--duration", type=float, default=LOAD_DURATION,
+        help=f"Durée d'injection en secondes (défaut: {LOAD_DURATION}).",
+    )
+    load.add_argument(
+        "--ramp-up", type=float, default=LOAD_RAMP_UP,
+        help=f"Montée linéaire jusqu'au débit cible, en secondes (défaut: {LOAD_RAMP_UP}).",
+    )
+    load.add_argument(
+        "--max-in-flight", type=int, default=LOAD_MAX_IN_FLIGHT,
+        help=f"Conversations simultanées max côté client (défaut: {LOAD_MAX_IN_FLIGHT}).",
+    )
+    load.add_argument(
+        "--manual-ratio", type=float, default=MANUAL_RATIO, metavar="R",
+        help=f"Part des conversations rejouant des sessions manuelles importées, de 0 à 1 (défaut: {MANUAL_RATIO}).",
+    )
+    load.add_argument(
+        "--manual", nargs="+", default=[MANUAL_SCENARIOS_FILE], metavar="FICHIER",
+        help="Scripts de sessions manuelles (défaut: config.MANUAL_SCENARIOS_FILE, voir import-sessions).",
+    )
+    load.add_argument(
+        "--think-scale", type=float, default=MANUAL_THINK_SCALE,
+        help=f"Facteur sur les temps de réflexion des sessions manuelles (défaut: {MANUAL_THINK_SCALE}).",
+    )
+    limits = parser.add_argument_group("limiteur et retries")
+    limits.add_argument(
+        "--rps", type=float, default=THROTTLE_RATE,
+        help=f"Requêtes/s max vers l'API, tous workers confondus (défaut: {THROTTLE_RATE or 'illimité'}).",
+    )
+    limits.add_argument(
+        "--max-conversations", type=int, default=THROTTLE_MAX_CONVERSATIONS,
+        help=f"Conversations simultanées max (défaut: {THROTTLE_MAX_CONVERSATIONS or 'illimité'}).",
+    )
+    limits.add_argument(
+        "--retries", type=int, default=RETRY_MAX,
+        help=f"Retries par requête sur {'/'.join(map(str, RETRY_STATUSES))} et erreurs réseau (défaut: {RETRY_MAX}).",
+    )
+    parser.add_argument(
+        "--transport", choices=TRANSPORTS, default=TRANSPORT,
+        help="rest : POST /message (bloquant) · stream : POST /message/stream (SSE, mesure TTFT).",
+    )
+    sockets = parser.add_argument_group("gateway Socket.io")
+    sockets.add_argument(
+        "--socketio", type=int, metavar="USERS",
+        help="Ouvre USERS sockets (utilisateurs virtuels) sur le gateway Socket.io.",
+    )
+    sockets.add_argument(
+        "--socketio-step", type=int, default=SOCKETIO_STEP,
+        help=f"Sockets ouvertes par palier (défaut: {SOCKETIO_STEP}).",
+    )
+    cassettes = parser.add_argument_group("enregistrement / rejeu")
+    cassettes.add_argument(
+        "--record", nargs="?", const="", metavar="FICHIER",
+        help=f"Enregistre les échanges HTTP dans une cassette JSONL (défaut: {CASSETTES_DIR}/cassette_<ts>.jsonl).",
+    )
+    cassettes.add_argument(
+        "--replay", nargs="+", metavar="CASSETTE",
+        help="Rejoue des cassettes via un faux backend local (ni DB, ni Redis, ni LLM).",
+    )
+    cassettes.add_argument(
+        "--replay-latency", choices=LATENCY_MODES, default="original",
+        help="original : latences enregistrées · zero : aussi vite que possible.",
+    )
+    parser.add_argument(
+        "--target", action="append", type=parse_target, metavar="NOM=URL[,CLÉ]",
+        help="Cible d'une comparaison A/B (au moins deux) : chaque scénario tourne sur toutes en même temps. "
+             "Clé API par défaut : config.API_KEY.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, metavar="N",
+        help="Exécute chaque scénario N fois : taux de réussite avec IC, fiabilité des champs, variance des latences.",
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=WARMUP_CONVERSATIONS, metavar="N",
+        help=f"Conversations jetables ({WARMUP_TURNS} messages) avant les mesures, exclues des stats "
+             f"(défaut: {WARMUP_CONVERSATIONS}, 0 = aucune).",
+    )
+    parser.add_argument(
+        "--resume", metavar="FICHIER_JSONL",
+        help="Reprend un run interrompu : saute les scénarios déjà terminés dans ce fichier.",
+    )
+    tracing = parser.add_argument_group("traces")
+    tracing.add_argument(
+        "--trace", nargs="?", const="", metavar="FICHIER",
+        help="Trace Chrome (Perfetto / chrome://tracing) de chaque phase (défaut: results/trace_<ts>.json).",
+    )
+    tracing.add_argument(
+        "--trace-otlp", action="store_true",
+        help="Écrit aussi la trace au format OTLP/JSON (OpenTelemetry) : <trace>.otlp.json.",
+    )
+    live = parser.add_argument_group("métriques live")
+    live.add_argument(
+        "--metrics-port", type=int, metavar="PORT",
+        help="Expose http://127.0.0.1:PORT/metrics (format Prometheus) pendant le run.",
+    )
+    live.add_argument(
+        "--metrics-file", metavar="FICHIER",
+        help="Réécrit périodiquement les métriques dans FICHIER (textfile collector de node_exporter).",
+    )
+    live.add_argument(
+        "--progress", action="store_true",
+        help="Une ligne de progression à la place du détail des scénarios.",
+    )
+    parser.add_argument(
+        "--changed-only", action="store_true",
+        help="Réutilise le résultat en cache des scénarios inchangés (messages, attentes, empreinte backend).",
+    )
+    parser.add_argument(
+        "--fail-fast", action="store_true",
+        help="Arrête un scénario dès qu'une attente par tour (expected.turns) échoue.",
+    )
+    gate = parser.add_argument_group("garde-fou de performance")
+    gate.add_argument(
+        "--baseline", metavar="RÉSULTATS",
+        help="Run de référence (results_*.json|.jsonl) : échec si latence, durée ou tokens régressent.",
+    )
+    gate.add_argument(
+        "--tolerance", type=float, default=BASELINE_TOLERANCE_PCT,
+        help=f"Régression tolérée sur latences et durées, en %% (défaut: {BASELINE_TOLERANCE_PCT}).",
+    )
+    gate.add_argument(
+        "--tokens-tolerance", type=float, default=BASELINE_TOKENS_TOLERANCE_PCT,
+        help=f"Régression tolérée sur les tokens, en %% (défaut: {BASELINE_TOKENS_TOLERANCE_PCT}).",
+    )
     args = parser.parse_args()
+    if args.record is not None and args.replay:
+        parser.error("--record et --replay sont incompatibles")
+    if args.changed_only and args.replay:
+        parser.error("--changed-only et --replay sont incompatibles")
+    if args.concurrency < 1:
+        parser.error("--concurrency doit être ≥ 1")
+    if args.repeat < 1:
+        parser.error("--repeat doit être ≥ 1")
+    if args.repeat > 1 and (args.load or args.socketio or args.resume or args.changed_only):
+        parser.error("--repeat est incompatible avec --load, --socketio, --resume et --changed-only")
+    if args.target:
+        if len(args.target) < 2:
+            parser.error("--target : au moins deux cibles")
+        if len({name for name, _, _ in args.target}) < len(args.target):
+            parser.error("--target : noms de cibles en double")
+        if (args.load or args.socketio or args.repeat > 1 or args.resume or args.changed_only
+                or args.replay or args.record is not None):
+            parser.error("--target est incompatible avec --load, --socketio, --repeat, --resume, "
+                         "--changed-only et les cassettes")
+    if args.load and (args.rate <= 0 or args.duration <= 0 or args.max_in_flight < 1):
+        parser.error("--rate, --duration et --max-in-flight doivent être > 0")
+    if not 0 <= args.manual_ratio <= 1 or args.think_scale < 0:
+        parser.error("--manual-ratio doit être entre 0 et 1, --think-scale ≥ 0")
+    if args.manual_ratio and not args.load:
+        parser.error("--manual-ratio nécessite --load")
 
     print(f"\n{Colors.BOLD}{Colors.CYAN}")
     print("  ╔══════════════════════════════════════════════════╗")
@@ -507,12 +1316,14 @@ def main():
     print("  ╚══════════════════════════════════════════════════╝")
     print(f"{Colors.END}")
 
-    # ── Charger scénarios
+    # ── Charger scénarios (corpus JSONL en mode charge : lu en flux par LoadTest,
+    #    seuls les premiers scénarios — échauffement — sont chargés ici)
+    stream_load = args.load and not (args.id or args.shard) and is_streamable(args.scenarios)
     try:
-        with open(SCENARIOS_FILE, 'r', encoding='utf-8') as f:
-            all_scenarios = json.load(f)
-    except FileNotFoundError:
-        print(f"{Colors.RED}❌  Fichier introuvable : {SCENARIOS_FILE}{Colors.END}")
+        all_scenarios = (list(itertools.islice(cycle_scenarios(args.scenarios), max(1, args.warmup)))
+                         if stream_load else load_scenarios(args.scenarios))
+    except FileNotFoundError as e:
+        print(f"{Colors.RED}❌  Fichier introuvable : {e.filename}{Colors.END}")
         sys.exit(1)
 
     # ── Filtrer si --id fourni
@@ -527,11 +1338,62 @@ def main():
     else:
         scenarios = all_scenarios
 
-    print(f"  ✓ {len(scenarios)} scénarios chargés")
-    print(f"  ✓ API : {API_URL}")
+    # ── Shard : sous-ensemble stable des IDs (même partition sur chaque machine)
+    if args.shard:
+        scenarios = select_shard(scenarios, *args.shard)
+        print(f"  ✓ Shard {args.shard[0]}/{args.shard[1]} : {len(scenarios)} scénarios")
+        if not scenarios:
+            print(f"{Colors.YELLOW}⚠  Shard vide, rien à exécuter.{Colors.END}")
+            sys.exit(0)
+
+    # ── Mode A/B : mêmes scénarios sur plusieurs backends, rapport comparatif
+    if args.target:
+        sys.exit(_run_ab(scenarios, args))
+
+    # ── Cassettes : faux backend local (rejeu) ou enregistrement
+    api_url = API_URL
+    recorder = None
+    if args.replay:
+        stub = CassetteServer(Cassette(args.replay), latency=args.replay_latency).start()
+        api_url = stub.api_url
+        print(f"  ✓ Rejeu : {len(stub.cassette.messages)} messages enregistrés "
+              f"(latence {args.replay_latency})")
+    elif args.record is not None:
+        cassette_path = Path(args.record or Path(CASSETTES_DIR) /
+                             f"cassette_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.jsonl")
+        recorder = CassetteRecorder(cassette_path)
+        print(f"  ✓ Enregistrement → {cassette_path}")
+
+    if stream_load:
+        print(f"  ✓ Corpus en flux : {', '.join(args.scenarios)}")
+    else:
+        print(f"  ✓ {len(scenarios)} scénarios chargés")
+    print(f"  ✓ API : {api_url}")
+    print(f"  ✓ Concurrence : {args.concurrency} | Transport : {args.transport}")
+    if args.rps or args.max_conversations:
+        print(f"  ✓ Limiteur : {args.rps or '∞'} req/s | {args.max_conversations or '∞'} conversations "
+              f"| {args.retries} retries")
 
     # ── Health check
-    tester = ChatBotTester()
+    pool_size = args.max_in_flight if args.load else args.concurrency
+    tracer = Tracer(enabled=args.trace is not None or args.trace_otlp,
+                    process_name=f"shard {args.shard[0]}/{args.shard[1]}" if args.shard else "runner")
+    tester = ChatBotTester(
+        pool_size=pool_size,
+        transport=args.transport,
+        api_url=api_url,
+        recorder=recorder,
+        # Rejeu sans latence : pas d'attente entre messages non plus
+        delay=0 if args.replay and args.replay_latency == "zero" else DELAY_BETWEEN_MESSAGES,
+        fail_fast=args.fail_fast,
+        throttle=Throttle(
+            rate=args.rps,
+            max_conversations=args.max_conversations,
+            max_retries=args.retries,
+        ),
+        tracer=tracer,
+        quiet=args.progress and not args.load,
+    )
     try:
         health = tester.health_check()
         db = health.get("database", "?")
@@ -542,45 +1404,183 @@ def main():
         print(f"{Colors.DIM}   Assurez-vous que le backend tourne : npm run dev{Colors.END}")
         sys.exit(1)
 
-    # ── Exécuter les tests
-    results: List[Dict] = []
-    for scenario in scenarios:
-        result = tester.run_scenario(scenario)
-        results.append(result)
-
-    # ── Résumé global
-    passed = sum(1 for r in results if r["passed"])
-    total  = len(results)
-    rate   = (passed / total * 100) if total else 0
-
-    print(f"\n{'═'*70}")
-    print(f"  {Colors.BOLD}📊  RÉSUMÉ GLOBAL{Colors.END}")
-    print(f"{'═'*70}")
-    print(f"  Total :       {total}")
-    print(f"  {Colors.GREEN}Réussis :     {passed}{Colors.END}")
-    print(f"  {Colors.RED}Échoués :     {total - passed}{Colors.END}")
-
-    if rate >= 80:
-        indicator = f"{Colors.GREEN}✅ Qualité validée{Colors.END}"
-    elif rate >= 60:
-        indicator = f"{Colors.YELLOW}⚠️  Ajustements mineurs recommandés{Colors.END}"
+    # ── Mode Socket.io : paliers de sockets ouvertes
+    if args.socketio:
+        try:
+            report = SocketLoadTest(scenarios, users=args.socketio, step=args.socketio_step).run()
+        except RuntimeError as e:
+            print(f"\n{Colors.RED}❌  {e}{Colors.END}")
+            sys.exit(1)
+        print_socketio_report(report)
+        if SAVE_RESULTS:
+            ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            save_socketio_report(report, f"socketio_{ts}.json")
+        sys.exit(0)
+
+    _start_exporters(tester.metrics, args)
+
+    # ── Mode charge : rapport dédié, pas d'assertions fonctionnelles
+    if args.load:
+        manual = []
+        if args.manual_ratio:
+            try:
+                manual = load_scenarios(args.manual)
+            except FileNotFoundError as e:
+                print(f"{Colors.RED}❌  Sessions manuelles introuvables : {e.filename}{Colors.END}")
+                print(f"{Colors.DIM}   Importez-les d'abord : python runner.py import-sessions{Colors.END}")
+                sys.exit(1)
+            if not manual:
+                print(f"{Colors.RED}❌  Aucune session manuelle dans : {', '.join(args.manual)}{Colors.END}")
+                print(f"{Colors.DIM}   Importez-les d'abord : python runner.py import-sessions{Colors.END}")
+                sys.exit(1)
+            print(f"  ✓ {len(manual)} sessions manuelles ({args.manual_ratio:.0%} des conversations, "
+                  f"pauses × {args.think_scale})")
+        _warm_up(tester, scenarios, args, concurrency=pool_size)
+        report = LoadTest(
+            tester, cycle_scenarios(args.scenarios) if stream_load else scenarios,
+            rate=args.rate,
+            duration=args.duration,
+            ramp_up=args.ramp_up,
+            max_in_flight=args.max_in_flight,
+            manual=manual,
+            manual_ratio=args.manual_ratio,
+            # Rejeu sans latence : pas de pause humaine non plus
+            think_scale=0 if args.replay and args.replay_latency == "zero" else args.think_scale,
+        ).run()
+        print_load_report(report)
+        ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        if SAVE_RESULTS:
+            save_load_report(report, f"load_{ts}.json")
+        _write_trace(tracer, args, f"load_{ts}")
+        sys.exit(0)
+
+    # ── Mode répétition : statistiques d'instabilité, pas de flux JSONL ni de cache
+    if args.repeat > 1:
+        _warm_up(tester, scenarios, args, concurrency=args.concurrency)
+        sys.exit(_run_repeat(tester, scenarios, args))
+
+    # ── Flux de résultats JSONL : écrit au fil de l'eau, base de --resume et
+    #    des sorties finales (relues résultat par résultat, rien ne s'accumule)
+    scenario_order = [s["id"] for s in scenarios]
+    if args.resume:
+        stream_path = Path(args.resume)
+        done = completed_ids(stream_path) if stream_path.exists() else set()
+        scenarios = [s for s in scenarios if s["id"] not in done]
+        print(f"  ✓ Reprise : {len(done)} scénarios déjà terminés, {len(scenarios)} restants")
     else:
-        indicator = f"{Colors.RED}❌ Optimisation prompt nécessaire{Colors.END}"
-
-    print(f"  Taux :        {rate:.0f}%  —  {indicator}")
-    print(f"{'═'*70}\n")
+        ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        stream_path = Path(RESULTS_DIR) / f"results_{ts}{shard_suffix(args.shard)}.jsonl"
+    run_key = stream_path.stem.replace("results_", "", 1)
+    # Sans SAVE_RESULTS, le flux est un fichier temporaire supprimé en fin de run
+    temporary_stream = not (SAVE_RESULTS or args.resume)
+    if temporary_stream:
+        stream_path = Path(tempfile.mkstemp(prefix=f"{stream_path.stem}_", suffix=".jsonl")[1])
+    writer = ResultsWriter(stream_path)
+
+    # ── Cache par empreinte : scénarios inchangés repris tels quels
+    cache = None
+    if (CACHE_RESULTS or args.changed_only) and not args.replay:
+        cache = ResultCache()
+        fingerprint, origin = backend_fingerprint(health)
+        keys = {s["id"]: scenario_key(s, fingerprint, args.transport, api_url) for s in scenarios}
+        print(f"  ✓ Empreinte backend : {fingerprint} ({origin})")
+    if cache and args.changed_only:
+        to_run = []
+        for s in scenarios:
+            hit = cache.get(keys[s["id"]])
+            if hit:
+                writer.write(hit | {"cached": True, "cache_key": keys[s["id"]]})
+            else:
+                to_run.append(s)
+        print(f"  ✓ Cache : {len(scenarios) - len(to_run)} scénarios inchangés repris, {len(to_run)} à exécuter")
+        scenarios = to_run
+
+    def on_result(result: Dict):
+        writer.write(result)
+        if cache:
+            cache.put(keys[result["id"]], result)
+
+    # ── Échauffement, puis exécuter les tests
+    warmup = _warm_up(tester, scenarios, args, concurrency=args.concurrency)
+    run_start = time.time()
+    progress = ProgressLine(tester.metrics, total=len(scenarios)).start() if args.progress else None
+    completed = False
+    try:
+        tester.run_scenarios(
+            scenarios,
+            concurrency=args.concurrency,
+            on_result=on_result,
+            # Résumé et rapports relisent le flux JSONL : rien à garder en mémoire
+            keep_records=False,
+        )
+        completed = True
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠  Interrompu.{Colors.END}")
+        if not temporary_stream:
+            print(f"{Colors.DIM}   Reprendre avec : python runner.py --resume {stream_path}{Colors.END}")
+        _write_trace(tracer, args, run_key)
+        sys.exit(130)
+    finally:
+        if progress:
+            progress.stop()
+        writer.close()
+        # Flux temporaire (sans SAVE_RESULTS) : rien à reprendre après Ctrl-C ou erreur
+        if temporary_stream and not completed:
+            stream_path.unlink(missing_ok=True)
+    wall_clock = time.time() - run_start
+
+    def results() -> Iterator[Dict]:
+        """Les résultats du run (repris, cache et exécutés), relus un à un depuis le flux."""
+        return iter_latest(stream_path, order=scenario_order)
+
+    if cache:
+        cache.evict()
 
-    # ── Sauvegarder
-    ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    # ── Résumé global
+    summary = run_summary(results(), wall_clock)
+    summary["client"] = tester.throttle.stats.snapshot()
+    summary["warmup"] = warmup
+    print_summary(summary, title=f"RÉSUMÉ GLOBAL — shard {args.shard[0]}/{args.shard[1]}" if args.shard else "RÉSUMÉ GLOBAL")
+    passed, total = summary["passed"], summary["total"]
+
+    # ── Comparaison à la référence
+    regressions = 0
+    if args.baseline:
+        with tracer.span("baseline", "output"):
+            comparison = perf_baseline.compare(
+                results(),
+                load_run(args.baseline),
+                tolerance_pct=args.tolerance,
+                tokens_tolerance_pct=args.tokens_tolerance,
+            )
+        regressions = perf_baseline.print_comparison(comparison, args.baseline)
 
+    # ── Sauvegarder (même horodatage que le flux JSONL)
     if SAVE_RESULTS:
-        tester.save_results(results, f"results_{ts}.json")
+        with tracer.span("save_results", "output"):
+            save_json_array(results(), f"results_{run_key}.json")
+            tester.save_results(summary, f"summary_{run_key}.json")
 
     if GENERATE_HTML_REPORT:
-        tester.generate_html_report(results, f"report_{ts}.html")
+        with tracer.span("html_report", "output"):
+            generate_html_report(results(), f"report_{run_key}.html", summary=summary)
+
+    # Un shard n'est qu'une partie du run : l'historique est alimenté par `merge`
+    if SAVE_HISTORY and not args.shard:
+        with closing(run_history.connect()) as conn, tracer.span("history", "output"):
+            # Les résultats repris du cache ont déjà été ingérés avec leur run d'origine
+            run_history.ingest_run(
+                conn, run_key, (r for r in results() if not r.get("cached")),
+                api_url=api_url, transport=args.transport, duration_seconds=wall_clock,
+            )
+        print(f"{Colors.BLUE}🗄   Historique → {run_history.HISTORY_DB}{Colors.END}")
+
+    if temporary_stream:
+        stream_path.unlink(missing_ok=True)
+    _write_trace(tracer, args, run_key)
 
-    # ── Exit code  (0 ⇒ tous OK, 1 ⇒ au moins 1 échec)
-    sys.exit(0 if passed == total else 1)
+    # ── Exit code  (0 ⇒ tous OK, 1 ⇒ au moins 1 échec ou 1 régression de perf)
+    sys.exit(0 if passed == total and not regressions else 1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Chat4Lead — Exécution répartie (shards) et fusion des résultats
+================================================================
+`--shard K/N` ne garde que les scénarios dont le hash de l'ID tombe dans
+le shard K : la partition ne dépend que des IDs (pas de l'ordre ni du
+contenu des catalogues), donc chaque runner CI ou cœur calcule la même
+sans coordination.
+
+`merge` recombine les fichiers de résultats des shards (JSON ou JSONL)
+en un seul results_<ts>.json + rapport HTML, avec des statistiques
+globales recalculées sur l'ensemble des scénarios.
+
+Usage:
+    python runner.py --scenarios scenarios.json scenarios-33.json --shard 1/4
+    python runner.py merge results/results_*_shard-*.jsonl
+    python runner.py merge results/*shard*.json --scenarios scenarios-33.json --name nightly
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from config import RESULTS_DIR, SCENARIOS_FILE, SAVE_HISTORY, GENERATE_HTML_REPORT
+from console import Colors
+from report import generate_html_report
+from results_store import load_run, save_json
+import run_history
+from summary import print_summary, run_summary
+from tracing import merge_chrome_traces
+
+
+# ══════════════════════════════════════════════
+#  PARTITION
+# ══════════════════════════════════════════════
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Argument argparse « K/N » (1 ≤ K ≤ N)."""
+    match = re.fullmatch(r"(\d+)/(\d+)", value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError("format attendu : K/N (ex: 2/4)")
+    k, n = int(match.group(1)), int(match.group(2))
+    if not 1 <= k <= n:
+        raise argparse.ArgumentTypeError("K doit être compris entre 1 et N")
+    return k, n
+
+
+def shard_index(scenario_id: str, shards: int) -> int:
+    """Shard (0-based) d'un ID. sha1 plutôt que hash() : stable entre process."""
+    digest = hashlib.sha1(scenario_id.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], "big") % shards
+
+
+def select_shard(scenarios: List[Dict], k: int, n: int) -> List[Dict]:
+    return [s for s in scenarios if shard_index(s["id"], n) == k - 1]
+
+
+def shard_suffix(shard: Optional[Tuple[int, int]]) -> str:
+    """Suffixe des fichiers de sortie d'un shard (vide hors shard)."""
+    return f"_shard-{shard[0]}-of-{shard[1]}" if shard else ""
+
+
+def iter_catalogue(path: str) -> Iterator[Dict]:
+    """Scénarios d'un catalogue : tableau JSON, ou JSONL lu ligne à ligne (corpus synth.py)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if not str(path).endswith(".jsonl"):
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def is_streamable(paths: Sequence[str]) -> bool:
+    """Catalogues JSONL uniquement : le mode charge peut les lire sans tout charger."""
+    return all(str(p).endswith(".jsonl") for p in paths)
+
+
+def cycle_scenarios(paths: Sequence[str]) -> Iterator[Dict]:
+    """
+    Tourniquet infini sur les catalogues, relus depuis le disque à chaque
+    passe : mémoire constante quelle que soit la taille du corpus. Pas de
+    dédoublonnage des IDs (inutile sans assertions).
+    """
+    while True:
+        empty = True
+        for path in paths:
+            for scenario in iter_catalogue(path):
+                empty = False
+                yield scenario
+        if empty:
+            return
+
+
+def load_scenarios(paths: Sequence[str]) -> List[Dict]:
+    """Concatène des catalogues de scénarios ; pour un ID en double, le premier gagne."""
+    scenarios: List[Dict] = []
+    seen = set()
+    duplicates = 0
+    for path in paths:
+        for scenario in iter_catalogue(path):
+            if scenario["id"] in seen:
+                duplicates += 1
+                continue
+            seen.add(scenario["id"])
+            scenarios.append(scenario)
+    if duplicates:
+        print(f"{Colors.YELLOW}⚠  {duplicates} scénario(s) en double ignoré(s) "
+              f"(même ID dans plusieurs catalogues){Colors.END}")
+    return scenarios
+
+
+# ══════════════════════════════════════════════
+#  FUSION
+# ══════════════════════════════════════════════
+
+def _shard_wall_clock(path: Path) -> Optional[float]:
+    """Durée réelle d'un shard, lue dans le summary_<ts>.json voisin s'il existe."""
+    summary_path = path.with_name(path.stem.replace("results_", "summary_", 1) + ".json")
+    if not summary_path.exists():
+        return None
+    with open(summary_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("wall_clock_seconds")
+
+
+def merge_runs(paths: Sequence[Path], order: Sequence[str]) -> Tuple[List[Dict], List[str]]:
+    """
+    Résultats fusionnés, dans l'ordre du catalogue (IDs inconnus en fin,
+    triés). Renvoie aussi les IDs présents dans plusieurs fichiers : le
+    dernier fichier l'emporte, comme pour une reprise.
+    """
+    merged: Dict[str, Dict] = {}
+    duplicates: List[str] = []
+    for path in paths:
+        for result in load_run(path):
+            if result["id"] in merged:
+                duplicates.append(result["id"])
+            merged[result["id"]] = result
+
+    rank = {sid: i for i, sid in enumerate(order)}
+    results = sorted(merged.values(), key=lambda r: (rank.get(r["id"], len(rank)), r["id"]))
+    return results, duplicates
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="runner.py merge", description="Chat4Lead — Fusion des shards")
+    parser.add_argument("files", nargs="+", help="Fichiers results_*.json|.jsonl des shards")
+    parser.add_argument(
+        "--scenarios", nargs="+", default=[SCENARIOS_FILE], metavar="FICHIER",
+        help="Catalogue(s) donnant l'ordre des scénarios dans la sortie.",
+    )
+    parser.add_argument("--name", help="Suffixe des fichiers de sortie (défaut: horodatage).")
+    args = parser.parse_args(argv)
+
+    paths = [Path(p) for p in args.files]
+    missing = [str(p) for p in paths if not p.exists()]
+    if missing:
+        print(f"{Colors.RED}❌  Fichier(s) introuvable(s) : {', '.join(missing)}{Colors.END}")
+        sys.exit(1)
+
+    try:
+        order = [s["id"] for s in load_scenarios(args.scenarios)]
+    except FileNotFoundError:
+        order = []
+    results, duplicates = merge_runs(paths, order)
+    print(f"  ✓ {len(paths)} fichiers, {len(results)} scénarios fusionnés")
+    if duplicates:
+        print(f"{Colors.YELLOW}⚠  IDs présents dans plusieurs shards (dernier retenu) : "
+              f"{', '.join(sorted(set(duplicates)))}{Colors.END}")
+
+    # Les shards tournent en parallèle : la durée du run est celle du plus lent
+    wall_clocks = [w for w in (_shard_wall_clock(p) for p in paths) if w is not None]
+    wall_clock = max(wall_clocks) if len(wall_clocks) == len(paths) else None
+
+    summary = run_summary(results, wall_clock)
+    summary["shards"] = [str(p) for p in paths]
+    print_summary(summary, title=f"RÉSUMÉ GLOBAL — {len(paths)} shards fusionnés")
+
+    ts = args.name or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    save_json(results, f"results_{ts}.json")
+    save_json(summary, f"summary_{ts}.json")
+    if GENERATE_HTML_REPORT:
+        generate_html_report(results, f"report_{ts}.html", summary=summary)
+    # Traces des shards (--trace) superposées sur un même axe de temps
+    traces = [p.with_name(p.stem.replace("results_", "trace_", 1) + ".json") for p in paths]
+    traces = [t for t in traces if t.exists()]
+    if traces:
+        merged_trace = merge_chrome_traces(traces, Path(RESULTS_DIR) / f"trace_{ts}.json")
+        print(f"{Colors.BLUE}🧵  Trace → {merged_trace} ({len(traces)} shards){Colors.END}")
+    if SAVE_HISTORY:
+        with closing(run_history.connect()) as conn:
+            # Comme le runner : les résultats repris du cache ne sont pas de nouvelles exécutions
+            run_history.ingest_run(conn, ts, [r for r in results if not r.get("cached")],
+                                   duration_seconds=wall_clock)
+        print(f"{Colors.BLUE}🗄   Historique → {run_history.HISTORY_DB}{Colors.END}")
+
+    sys.exit(0 if summary["passed"] == summary["total"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Chat4Lead — Driver Socket.io (utilisateurs virtuels)
+=====================================================
+Simule des centaines de widgets connectés au gateway
+(conversation.gateway.ts) depuis un seul process, sur une boucle asyncio :
+
+    connect (auth apiKey) → POST /conversation/init → join-conversation
+    → send-message → bot-typing → bot-message
+
+Les sockets sont ouvertes par paliers (`step`). À chaque palier, toutes
+les sockets ouvertes envoient le message suivant de leur script (puis
+les paliers continuent à nombre constant jusqu'à la fin des scripts) ; on
+mesure le coût de connexion/join des nouvelles sockets et les latences
+bot-typing / bot-message en fonction du nombre de sockets ouvertes.
+
+Dépendances optionnelles :  pip install "python-socketio[asyncio_client]"
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import API_URL, API_KEY, DELAY_BETWEEN_MESSAGES, TIMEOUT, RESULTS_DIR
+from console import Colors
+from stats import fmt_ms, latency_summary
+
+try:
+    import aiohttp
+    import socketio
+except ImportError:  # dépendances optionnelles, vérifiées dans run()
+    aiohttp = None
+    socketio = None
+
+
+class VirtualUser:
+    """Une socket = un visiteur du widget rejouant un script de scénario."""
+
+    def __init__(self, index: int, scenario: Dict):
+        self.index = index
+        self.messages: List[str] = scenario["messages"]
+        self.turn = 0
+        self.conversation_id: Optional[str] = None
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self._typing: Optional[asyncio.Future] = None
+        self._reply: Optional[asyncio.Future] = None
+
+        self.sio.on("bot-typing", self._on_typing)
+        self.sio.on("bot-message", self._on_message)
+        self.sio.on("bot-error", self._on_error)
+
+    @property
+    def has_next(self) -> bool:
+        return self.conversation_id is not None and self.turn < len(self.messages)
+
+    async def _on_typing(self, *_):
+        if self._typing and not self._typing.done():
+            self._typing.set_result(time.perf_counter())
+
+    async def _on_message(self, data):
+        if self._reply and not self._reply.done():
+            self._reply.set_result((time.perf_counter(), data))
+
+    async def _on_error(self, data):
+        error = RuntimeError(f"bot-error: {(data or {}).get('error')}")
+        for future in (self._typing, self._reply):
+            if future and not future.done():
+                future.set_exception(error)
+
+    async def open(self, http) -> Dict:
+        """Connexion + init REST + join. Renvoie les durées (ms) de chaque étape."""
+        base_url = API_URL[:-4] if API_URL.endswith("/api") else API_URL
+
+        start = time.perf_counter()
+        await self.sio.connect(
+            base_url,
+            auth={"apiKey": API_KEY},
+            transports=["websocket"],
+            wait_timeout=TIMEOUT,
+        )
+        connect_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        async with http.post(f"{API_URL}/conversation/init", json={}) as r:
+            r.raise_for_status()
+            self.conversation_id = (await r.json())["conversationId"]
+        init_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        ack = await self.sio.call(
+            "join-conversation",
+            {"conversationId": self.conversation_id},
+            timeout=TIMEOUT,
+        )
+        join_ms = (time.perf_counter() - start) * 1000
+        if not (ack or {}).get("ok"):
+            raise RuntimeError(f"join refusé: {(ack or {}).get('error')}")
+
+        return {"connect_ms": connect_ms, "init_ms": init_ms, "join_ms": join_ms}
+
+    async def send_next(self) -> Dict:
+        """Envoie le prochain message du script et attend bot-typing puis bot-message."""
+        loop = asyncio.get_running_loop()
+        self._typing = loop.create_future()
+        self._reply = loop.create_future()
+        message = self.messages[self.turn]
+        self.turn += 1
+
+        start = time.perf_counter()
+        await self.sio.emit("send-message", {
+            "conversationId": self.conversation_id,
+            "message": message,
+        })
+        typed_at = await asyncio.wait_for(self._typing, TIMEOUT)
+        replied_at, _ = await asyncio.wait_for(self._reply, TIMEOUT)
+        return {
+            "typing_ms": (typed_at - start) * 1000,
+            "message_ms": (replied_at - start) * 1000,
+        }
+
+    async def close(self):
+        if self.sio.connected:
+            await self.sio.disconnect()
+
+
+class SocketLoadTest:
+    """Montée en charge par paliers de sockets Socket.io ouvertes simultanément."""
+
+    def __init__(self, scenarios: List[Dict], users: int, step: int):
+        self.scenarios = scenarios
+        self.users = users
+        self.step = max(1, min(step, users))
+
+    def run(self) -> Dict:
+        if socketio is None or aiohttp is None:
+            raise RuntimeError(
+                'python-socketio et aiohttp requis : pip install "python-socketio[asyncio_client]"'
+            )
+        return asyncio.run(self._run())
+
+    async def _run(self) -> Dict:
+        print(f"\n  {Colors.BOLD}🔌 Socket.io : {self.users} utilisateurs virtuels "
+              f"par paliers de {self.step}{Colors.END}")
+
+        users: List[VirtualUser] = []
+        stages: List[Dict] = []
+        connector = aiohttp.TCPConnector(limit=self.step)
+        t0 = time.time()
+
+        async with aiohttp.ClientSession(
+            connector=connector,
+            headers={'x-api-key': API_KEY},
+            timeout=aiohttp.ClientTimeout(total=TIMEOUT),
+        ) as http:
+            try:
+                # Paliers d'ouverture, puis paliers à nombre constant de
+                # sockets tant que des scripts ne sont pas terminés
+                while len(users) < self.users or any(u.sio.connected and u.has_next for u in users):
+                    cohort = [
+                        VirtualUser(len(users) + i, self.scenarios[(len(users) + i) % len(self.scenarios)])
+                        for i in range(min(self.step, self.users - len(users)))
+                    ]
+                    users.extend(cohort)
+                    stage = await self._run_stage(http, users, cohort)
+                    stages.append(stage)
+                    self._print_stage(stage)
+                    await asyncio.sleep(DELAY_BETWEEN_MESSAGES)
+            finally:
+                await asyncio.gather(*(u.close() for u in users), return_exceptions=True)
+
+        return {
+            "mode": "socketio",
+            "timestamp": datetime.now().isoformat(),
+            "config": {
+                "users": self.users,
+                "step": self.step,
+                "scenarios": [s["id"] for s in self.scenarios],
+            },
+            "elapsed_seconds": round(time.time() - t0, 1),
+            "stages": stages,
+        }
+
+    async def _run_stage(self, http, users: List[VirtualUser], cohort: List[VirtualUser]) -> Dict:
+        """Ouvre la cohorte puis fait parler toutes les sockets ouvertes."""
+        errors: Dict[str, int] = {}
+
+        def count_error(e: BaseException):
+            key = f"{type(e).__name__}: {str(e)[:120]}"
+            errors[key] = errors.get(key, 0) + 1
+
+        opened = await asyncio.gather(*(u.open(http) for u in cohort), return_exceptions=True)
+        open_costs = [o for o in opened if isinstance(o, dict)]
+        for user, o in zip(cohort, opened):
+            if isinstance(o, BaseException):
+                count_error(o)
+                user.conversation_id = None  # ne participera pas aux échanges
+
+        talkers = [u for u in users if u.sio.connected and u.has_next]
+        sent = await asyncio.gather(*(u.send_next() for u in talkers), return_exceptions=True)
+        timings = [s for s in sent if isinstance(s, dict)]
+        for s in sent:
+            if isinstance(s, BaseException):
+                count_error(s)
+
+        return {
+            "open_sockets": sum(1 for u in users if u.sio.connected),
+            "new_sockets": len(cohort),
+            "messages": len(talkers),
+            "errors": sum(errors.values()),
+            "error_types": errors,
+            "connect_ms": latency_summary([o["connect_ms"] for o in open_costs]),
+            "init_ms": latency_summary([o["init_ms"] for o in open_costs]),
+            "join_ms": latency_summary([o["join_ms"] for o in open_costs]),
+            "typing_ms": latency_summary([t["typing_ms"] for t in timings]),
+            "message_ms": latency_summary([t["message_ms"] for t in timings]),
+        }
+
+    @staticmethod
+    def _print_stage(stage: Dict):
+        err = f"{Colors.RED}{stage['errors']} err{Colors.END}" if stage["errors"] else "0 err"
+        print(f"  {Colors.DIM}sockets={stage['open_sockets']:>4}{Colors.END}  "
+              f"connect p95={fmt_ms(stage['connect_ms']['p95'])}  "
+              f"join p95={fmt_ms(stage['join_ms']['p95'])}  "
+              f"typing p95={fmt_ms(stage['typing_ms']['p95'])}  "
+              f"message p95={fmt_ms(stage['message_ms']['p95'])}  ({stage['messages']} msg, {err})")
+
+
+def print_socketio_report(report: Dict):
+    """Tableau de passage à l'échelle : latences en fonction des sockets ouvertes."""
+    print(f"\n{'═'*70}")
+    print(f"  {Colors.BOLD}🔌  RAPPORT SOCKET.IO{Colors.END}  ({report['elapsed_seconds']}s)")
+    print(f"{'═'*70}")
+    print(f"  {'Sockets':>7}  {'Connect p50':>11}  {'Join p50':>9}  "
+          f"{'Typing p95':>10}  {'Msg p50':>9}  {'Msg p95':>9}  {'Err':>4}")
+    for s in report["stages"]:
+        print(f"  {s['open_sockets']:>7}  {fmt_ms(s['connect_ms']['p50']):>11}  "
+              f"{fmt_ms(s['join_ms']['p50']):>9}  {fmt_ms(s['typing_ms']['p95']):>10}  "
+              f"{fmt_ms(s['message_ms']['p50']):>9}  {fmt_ms(s['message_ms']['p95']):>9}  "
+              f"{s['errors']:>4}")
+    print(f"{'═'*70}\n")
+
+
+def save_socketio_report(report: Dict, filename: str) -> Path:
+    Path(RESULTS_DIR).mkdir(parents=True, exist_ok=True)
+    filepath = Path(RESULTS_DIR) / filename
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+    print(f"{Colors.BLUE}💾  Rapport Socket.io → {filepath}{Colors.END}")
+    return filepath
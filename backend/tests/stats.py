@@ -0,0 +1,262 @@
+"""
+Chat4Lead - Statistiques de latence pour les outils de test
+"""
+
+import math
+import statistics
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Bornes supérieures (ms) des classes d'histogramme de latence
+LATENCY_BUCKETS_MS = [250, 500, 1000, 2000, 3000, 5000, 8000, 13000, 20000, 30000, 60000]
+
+
+def percentile(values: Sequence[float], p: float) -> Optional[float]:
+    """Percentile `p` (0-100) par interpolation linéaire. None si vide."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return float(ordered[0])
+    rank = (len(ordered) - 1) * p / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return float(ordered[low])
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(values: Sequence[float]) -> Dict:
+    """count / mean / stddev / p50 / p95 / p99 / max d'une série de latences (ms)."""
+    if not values:
+        return {"count": 0, "mean": None, "stddev": None, "p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 1),
+        "stddev": round(statistics.stdev(values), 1) if len(values) > 1 else 0.0,
+        "p50": round(percentile(values, 50), 1),
+        "p95": round(percentile(values, 95), 1),
+        "p99": round(percentile(values, 99), 1),
+        "max": max(values),
+    }
+
+
+def wilson_interval(successes: int, n: int, z: float = 1.96) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Intervalle de confiance (Wilson, 95 % par défaut) d'une proportion.
+    Reste informatif aux extrêmes (5/5 → [0.57, 1]) contrairement à p ± z·σ.
+    """
+    if not n:
+        return None, None
+    p = successes / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return round(max(0.0, centre - half), 3), round(min(1.0, centre + half), 3)
+
+
+# ─── Tests de significativité (A/B) ──────────
+#  Approximation normale avec correction des ex æquo : suffisante dès une
+#  dizaine d'observations ; en deçà, la p-valeur est indicative.
+
+def _two_sided_p(z: float) -> float:
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def _ranks(values: Sequence[float]) -> Tuple[List[float], float]:
+    """Rangs moyens (1-based) et Σ(t³ − t) des groupes d'ex æquo."""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    ties = 0.0
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    return ranks, ties
+
+
+def mann_whitney_u(a: Sequence[float], b: Sequence[float]) -> Optional[Dict]:
+    """
+    Deux échantillons indépendants (ex: latences de tous les messages).
+    `effect` : corrélation rang-bisériale, > 0 si b tend à être plus grand.
+    """
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return None
+    ranks, ties = _ranks(list(a) + list(b))
+    u1 = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0
+    z = (u1 - n1 * n2 / 2) / math.sqrt(variance) if variance > 0 else 0.0
+    return {"u": u1, "z": round(z, 3), "p": round(_two_sided_p(z), 4),
+            "effect": round(1 - 2 * u1 / (n1 * n2), 3)}
+
+
+def wilcoxon_signed_rank(differences: Sequence[float]) -> Optional[Dict]:
+    """Échantillons appariés (même scénario sur A et B) : différences b − a, zéros écartés."""
+    diffs = [d for d in differences if d]
+    n = len(diffs)
+    if not n:
+        return {"n": 0, "w": 0.0, "z": 0.0, "p": 1.0} if differences else None
+    ranks, ties = _ranks([abs(d) for d in diffs])
+    w_plus = sum(r for r, d in zip(ranks, diffs) if d > 0)
+    variance = n * (n + 1) * (2 * n + 1) / 24 - ties / 48
+    z = (w_plus - n * (n + 1) / 4) / math.sqrt(variance) if variance > 0 else 0.0
+    return {"n": n, "w": w_plus, "z": round(z, 3), "p": round(_two_sided_p(z), 4)}
+
+
+def mcnemar(only_a: int, only_b: int) -> Dict:
+    """Réussites appariées discordantes (A seul OK, B seul OK) : test binomial exact bilatéral."""
+    n = only_a + only_b
+    if not n:
+        return {"only_a": 0, "only_b": 0, "p": 1.0}
+    tail = sum(math.comb(n, k) for k in range(min(only_a, only_b) + 1)) / 2 ** n
+    return {"only_a": only_a, "only_b": only_b, "p": round(min(1.0, 2 * tail), 4)}
+
+
+def histogram(values: Sequence[float], edges: List[float] = LATENCY_BUCKETS_MS) -> List[Dict]:
+    """Histogramme par classe (non cumulé) : [{"le": borne, "count": n}, …, {"le": "+Inf"}]."""
+    counts = [0] * (len(edges) + 1)
+    for v in values:
+        for i, edge in enumerate(edges):
+            if v <= edge:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    buckets = [{"le": edge, "count": c} for edge, c in zip(edges, counts)]
+    buckets.append({"le": "+Inf", "count": counts[-1]})
+    return buckets
+
+
+def fmt_ms(value: Optional[float]) -> str:
+    """Formate une latence pour l'affichage console."""
+    return "—" if value is None else f"{value:.0f}ms"
+
+
+class Breakdown:
+    """
+    Répartition du temps client entre le LLM (metadata.latencyMs renvoyé
+    par le backend) et le reste du pipeline : DB, context manager,
+    extraction d'entités, réseau. Plus les tokens consommés.
+
+    Alimentée échange par échange : sommes courantes, et seules les
+    valeurs nécessaires aux percentiles sont gardées (colonne `array`).
+    """
+
+    def __init__(self):
+        self.exchanges = 0
+        self.client_ms = 0
+        self.llm_ms = 0
+        self.llm_count = 0
+        self.overhead_ms = 0
+        self.overheads = array("d")
+        self.tokens = 0
+        self.token_turns = 0
+        self.retries = 0
+        self.retry_ms = 0
+        self.throttle_wait_ms = 0
+
+    def add(self, ex: Dict):
+        if ex.get("latency_ms") is not None:
+            self.exchanges += 1
+            self.client_ms += ex["latency_ms"]
+        if ex.get("server_latency_ms") is not None:
+            self.llm_count += 1
+            self.llm_ms += ex["server_latency_ms"]
+        if ex.get("overhead_ms") is not None:
+            self.overhead_ms += ex["overhead_ms"]
+            self.overheads.append(ex["overhead_ms"])
+        if ex.get("tokens_used") is not None:
+            self.token_turns += 1
+            self.tokens += ex["tokens_used"]
+        self.retries += ex.get("retries") or 0
+        self.retry_ms += ex.get("retry_ms") or 0
+        self.throttle_wait_ms += ex.get("throttle_wait_ms") or 0
+
+    def result(self) -> Dict:
+        overhead = self.overheads
+        return {
+            "exchanges": self.exchanges,
+            "client_ms": self.client_ms,
+            "llm_ms": self.llm_ms,
+            "overhead_ms": self.overhead_ms,
+            "llm_share": round(self.llm_ms / self.client_ms, 3) if self.client_ms and self.llm_count else None,
+            "overhead_p50_ms": round(percentile(overhead, 50), 1) if overhead else None,
+            "overhead_p95_ms": round(percentile(overhead, 95), 1) if overhead else None,
+            "tokens": self.tokens if self.token_turns else None,
+            "tokens_per_turn": round(self.tokens / self.token_turns, 1) if self.token_turns else None,
+            # Coût côté client, hors latence : retries (429/5xx) et attentes du limiteur
+            "retries": self.retries,
+            "retry_ms": self.retry_ms,
+            "throttle_wait_ms": self.throttle_wait_ms,
+        }
+
+
+def latency_breakdown(exchanges: Sequence[Dict]) -> Dict:
+    """Répartition client / LLM / pipeline d'une liste d'échanges (voir `Breakdown`)."""
+    breakdown = Breakdown()
+    for ex in exchanges:
+        breakdown.add(ex)
+    return breakdown.result()
+
+
+class _TemperatureGroup:
+    __slots__ = ("latencies", "llm", "tokens", "token_turns", "cache_read", "cache_turns")
+
+    def __init__(self):
+        self.latencies = array("d")
+        self.llm = array("d")
+        self.tokens = self.token_turns = self.cache_read = self.cache_turns = 0
+
+    def result(self) -> Dict:
+        return {
+            "exchanges": len(self.latencies),
+            "p50_ms": round(percentile(self.latencies, 50), 1) if self.latencies else None,
+            "p95_ms": round(percentile(self.latencies, 95), 1) if self.latencies else None,
+            "llm_p50_ms": round(percentile(self.llm, 50), 1) if self.llm else None,
+            "tokens_per_turn": round(self.tokens / self.token_turns, 1) if self.token_turns else None,
+            "cache_read_tokens_per_turn": round(self.cache_read / self.cache_turns, 1) if self.cache_turns else None,
+        }
+
+
+class ColdWarmSplit:
+    """
+    Latences et tokens des échanges froids (premier message, connexion
+    HTTP neuve, cache de prompt manqué côté provider) vs chauds. Les
+    échanges sans marquage (résultats antérieurs) sont ignorés.
+    """
+
+    def __init__(self):
+        self.groups = {"cold": _TemperatureGroup(), "warm": _TemperatureGroup()}
+
+    def add(self, ex: Dict):
+        if ex.get("cold") not in (True, False) or ex.get("latency_ms") is None:
+            return
+        group = self.groups["cold" if ex["cold"] else "warm"]
+        group.latencies.append(ex["latency_ms"])
+        if ex.get("server_latency_ms") is not None:
+            group.llm.append(ex["server_latency_ms"])
+        if ex.get("tokens_used") is not None:
+            group.tokens += ex["tokens_used"]
+            group.token_turns += 1
+        if ex.get("cache_read_tokens") is not None:
+            group.cache_read += ex["cache_read_tokens"]
+            group.cache_turns += 1
+
+    def result(self) -> Dict:
+        return {label: group.result() for label, group in self.groups.items()}
+
+
+def cold_warm_split(exchanges: Sequence[Dict]) -> Dict:
+    """Échanges froids vs chauds d'une liste d'échanges (voir `ColdWarmSplit`)."""
+    split = ColdWarmSplit()
+    for ex in exchanges:
+        split.add(ex)
+    return split.result()
@@ -0,0 +1,146 @@
+"""
+Chat4Lead — Résumé global d'un run
+===================================
+Agrégats d'un ensemble de résultats (statut, répartition du temps
+client entre LLM et pipeline, coût en tokens par lead qualifié) et
+leur affichage console. Partagé par le runner et la fusion de shards.
+
+Les agrégats sont calculés au fil de l'eau (`RunTotals`) : un run relu
+depuis son flux JSONL ne passe jamais entièrement en mémoire.
+"""
+
+from typing import Dict, Iterable, Optional
+
+from config import QUALIFIED_PRIORITIES
+from console import Colors
+from stats import Breakdown, ColdWarmSplit, fmt_ms
+
+# Types d'assertion des SLO de performance (voir runner._slo_checks)
+SLO_ASSERTION_TYPES = ("latency.", "duration", "tokens.", "ttft.")
+
+
+def failed_slo(result: Dict) -> bool:
+    """Au moins un SLO de performance (final ou d'un tour) non tenu ?"""
+    return any(
+        not a["passed"] and a["type"].split(" · ")[-1].startswith(SLO_ASSERTION_TYPES)
+        for a in result.get("assertions") or []
+    )
+
+
+class RunTotals:
+    """Agrégats du run, alimentés un résultat à la fois."""
+
+    def __init__(self):
+        self.total = self.passed = self.aborted = self.cached = self.qualified = self.slo_failed = 0
+        self.breakdown = Breakdown()
+        self.cold_warm = ColdWarmSplit()
+
+    def add(self, result: Dict):
+        self.total += 1
+        self.passed += 1 if result.get("passed") else 0
+        self.aborted += 1 if result.get("aborted_at_turn") else 0
+        self.cached += 1 if result.get("cached") else 0
+        self.slo_failed += 1 if failed_slo(result) else 0
+        if (result.get("final_lead") or {}).get("priorite") in QUALIFIED_PRIORITIES:
+            self.qualified += 1
+        for ex in result.get("exchanges") or []:
+            self.breakdown.add(ex)
+            self.cold_warm.add(ex)
+
+    def summary(self, wall_clock: Optional[float] = None) -> Dict:
+        perf = self.breakdown.result()
+        qualified = self.qualified
+        return {
+            "total": self.total,
+            "passed": self.passed,
+            "aborted": self.aborted,
+            "cached": self.cached,
+            "slo_failed": self.slo_failed,
+            "wall_clock_seconds": round(wall_clock, 1) if wall_clock is not None else None,
+            "qualified_leads": qualified,
+            "tokens_per_qualified_lead": round(perf["tokens"] / qualified) if perf["tokens"] and qualified else None,
+            "perf": perf,
+            "cold_warm": self.cold_warm.result(),
+        }
+
+
+def run_summary(results: Iterable[Dict], wall_clock: Optional[float] = None) -> Dict:
+    """Agrégats du run : statut, répartition client/LLM/pipeline, coût par lead qualifié."""
+    totals = RunTotals()
+    for result in results:
+        totals.add(result)
+    return totals.summary(wall_clock)
+
+
+def fmt_breakdown(perf: Dict) -> str:
+    """Résumé client / LLM / pipeline / tokens pour la console."""
+    text = f"{perf['client_ms'] / 1000:.1f}s client"
+    if perf.get("llm_share") is not None:
+        text += (f" = {perf['llm_ms'] / 1000:.1f}s LLM ({perf['llm_share']:.0%})"
+                 f" + {perf['overhead_ms'] / 1000:.1f}s pipeline"
+                 f" (p50 {perf['overhead_p50_ms']:.0f}ms/tour)")
+    if perf.get("tokens") is not None:
+        text += f" | {perf['tokens']} tokens ({perf['tokens_per_turn']:.0f}/tour)"
+    return text
+
+
+def fmt_temperature(group: Dict, label: str) -> str:
+    """« 8 froids p50 1450ms (LLM 1200ms, 3100 tok/tour, 0 en cache) » pour la console."""
+    text = f"{group['exchanges']} {label} p50 {fmt_ms(group['p50_ms'])}"
+    details = []
+    if group["llm_p50_ms"] is not None:
+        details.append(f"LLM {fmt_ms(group['llm_p50_ms'])}")
+    if group["tokens_per_turn"] is not None:
+        details.append(f"{group['tokens_per_turn']:.0f} tok/tour")
+    if group["cache_read_tokens_per_turn"] is not None:
+        details.append(f"{group['cache_read_tokens_per_turn']:.0f} en cache")
+    return text + (f" ({', '.join(details)})" if details else "")
+
+
+def print_summary(summary: Dict, title: str = "RÉSUMÉ GLOBAL"):
+    total, passed = summary["total"], summary["passed"]
+    rate = (passed / total * 100) if total else 0
+
+    print(f"\n{'═'*70}")
+    print(f"  {Colors.BOLD}📊  {title}{Colors.END}")
+    print(f"{'═'*70}")
+    print(f"  Total :       {total}")
+    print(f"  {Colors.GREEN}Réussis :     {passed}{Colors.END}")
+    print(f"  {Colors.RED}Échoués :     {total - passed}{Colors.END}")
+    if summary.get("aborted"):
+        print(f"  {Colors.DIM}  dont {summary['aborted']} arrêté(s) en cours (fail-fast){Colors.END}")
+    if summary.get("slo_failed"):
+        print(f"  {Colors.RED}  dont {summary['slo_failed']} hors SLO (latence, durée ou tokens){Colors.END}")
+    if summary.get("cached"):
+        print(f"  {Colors.DIM}Repris du cache : {summary['cached']} (inchangés){Colors.END}")
+    if summary.get("wall_clock_seconds") is not None:
+        print(f"  Durée :       {summary['wall_clock_seconds']:.0f}s")
+    print(f"  Temps :       {fmt_breakdown(summary['perf'])}")
+    warmup = summary.get("warmup")
+    if warmup:
+        print(f"  {Colors.DIM}Échauffement : {warmup['conversations']} conversations, {warmup['messages']} messages "
+              f"en {warmup['seconds']:.1f}s (exclus des stats){Colors.END}")
+    split = summary.get("cold_warm") or {}
+    if (split.get("cold") or {}).get("exchanges"):
+        print(f"  Froid/chaud : {fmt_temperature(split['cold'], 'froids')} · {fmt_temperature(split['warm'], 'chauds')}")
+    client = summary.get("client")
+    if client and (client["retries"] or client["throttled_requests"] or client["conversation_slot_wait_s"]):
+        print(f"  Limiteur :    {client['throttled_requests']}/{client['requests']} requêtes retardées "
+              f"(+{client['throttle_wait_s']:.1f}s), attente de slot {client['conversation_slot_wait_s']:.1f}s")
+        by_status = ", ".join(f"{k}×{v}" for k, v in sorted(client["retries_by_status"].items()))
+        gave_up = f" — {Colors.RED}{client['gave_up']} abandon(s){Colors.END}" if client["gave_up"] else ""
+        print(f"  Retries :     {client['retries']} ({by_status or '—'}, "
+              f"+{client['retry_wait_s']:.1f}s de backoff){gave_up}")
+    if summary["tokens_per_qualified_lead"] is not None:
+        print(f"  Coût :        {summary['tokens_per_qualified_lead']} tokens / lead qualifié "
+              f"({summary['qualified_leads']} leads {'/'.join(QUALIFIED_PRIORITIES)})")
+
+    if rate >= 80:
+        indicator = f"{Colors.GREEN}✅ Qualité validée{Colors.END}"
+    elif rate >= 60:
+        indicator = f"{Colors.YELLOW}⚠️  Ajustements mineurs recommandés{Colors.END}"
+    else:
+        indicator = f"{Colors.RED}❌ Optimisation prompt nécessaire{Colors.END}"
+
+    print(f"  Taux :        {rate:.0f}%  —  {indicator}")
+    print(f"{'═'*70}\n")
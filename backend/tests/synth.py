@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Chat4Lead — Générateur de scénarios synthétiques
+=================================================
+Produit des milliers de scénarios valides pour les tests de charge à
+partir de gabarits de conversation et de vocabulaires (villes et
+adresses, surfaces, étages / ascenseur, dates, formules, identités,
+formats de téléphone). Chaque scénario porte un bloc `expected` cohérent
+avec ce qu'il contient : champs attendus (valeurs normalisées comme le
+backend les stocke), bornes de score et priorités plausibles selon le
+profil du lead.
+
+Reproductible : même `--seed` et même `--count` ⇒ fichier identique à
+l'octet. Les scénarios sont écrits en JSONL au fil de la génération
+(rien n'est gardé en mémoire) ; le runner les relit ligne à ligne, et en
+mode charge sans jamais charger le catalogue entier (voir shard.py).
+
+Usage:
+    python runner.py synth --count 5000 --seed 42
+    python runner.py synth --count 20000 --seed 7 -o scenarios/synth-20k.jsonl
+    python runner.py --scenarios scenarios/synth_5000_seed-42.jsonl --load --rate 5 --duration 600
+"""
+
+import argparse
+import json
+import random
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import SYNTH_DIR
+from console import Colors
+
+
+# ══════════════════════════════════════════════
+#  VOCABULAIRES
+# ══════════════════════════════════════════════
+
+# (ville, code postal) — réparties sur le territoire pour varier les distances
+CITIES: Tuple[Tuple[str, str], ...] = (
+    ("Paris", "75011"), ("Paris", "75015"), ("Boulogne-Billancourt", "92100"), ("Versailles", "78000"),
+    ("Saint-Denis", "93200"), ("Créteil", "94000"), ("Lyon", "69003"), ("Villeurbanne", "69100"),
+    ("Marseille", "13008"), ("Aix-en-Provence", "13100"), ("Toulon", "83000"), ("Nice", "06000"),
+    ("Montpellier", "34000"), ("Nîmes", "30000"), ("Toulouse", "31000"), ("Bordeaux", "33000"),
+    ("Pau", "64000"), ("Nantes", "44000"), ("Rennes", "35000"), ("Brest", "29200"),
+    ("Angers", "49000"), ("Tours", "37000"), ("Orléans", "45000"), ("Lille", "59000"),
+    ("Amiens", "80000"), ("Rouen", "76000"), ("Caen", "14000"), ("Le Havre", "76600"),
+    ("Reims", "51100"), ("Metz", "57000"), ("Nancy", "54000"), ("Strasbourg", "67000"),
+    ("Mulhouse", "68100"), ("Dijon", "21000"), ("Besançon", "25000"), ("Grenoble", "38000"),
+    ("Annecy", "74000"), ("Clermont-Ferrand", "63000"), ("Limoges", "87000"), ("Poitiers", "86000"),
+    ("La Rochelle", "17000"), ("Perpignan", "66000"),
+)
+
+STREETS = (
+    "rue Victor Hugo", "avenue Jean Jaurès", "rue de la République", "boulevard Gambetta",
+    "rue Pasteur", "place de la Mairie", "rue des Lilas", "chemin des Vignes",
+    "allée des Tilleuls", "rue du Général de Gaulle", "impasse des Acacias", "quai de la Loire",
+)
+
+FIRST_NAMES = (
+    "Sophie", "Thomas", "Camille", "Nicolas", "Julie", "Antoine", "Léa", "Hugo", "Chloé", "Lucas",
+    "Manon", "Maxime", "Inès", "Julien", "Émilie", "Kevin", "Sarah", "Mathieu", "Océane", "Rémi",
+    "Hélène", "François", "Zoé", "Yanis", "Amélie", "Bastien", "Noémie", "Karim", "Élodie", "Jérôme",
+)
+
+LAST_NAMES = (
+    "Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau",
+    "Simon", "Laurent", "Lefèvre", "Michel", "Garcia", "David", "Bertrand", "Roux", "Vincent", "Fournier",
+    "Morel", "Girard", "André", "Mercier", "Dupont", "Lambert", "Bonnet", "François", "Martinez", "Legrand",
+)
+
+EMAIL_DOMAINS = ("gmail.com", "yahoo.fr", "orange.fr", "free.fr", "hotmail.fr", "outlook.com", "laposte.net")
+
+MONTHS = (
+    "janvier", "février", "mars", "avril", "mai", "juin",
+    "juillet", "août", "septembre", "octobre", "novembre", "décembre",
+)
+
+FORMULES = ("Eco", "Standard", "Luxe")
+
+OPENERS = (
+    "Bonjour, je voudrais déménager",
+    "Bonjour, j'ai besoin d'un devis pour un déménagement",
+    "Salut, on déménage bientôt",
+    "Bonsoir, je cherche un déménageur",
+    "Bonjour, je prépare un déménagement et je voudrais un prix",
+)
+
+# Profils de lead : part du corpus ; bornes attendues d'après calculateScore
+PROFILES: Tuple[Tuple[str, float], ...] = (
+    ("complet", 0.5),    # tout fourni : ≥ 70, CHAUD
+    ("sans_email", 0.3),  # refuse l'email : lead tiède
+    ("minimal", 0.2),    # une ville et un téléphone : lead froid
+)
+
+
+# ══════════════════════════════════════════════
+#  FRAGMENTS
+# ══════════════════════════════════════════════
+
+def _ascii(text: str) -> str:
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def _email(rng: random.Random, prenom: str, nom: str) -> str:
+    p, n = _ascii(prenom).lower(), _ascii(nom).lower()
+    local = rng.choice((
+        f"{p}.{n}", f"{p}{n}", f"{p[0]}.{n}", f"{p}_{n}{rng.randint(1, 99)}", f"{n}.{p}",
+    ))
+    return f"{local}@{rng.choice(EMAIL_DOMAINS)}"
+
+
+def _phone(rng: random.Random) -> Tuple[str, str]:
+    """(saisie utilisateur, valeur normalisée attendue : 0XXXXXXXXX)."""
+    digits = [rng.choice("67")] + [str(rng.randint(0, 9)) for _ in range(8)]
+    national = "0" + "".join(digits)
+    pairs = [national[i:i + 2] for i in range(0, 10, 2)]
+    typed = rng.choice((
+        " ".join(pairs),
+        national,
+        ".".join(pairs),
+        "+33 " + national[1] + " " + " ".join(pairs[1:]),
+        "+33" + national[1:],
+    ))
+    return typed, national
+
+
+def _address(rng: random.Random, city: Tuple[str, str]) -> str:
+    return f"{rng.randint(1, 120)} {rng.choice(STREETS)}, {city[1]} {city[0]}"
+
+
+def _two_cities(rng: random.Random) -> Tuple[Tuple[str, str], Tuple[str, str]]:
+    start = rng.choice(CITIES)
+    end = rng.choice([c for c in CITIES if c[0] != start[0]])
+    return start, end
+
+
+def _route(rng: random.Random, start: Tuple[str, str], end: Tuple[str, str]) -> str:
+    return rng.choice((
+        f"De {start[0]} vers {end[0]}",
+        f"Je pars de {start[0]} pour aller à {end[0]}",
+        f"Départ {_address(rng, start)}, arrivée {_address(rng, end)}",
+        f"On quitte {start[0]} ({start[1]}) pour {end[0]}",
+    ))
+
+
+def _floor(rng: random.Random) -> str:
+    floor = rng.choice((0, 0, 1, 2, 3, 4, 5, 6, 8))
+    if floor == 0:
+        return "au rez-de-chaussée"
+    ordinal = "1er" if floor == 1 else f"{floor}ème"
+    lift = rng.choice(("avec ascenseur", "sans ascenseur", "et il n'y a pas d'ascenseur"))
+    return f"au {ordinal} étage {lift}"
+
+
+def _housing(rng: random.Random) -> Tuple[str, int]:
+    """(phrase logement, surface m²)."""
+    kind, low, high = rng.choice((
+        ("un studio", 18, 32), ("un appartement F2", 30, 50), ("un appartement F3", 50, 75),
+        ("un T4", 70, 95), ("un appartement F5", 90, 130), ("une maison", 80, 180),
+    ))
+    surface = rng.randrange(low, high + 1)
+    unit = rng.choice(("m²", "m2", " mètres carrés"))
+    where = "" if kind == "une maison" else f" {_floor(rng)}"
+    return f"C'est {kind} de {surface}{unit}{where}", surface
+
+
+def _date(rng: random.Random) -> str:
+    month = rng.choice(MONTHS)
+    of_month = f"d'{month}" if month[0] in "aeio" else f"de {month}"
+    return rng.choice((
+        f"Le {rng.randint(1, 28)} {month}",
+        f"Début {month}",
+        f"Vers la fin {of_month}",
+        f"Dans {rng.randint(2, 8)} semaines",
+        f"Le {rng.randint(1, 28)}/{MONTHS.index(month) + 1:02d}",
+    ))
+
+
+def _formule(rng: random.Random) -> str:
+    formule = rng.choice(FORMULES)
+    return rng.choice((
+        f"La formule {formule} me semble bien",
+        f"Plutôt {formule}",
+        f"On va partir sur la formule {formule.lower()}",
+    ))
+
+
+def _profile(rng: random.Random) -> str:
+    roll = rng.random()
+    for name, share in PROFILES:
+        if roll < share:
+            return name
+        roll -= share
+    return PROFILES[-1][0]
+
+
+# ══════════════════════════════════════════════
+#  GABARITS
+# ══════════════════════════════════════════════
+
+def synthesize_one(rng: random.Random, index: int, seed: int) -> Dict:
+    """Un scénario : messages et attentes tirés du même générateur."""
+    profile = _profile(rng)
+    prenom, nom = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    typed_phone, phone = _phone(rng)
+    start, end = _two_cities(rng)
+    housing, surface = _housing(rng)
+
+    messages: List[str] = [rng.choice(OPENERS)]
+    fields: Dict[str, str] = {"telephone": phone}
+    turns: List[Dict] = []
+
+    if profile == "minimal":
+        messages += [
+            start[0].lower(),
+            rng.choice(("je sais pas encore", "bientôt", "pas sûr")),
+            prenom.lower(),
+            rng.choice(("pas de mail", "je préfère pas donner mon mail")),
+            typed_phone,
+        ]
+        expected = {"score_max": 50, "priorite": ["MOYEN", "FROID", "TIEDE"]}
+    else:
+        messages += [_route(rng, start, end), housing]
+        # Surface : extraction par regex côté backend, donc déterministe
+        turns.append({"turn": len(messages), "fields": {"surface": surface}})
+        if rng.random() < 0.5:
+            messages.append(rng.choice(("Oui il y a un parking en bas", "Stationnement possible devant")))
+        messages += [_date(rng), f"Je suis {prenom} {nom}"]
+        fields |= {"prenom": prenom, "nom": nom}
+        if profile == "complet":
+            email = _email(rng, prenom, nom)
+            messages.append(email)
+            fields["email"] = email
+            expected = {"score_min": 70, "priorite": ["CHAUD"]}
+        else:
+            messages.append(rng.choice(("Je préfère ne pas donner mon email", "pas de mail désolé")))
+            expected = {"score_min": 45, "priorite": ["CHAUD", "TIEDE"]}
+        messages += [typed_phone, _formule(rng)]
+
+    expected["fields"] = fields
+    if turns:
+        expected["turns"] = turns
+    return {
+        "id": f"synth-{seed}-{index:06d}",
+        "name": f"Synthétique {profile} #{index}",
+        "description": f"{start[0]} → {end[0] if profile != 'minimal' else '?'} ({profile}, seed {seed})",
+        "generated": {"seed": seed, "index": index, "profile": profile},
+        "messages": messages,
+        "expected": expected,
+    }
+
+
+def synthesize(count: int, seed: int) -> Iterator[Dict]:
+    """Générateur paresseux : un flux RNG par scénario (ajouter des scénarios ne change pas les premiers)."""
+    for index in range(1, count + 1):
+        yield synthesize_one(random.Random(f"{seed}:{index}"), index, seed)
+
+
+def write_jsonl(path: Path, count: int, seed: int) -> Dict[str, int]:
+    """Écrit le corpus ligne à ligne. Renvoie la répartition par profil."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiles: Dict[str, int] = {}
+    with open(path, 'w', encoding='utf-8') as f:
+        for scenario in synthesize(count, seed):
+            f.write(json.dumps(scenario, ensure_ascii=False, sort_keys=True) + "\n")
+            profile = scenario["generated"]["profile"]
+            profiles[profile] = profiles.get(profile, 0) + 1
+    return profiles
+
+
+# ══════════════════════════════════════════════
+#  CLI
+# ══════════════════════════════════════════════
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="runner.py synth", description="Génère un corpus de scénarios synthétiques (JSONL)")
+    parser.add_argument("--count", type=int, default=1000, help="Nombre de scénarios (défaut: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Graine : même graine ⇒ même corpus (défaut: 0)")
+    parser.add_argument("-o", "--output", metavar="FICHIER",
+                        help="Fichier de sortie (défaut: SYNTH_DIR/synth_<count>_seed-<seed>.jsonl)")
+    args = parser.parse_args(argv)
+    if args.count < 1:
+        parser.error("--count doit être ≥ 1")
+
+    output = Path(args.output or Path(SYNTH_DIR) / f"synth_{args.count}_seed-{args.seed}.jsonl")
+    profiles = write_jsonl(output, args.count, args.seed)
+    detail = " · ".join(f"{name} {profiles.get(name, 0)}" for name, _ in PROFILES)
+    print(f"{Colors.GREEN}✓ {args.count} scénarios (seed {args.seed}) → {output}{Colors.END}")
+    print(f"  {Colors.DIM}{detail}{Colors.END}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+"""
+Chat4Lead - Valeurs de référence des statistiques du runner
+============================================================
+Les décisions A/B (changement de provider, de prompt) reposent sur ces
+fonctions écrites à la main : chaque test les épingle sur des valeurs de
+manuel, identiques à scipy.stats / statsmodels pour les mêmes réglages
+(approximation normale sans correction de continuité, McNemar exact,
+intervalle de Wilson, percentile linéaire façon numpy).
+
+    cd backend/tests && python -m pytest -q
+"""
+
+from email.utils import format_datetime
+from datetime import datetime, timezone
+
+import pytest
+
+import throttle
+from stats import mann_whitney_u, mcnemar, percentile, wilcoxon_signed_rank, wilson_interval
+from throttle import parse_retry_after
+
+
+# ─── percentile ───────────────────────────────
+
+@pytest.mark.parametrize("values, p, expected", [
+    ([1, 2, 3, 4], 50, 2.5),
+    ([15, 20, 35, 40, 50], 40, 29.0),          # numpy.percentile(…, 40)
+    (list(range(1, 11)), 95, 9.55),
+    ([7], 99, 7.0),
+    ([3, 1, 2], 0, 1.0),
+    ([3, 1, 2], 100, 3.0),
+])
+def test_percentile_linear_interpolation(values, p, expected):
+    assert percentile(values, p) == pytest.approx(expected)
+
+
+def test_percentile_empty():
+    assert percentile([], 50) is None
+
+
+# ─── Mann-Whitney U ───────────────────────────
+#  scipy.stats.mannwhitneyu(a, b, method="asymptotic", use_continuity=False)
+
+def test_mann_whitney_without_ties():
+    result = mann_whitney_u([1, 2, 3], [4, 5, 6])
+    assert result["u"] == 0
+    assert result["z"] == pytest.approx(-1.964, abs=1e-3)
+    assert result["p"] == pytest.approx(0.0495, abs=1e-4)
+    assert result["effect"] == 1.0             # b toujours plus grand
+
+
+def test_mann_whitney_with_ties_small_sample():
+    # Rangs moyens : 2 → 3 (×3), 3 → 5.5 (×2) ; Σ(t³ − t) = 30
+    result = mann_whitney_u([1, 2, 2, 3], [2, 3, 4, 5])
+    assert result["u"] == 2.5
+    assert result["z"] == pytest.approx(-1.637, abs=1e-3)
+    assert result["p"] == pytest.approx(0.1016, abs=1e-4)
+    assert result["effect"] == pytest.approx(0.688, abs=1e-3)
+
+
+def test_mann_whitney_identical_samples():
+    result = mann_whitney_u([5, 5, 5], [5, 5, 5])
+    assert result["z"] == 0.0 and result["p"] == 1.0
+
+
+def test_mann_whitney_empty_side():
+    assert mann_whitney_u([], [1, 2]) is None
+
+
+# ─── Wilcoxon (rangs signés) ──────────────────
+#  scipy.stats.wilcoxon(d, zero_method="wilcox", correction=False, method="approx")
+
+def test_wilcoxon_all_positive():
+    result = wilcoxon_signed_rank([1, 2, 3, 4, 5])
+    assert result["n"] == 5 and result["w"] == 15
+    assert result["z"] == pytest.approx(2.023, abs=1e-3)
+    assert result["p"] == pytest.approx(0.0431, abs=1e-4)
+
+
+def test_wilcoxon_zeros_dropped_and_ties():
+    # Zéro écarté ; |d| = 1,1,2,2,3,4 → rangs 1.5,1.5,3.5,3.5,5,6 ; W+ = 13.5
+    result = wilcoxon_signed_rank([0, 1, -1, 2, 2, 3, -4])
+    assert result["n"] == 6 and result["w"] == 13.5
+    assert result["z"] == pytest.approx(0.632, abs=1e-3)
+    assert result["p"] == pytest.approx(0.5271, abs=1e-4)
+
+
+def test_wilcoxon_only_zeros():
+    assert wilcoxon_signed_rank([0, 0]) == {"n": 0, "w": 0.0, "z": 0.0, "p": 1.0}
+    assert wilcoxon_signed_rank([]) is None
+
+
+# ─── McNemar exact ────────────────────────────
+#  statsmodels.stats.contingency_tables.mcnemar([[·, 1], [9, ·]], exact=True)
+
+def test_mcnemar_exact():
+    assert mcnemar(1, 9)["p"] == pytest.approx(0.0215, abs=1e-4)   # 2 × 11/1024
+    assert mcnemar(9, 1)["p"] == mcnemar(1, 9)["p"]
+
+
+def test_mcnemar_balanced_and_empty():
+    assert mcnemar(5, 5)["p"] == 1.0
+    assert mcnemar(0, 0) == {"only_a": 0, "only_b": 0, "p": 1.0}
+
+
+# ─── Intervalle de Wilson ─────────────────────
+#  statsmodels.stats.proportion.proportion_confint(k, n, method="wilson")
+
+@pytest.mark.parametrize("successes, n, low, high", [
+    (8, 10, 0.490, 0.943),
+    (5, 5, 0.566, 1.0),
+    (0, 5, 0.0, 0.434),
+])
+def test_wilson_interval(successes, n, low, high):
+    assert wilson_interval(successes, n) == pytest.approx((low, high), abs=1e-3)
+
+
+def test_wilson_interval_empty():
+    assert wilson_interval(0, 0) == (None, None)
+
+
+# ─── Retry-After ──────────────────────────────
+
+@pytest.mark.parametrize("value, expected", [
+    ("120", 120.0),
+    ("1.5", 1.5),
+    ("-3", 0.0),
+    (None, None),
+    ("", None),
+    ("bientôt", None),
+])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date(monkeypatch):
+    date = datetime(2015, 10, 21, 7, 28, tzinfo=timezone.utc)
+    monkeypatch.setattr(throttle.time, "time", lambda: date.timestamp() - 30)
+    assert parse_retry_after(format_datetime(date, usegmt=True)) == pytest.approx(30.0)
+    monkeypatch.setattr(throttle.time, "time", lambda: date.timestamp() + 30)
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
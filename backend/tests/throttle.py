@@ -0,0 +1,162 @@
+"""
+Chat4Lead — Limiteur de débit et retries côté client
+=====================================================
+`Throttle` regroupe :
+  - un seau à jetons (requêtes/s + rafale) partagé par tous les workers ;
+  - un plafond de conversations simultanées ;
+  - une politique de retry à backoff exponentiel avec jitter (« full
+    jitter »), qui respecte l'en-tête Retry-After (429 / 503).
+
+Les attentes du limiteur et les retries sont comptés séparément
+(`ThrottleStats`) : on voit si le débit est bridé par nous ou par le
+provider LLM.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, Optional
+
+from config import (
+    THROTTLE_RATE, THROTTLE_BURST, THROTTLE_MAX_CONVERSATIONS,
+    RETRY_MAX, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_STATUSES, RETRY_STATUSES_NON_IDEMPOTENT,
+)
+
+
+class TokenBucket:
+    """Seau à jetons thread-safe. `rate` ≤ 0 : pas de limite."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Prend un jeton, en attendant si besoin. Renvoie l'attente (s)."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Réservation : le jeton est pris tout de suite, l'attente se fait hors verrou
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """En-tête Retry-After : secondes ou date HTTP. None si absent/illisible."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class ThrottleStats:
+    """Compteurs thread-safe : attentes du limiteur, retries, abandons."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.throttle_wait_s = 0.0
+        self.slot_wait_s = 0.0
+        self.retries = 0
+        self.retry_wait_s = 0.0
+        self.retries_by_status: Dict[str, int] = {}
+        self.gave_up = 0
+
+    def add(self, **values):
+        with self._lock:
+            for name, value in values.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def add_retry(self, reason: str, wait: float):
+        with self._lock:
+            self.retries += 1
+            self.retry_wait_s += wait
+            self.retries_by_status[reason] = self.retries_by_status.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled_requests": self.throttled,
+                "throttle_wait_s": round(self.throttle_wait_s, 2),
+                "conversation_slot_wait_s": round(self.slot_wait_s, 2),
+                "retries": self.retries,
+                "retry_wait_s": round(self.retry_wait_s, 2),
+                "retries_by_status": dict(self.retries_by_status),
+                "gave_up": self.gave_up,
+            }
+
+
+class Throttle:
+    """Limiteur + politique de retry partagés par un ChatBotTester."""
+
+    def __init__(
+        self,
+        rate: float = THROTTLE_RATE,
+        burst: int = THROTTLE_BURST,
+        max_conversations: int = THROTTLE_MAX_CONVERSATIONS,
+        max_retries: int = RETRY_MAX,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        retry_statuses=RETRY_STATUSES,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_conversations = max_conversations
+        self._slots = threading.BoundedSemaphore(max_conversations) if max_conversations > 0 else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_statuses_non_idempotent = self.retry_statuses & frozenset(RETRY_STATUSES_NON_IDEMPOTENT)
+        self.stats = ThrottleStats()
+
+    def retryable(self, status: int, idempotent: bool) -> bool:
+        """Statut rejouable ; requête non idempotente : refus explicites seulement (429/503)."""
+        return status in (self.retry_statuses if idempotent else self.retry_statuses_non_idempotent)
+
+    def wait_turn(self) -> float:
+        """Avant chaque requête : jeton du seau. Renvoie l'attente (s)."""
+        waited = self.bucket.acquire()
+        self.stats.add(requests=1, throttled=1 if waited else 0, throttle_wait_s=waited)
+        return waited
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Délai avant la tentative `attempt` + 1 (attempt ≥ 1) : full jitter
+        sur base·2^(attempt-1), plafonné ; jamais moins que Retry-After.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    @contextmanager
+    def conversation_slot(self) -> Iterator[None]:
+        """Plafonne le nombre de conversations simultanées (si configuré)."""
+        if self._slots is None:
+            yield
+            return
+        start = time.monotonic()
+        self._slots.acquire()
+        self.stats.add(slot_wait_s=time.monotonic() - start)
+        try:
+            yield
+        finally:
+            self._slots.release()
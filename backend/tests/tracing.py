@@ -0,0 +1,221 @@
+"""
+Chat4Lead — Traces d'exécution (spans)
+=======================================
+Chaque phase du runner est un span : health check, init, envoi de
+chaque message, pauses, attentes du limiteur, retries, récupération de
+la conversation, assertions, écriture des rapports.
+
+Exports :
+  - Chrome trace-event JSON (événements « X »), à ouvrir dans
+    https://ui.perfetto.dev ou chrome://tracing — un fil d'exécution par
+    worker, on y voit directement files d'attente et blocages ;
+  - OTLP/JSON (OpenTelemetry), à envoyer tel quel à un collecteur :
+        curl -X POST http://collector:4318/v1/traces \\
+             -H 'Content-Type: application/json' -d @trace_<ts>.otlp.json
+
+Horodatage en temps Unix : les traces de plusieurs shards se superposent
+sur un même axe (voir `merge`).
+
+Mémoire constante sur un soak : chaque span terminé est ajouté à un
+fichier JSONL temporaire (comme le flux de résultats), relu ligne à
+ligne à l'export puis supprimé.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence
+
+SERVICE_NAME = "chat4lead-test-runner"
+
+
+class Tracer:
+    """Collecteur de spans thread-safe. Désactivé, `span()` ne coûte presque rien."""
+
+    def __init__(self, enabled: bool = True, process_name: str = "runner"):
+        self.enabled = enabled
+        self.process_name = process_name
+        self.pid = os.getpid()
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # perf_counter pour les durées, ancré sur l'horloge Unix au démarrage
+        self._epoch_ns = time.time_ns() - time.perf_counter_ns()
+        # Spans terminés, un par ligne : rien ne s'accumule en mémoire
+        self._spool: Optional[IO[bytes]] = None
+        if enabled:
+            fd, name = tempfile.mkstemp(prefix="trace_", suffix=".jsonl")
+            self._spool_path = Path(name)
+            self._spool = os.fdopen(fd, 'ab')
+            atexit.register(self.close)
+
+    def close(self):
+        """Supprime le fichier de spans (appelé à la sortie du processus)."""
+        with self._lock:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+                self._spool_path.unlink(missing_ok=True)
+
+    def _now_ns(self) -> int:
+        return self._epoch_ns + time.perf_counter_ns()
+
+    @contextmanager
+    def span(self, name: str, category: str = "runner", **attributes) -> Iterator[Dict]:
+        """
+        Mesure le bloc. Les attributs peuvent être complétés dans le bloc
+        via le dict renvoyé (ex: statut HTTP connu après coup).
+        """
+        if not self.enabled:
+            yield attributes
+            return
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = stack[-1] if stack else None
+        span = {
+            "name": name,
+            "cat": category,
+            "span_id": os.urandom(8).hex(),
+            # Un span racine (scénario, conversation, phase du main) ouvre une trace
+            "trace_id": parent["trace_id"] if parent else os.urandom(16).hex(),
+            "parent_id": parent["span_id"] if parent else None,
+            "tid": threading.get_ident(),
+            "args": attributes,
+        }
+        stack.append(span)
+        start = self._now_ns()
+        try:
+            yield attributes
+        except BaseException as e:
+            attributes["error"] = f"{type(e).__name__}: {e}"[:200]
+            raise
+        finally:
+            span["start_ns"] = start
+            span["end_ns"] = self._now_ns()
+            stack.pop()
+            line = (json.dumps(span, ensure_ascii=False, default=str) + "\n").encode('utf-8')
+            with self._lock:
+                if self._spool is not None:
+                    self._spool.write(line)
+                self._threads.setdefault(span["tid"], threading.current_thread().name)
+
+    def _iter_spans(self) -> Iterator[Dict]:
+        """Spans terminés jusqu'ici, relus un à un depuis le fichier temporaire."""
+        with self._lock:
+            if self._spool is None:
+                return
+            self._spool.flush()
+            end = self._spool.tell()
+        with open(self._spool_path, 'rb') as f:
+            read = 0
+            while read < end:
+                line = f.readline()
+                if not line:
+                    break
+                read += len(line)
+                yield json.loads(line)
+
+    # ─── Exports ──────────────────────────────
+
+    def chrome_events(self) -> Iterator[Dict]:
+        with self._lock:
+            threads = dict(self._threads)
+        tids = {ident: i for i, ident in enumerate(threads, 1)}
+        yield {"ph": "M", "name": "process_name", "pid": self.pid, "args": {"name": self.process_name}}
+        for ident, name in threads.items():
+            yield {"ph": "M", "name": "thread_name", "pid": self.pid, "tid": tids[ident], "args": {"name": name}}
+        for s in self._iter_spans():
+            yield {
+                "ph": "X", "name": s["name"], "cat": s["cat"],
+                "ts": s["start_ns"] / 1000, "dur": (s["end_ns"] - s["start_ns"]) / 1000,
+                "pid": self.pid, "tid": tids.get(s["tid"], 0), "args": s["args"],
+            }
+
+    def otlp_spans(self) -> Iterator[Dict]:
+        for s in self._iter_spans():
+            yield {
+                "traceId": s["trace_id"],
+                "spanId": s["span_id"],
+                **({"parentSpanId": s["parent_id"]} if s["parent_id"] else {}),
+                "name": s["name"],
+                "kind": 3 if s["cat"] == "http" else 1,  # CLIENT | INTERNAL
+                "startTimeUnixNano": str(s["start_ns"]),
+                "endTimeUnixNano": str(s["end_ns"]),
+                "attributes": [_otlp_attr(k, v) for k, v in s["args"].items()],
+                "status": {"code": 2, "message": s["args"]["error"]} if "error" in s["args"] else {},
+            }
+
+    def write(self, path: Path, otlp: bool = False) -> List[Path]:
+        """Écrit la trace Chrome (et OTLP si demandé), span par span. Renvoie les fichiers écrits."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"displayTimeUnit": "ms", "traceEvents": ')
+            _write_array(f, self.chrome_events())
+            f.write("}")
+        written = [path]
+        if otlp:
+            otlp_path = path.with_suffix(".otlp.json")
+            resource = {"attributes": [
+                _otlp_attr("service.name", SERVICE_NAME),
+                _otlp_attr("process.pid", self.pid),
+                _otlp_attr("chat4lead.process", self.process_name),
+            ]}
+            with open(otlp_path, 'w', encoding='utf-8') as f:
+                # {"resourceSpans": [{"resource": …, "scopeSpans": [{"scope": …, "spans": [...]}]}]}
+                f.write('{"resourceSpans": [{"resource": ' + json.dumps(resource, ensure_ascii=False)
+                        + ', "scopeSpans": [{"scope": {"name": "chat4lead.tests"}, "spans": ')
+                _write_array(f, self.otlp_spans())
+                f.write("}]}]}")
+            written.append(otlp_path)
+        return written
+
+
+def _write_array(f, items: Iterable[Dict]):
+    """Tableau JSON écrit élément par élément."""
+    f.write("[")
+    for i, item in enumerate(items):
+        if i:
+            f.write(",\n")
+        f.write(json.dumps(item, ensure_ascii=False, default=str))
+    f.write("]")
+
+
+def _otlp_attr(key: str, value) -> Dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def merge_chrome_traces(paths: Sequence[Path], output: Path) -> Optional[Path]:
+    """
+    Superpose les traces Chrome de plusieurs shards : un process par
+    fichier (nommé d'après le fichier), sur l'axe de temps Unix commun.
+    """
+    events: List[Dict] = []
+    for index, path in enumerate(paths, 1):
+        with open(path, 'r', encoding='utf-8') as f:
+            trace = json.load(f)
+        for event in trace.get("traceEvents", []):
+            event = dict(event, pid=index)
+            if event.get("ph") == "M" and event.get("name") == "process_name":
+                event["args"] = {"name": Path(path).stem}
+            events.append(event)
+    if not events:
+        return None
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    return Path(output)